@@ -1,70 +1,160 @@
-import google.generativeai as genai
-from ..config import settings
 import json
-import typing_extensions as typing
-from openai import OpenAI
-import os
+import threading
+import time
+from typing import Iterator, Optional
+from ..telemetry.tracing import Span, record_span, trace_span, AGENT_DURATION
+from .context import AgentContext, ContextSpec, CONTEXT_SPECS, build_context
+from .limiter import Priority, llm_limiter, current_priority
+from .policy import ModelPolicy, policy_for, SMALL, LARGE, TIER_CALLS, ESCALATIONS, LATENCY_SAVED
+from .prompts import PromptTemplate
+from .providers import LLMRequest, SchemaValidationError
+from .router import llm_router
 
 class BaseAgent:
-    def __init__(self, model_name="gemini-2.0-flash", provider="gemini"):
+    def __init__(self, model_name="gemini-2.0-flash", provider="gemini", router=None, limiter=None, policy: ModelPolicy = None):
         self.provider = provider
         self.model_name = model_name
-        
-        # Always try to initialize both if possible, to allow for fallbacks
-        try:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(model_name)
-        except Exception as e:
-            print(f"Warning: Failed to initialize Gemini: {e}")
-
-        try:
-            self.client = OpenAI(api_key=settings.openai_api_key or os.environ.get("OPENAI_API_KEY"))
-        except Exception:
-            self.client = None
+        self.policy = policy or policy_for(type(self).__name__, model_name)
+        # Provider clients live in the router so all agents share health stats and circuit breakers
+        self.router = router or llm_router
+        self.limiter = limiter or llm_limiter
     
     def _call_gemini(self, prompt: str, response_schema: type, context: dict = None) -> dict:
         """
-        Calls Gemini with a prompt and forces structured JSON output matching response_schema.
-        Falls back to OpenAI if Gemini hits rate limits (429).
+        Calls the LLM with a single prompt and forces structured JSON output matching response_schema.
+        Despite the name this is routed to whichever provider is currently fastest and healthy.
         """
-        # TEMPORARILY DISABLED GEMINI due to 429 errors
-        # Directly fallback to OpenAI
-        full_prompt = f"{prompt}\n\nContext: {json.dumps(context, default=str) if context else '{}'}"
-        if self.client:
-            print("Gemini disabled. Routing directly to OpenAI...")
-            return self._call_openai(
-                [{"role": "user", "content": full_prompt}],
-                response_format=response_schema
-            )
-        else:
-            raise Exception("Gemini disabled and no OpenAI client available.")
+        full_prompt = f"{prompt}\n\nContext: {self._context(context).text}"
+        return self._complete([{"role": "user", "content": full_prompt}], response_schema)
 
     def _call_openai(self, messages: list, response_format: type = None) -> dict:
         """
-        Calls OpenAI with messages and optional structured output.
+        Calls the LLM with chat messages and optional structured output.
+        Vision messages (image_url parts) are only routed to providers that accept them.
+        """
+        return self._complete(messages, response_format)
+
+    def _context(self, data: dict, spec: ContextSpec = None) -> AgentContext:
+        """Serialise facts for a prompt using this agent's allow-list and token budget."""
+        agent = type(self).__name__
+        return build_context(data, spec or CONTEXT_SPECS.get(agent, ContextSpec()), agent=agent)
+
+    def _call_prompt(self, template: PromptTemplate, response_format: type, images: list = None, **values) -> dict:
+        """
+        Calls the LLM with a registered prompt: the template's static system prefix
+        followed by the rendered per-call part. `images` are data/HTTP URLs appended
+        to the user message for vision calls.
+        """
+        messages = template.messages(**values)
+        if images:
+            messages[-1]["content"] = [
+                {"type": "text", "text": messages[-1]["content"]},
+                *({"type": "image_url", "image_url": {"url": url}} for url in images),
+            ]
+        return self._complete(messages, response_format, prompt=template.id)
+
+    def _complete(self, messages: list, response_format: type = None, prompt: str = None) -> dict:
+        """
+        Runs the agent's model cascade: the small model answers first and the call is
+        escalated to the large model only if the answer fails schema validation or its
+        confidence field is below the policy threshold.
         """
+        policy = self.policy
+        agent = type(self).__name__
+        if not policy.cascades:
+            TIER_CALLS.inc(agent=agent, tier=LARGE)
+            return self._call_model(messages, response_format, policy.large_model, LARGE, prompt)
+
+        started = time.perf_counter()
         try:
-             # Use gpt-4o for fallback if original model was a Gemini model
-            model = "gpt-4o" if "gemini" in self.model_name else self.model_name
+            result = self._call_model(messages, response_format, policy.small_model, SMALL, prompt)
+            reason = "low_confidence" if policy.needs_escalation(result) else None
+        except SchemaValidationError as e:
+            print(f"{agent}: {policy.small_model} output failed validation, escalating: {e}")
+            reason = "schema"
+        small_seconds = time.perf_counter() - started
 
-            if response_format:
-                completion = self.client.beta.chat.completions.parse(
-                    model=model,
-                    messages=messages,
-                    response_format=response_format,
-                )
-                return completion.choices[0].message.parsed.model_dump()
-            else:
-                 completion = self.client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    response_format={"type": "json_object"}
-                )
-                 return json.loads(completion.choices[0].message.content)
+        # Savings are measured against the large model's recent median for this agent
+        large_p50 = AGENT_DURATION.quantile(0.5, agent=agent, model=policy.large_model)
+        if reason is None:
+            TIER_CALLS.inc(agent=agent, tier=SMALL)
+            if large_p50 is not None:
+                LATENCY_SAVED.inc(large_p50 - small_seconds, agent=agent)
+            return result
 
+        ESCALATIONS.inc(agent=agent, reason=reason)
+        LATENCY_SAVED.inc(-small_seconds, agent=agent)
+        TIER_CALLS.inc(agent=agent, tier=LARGE)
+        return self._call_model(messages, response_format, policy.large_model, LARGE, prompt)
+
+    def _call_model(self, messages: list, response_format: type, model: str, tier: str, prompt: str = None) -> dict:
+        """
+        Waits for rate-limit capacity at the caller's priority, then routes one LLM call
+        through the provider router. Each call is traced (latency, queue wait, tokens, cost,
+        retries) under the agent's class name.
+        """
+        request = LLMRequest(messages=messages, response_format=response_format, model=model, tier=tier, prompt=prompt)
+        estimated_tokens = request.estimated_prompt_tokens
+
+        with trace_span("agent", type(self).__name__) as span:
+            span.model = model
+            span.prompt = prompt
+            span.queue_wait_ms = self.limiter.acquire(current_priority(), estimated_tokens) * 1000
+            try:
+                response = self.router.complete(request)
+            except Exception as e:
+                print(f"LLM API Error ({type(self).__name__}): {e}")
+                self.limiter.settle(estimated_tokens, 0)
+                raise e
+
+            span.retries = response.retries
+            span.record_usage(response.usage, model=response.model)
+            self.limiter.settle(estimated_tokens, span.prompt_tokens + span.completion_tokens)
+            return response.data
+
+    def _stream(self, messages: list, priority: Optional[Priority] = None,
+                cancelled: Optional[threading.Event] = None, prompt: str = None) -> Iterator[str]:
+        """
+        Streams free-text deltas from the agent's small model. Setting `cancelled` stops
+        the stream at the next chunk and closes the upstream request.
+
+        The generator may be resumed from different worker threads, so the span is
+        timed here instead of with trace_span (whose context would not survive).
+        """
+        priority = current_priority() if priority is None else priority
+        request = LLMRequest(messages=messages, model=self.policy.small_model, tier=SMALL, prompt=prompt)
+        estimated_tokens = request.estimated_prompt_tokens
+        TIER_CALLS.inc(agent=type(self).__name__, tier=SMALL)
+
+        span = Span(kind="agent", name=type(self).__name__, model=self.policy.small_model, prompt=prompt)
+        start = time.perf_counter()
+        stream, acquired = None, False
+        try:
+            span.queue_wait_ms = self.limiter.acquire(priority, estimated_tokens) * 1000
+            acquired = True
+            stream = self.router.stream(request)
+            span.model = stream.model
+            for delta in stream:
+                if cancelled is not None and cancelled.is_set():
+                    span.status = "CANCELLED"
+                    break
+                yield delta
+        except GeneratorExit:
+            span.status = "CANCELLED"
+            raise
         except Exception as e:
-            print(f"OpenAI API Error: {e}")
+            print(f"LLM API Error ({type(self).__name__}): {e}")
+            span.status = "ERROR"
+            span.error = str(e)[:500]
             raise e
+        finally:
+            if stream is not None:
+                stream.close()
+                span.record_usage(stream.usage)
+            if acquired:
+                self.limiter.settle(estimated_tokens, span.prompt_tokens + span.completion_tokens)
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            record_span(span)
 
     def run(self, input_data: dict) -> dict:
         raise NotImplementedError
@@ -1,4 +1,6 @@
 from .base import BaseAgent
+from .policy import SMALL
+from .prompts import PromptTemplate, prompt_registry
 from pydantic import BaseModel
 import json
 
@@ -6,31 +8,104 @@ class ChatResponse(BaseModel):
     response: str
     suggested_actions: list[str]
 
+# Streamed answers end with this line followed by a JSON list of button labels
+ACTIONS_MARKER = "\nACTIONS:"
+
+
+class ActionSplitter:
+    """
+    Splits a streamed answer into user-visible text and the trailing ACTIONS list.
+    Text that could be the start of the marker is held back until it can be ruled out.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._actions = None
+
+    def feed(self, delta: str) -> str:
+        if self._actions is not None:
+            self._actions += delta
+            return ""
+        self._buffer += delta
+        index = self._buffer.find(ACTIONS_MARKER)
+        if index >= 0:
+            text, self._actions = self._buffer[:index], self._buffer[index + len(ACTIONS_MARKER):]
+            self._buffer = ""
+            return text
+        keep = 0
+        for size in range(min(len(ACTIONS_MARKER) - 1, len(self._buffer)), 0, -1):
+            if ACTIONS_MARKER.startswith(self._buffer[-size:]):
+                keep = size
+                break
+        text = self._buffer[:len(self._buffer) - keep]
+        self._buffer = self._buffer[len(self._buffer) - keep:]
+        return text
+
+    def finish(self) -> tuple[str, list[str]]:
+        """Remaining text and the parsed actions (empty if the model left them out or broke the format)."""
+        text, self._buffer = self._buffer, ""
+        raw = (self._actions or "").strip()
+        start, end = raw.find("["), raw.rfind("]")
+        try:
+            actions = json.loads(raw[start:end + 1]) if start >= 0 else []
+        except json.JSONDecodeError:
+            actions = []
+        return text, [str(a) for a in actions if isinstance(a, (str, int, float))]
+
+
+class ConversationSummary(BaseModel):
+    summary: str
+
+
 class ChatAgent(BaseAgent):
-    def run(self, query: str, context: dict = None, role: str = "USER") -> dict:
-        prompt = f"""
-        You are the Bondpath Copilot, an AI assistant for a bail bond management platform.
-        Your role is to assist {role}s in making decisions, understanding case details, and navigating compliance rules.
-
-        CURRENT CONTEXT:
-        {json.dumps(context, default=str) if context else "No specific case selected."}
-
-        USER QUERY:
-        {query}
-
-        GUIDELINES:
-        1. Be helpful, concise, and professional.
-        2. Use the provided context to answer specific questions about the case (e.g., risk scores, missing documents).
-        3. If the user asks for policy info and you don't have it in the context, refer to general best practices but disclaimer that you don't have specific agency policy docs loaded yet.
-        4. Do NOT hallucinate facts not present in the context.
-        5. Suggest next steps if applicable.
-
-        OUTPUT FORMAT:
-        Return a JSON object with:
-        - "response": The text answer to the user.
-        - "suggested_actions": A list of short strings for buttons (e.g., "View Risk Details", "Draft Email").
+    def _messages(self, template: PromptTemplate, query: str, context: dict, role: str,
+                  case_block: str = None, history: list = None) -> list:
+        """
+        Prompt layout, most stable first so providers can reuse the cached prefix:
+        the template's static instructions, the case context block, the conversation
+        summary and recent turns, then the new query with per-request page context.
         """
-        
-        return self._call_gemini(prompt, ChatResponse)
+        messages = [
+            {"role": "system", "content": template.system},
+            {"role": "system", "content": f"CASE CONTEXT:\n{case_block or 'No specific case selected.'}\n\nThe user is a {role}."},
+        ]
+        messages.extend(history or [])
+        extra = json.dumps(context, separators=(",", ":"), default=str) if context else None
+        query = template.render(query=query)
+        messages.append({"role": "user", "content": f"{query}\n\nCURRENT CONTEXT: {extra}" if extra else query})
+        return messages
+
+    def run(self, query: str, context: dict = None, role: str = "USER", case_block: str = None, history: list = None) -> dict:
+        template = prompt_registry.get("chat")
+        messages = self._messages(template, query, context, role, case_block, history)
+        return self._complete(messages, ChatResponse, prompt=template.id)
+
+    def stream(self, query: str, context: dict = None, role: str = "USER", case_block: str = None,
+               history: list = None, priority=None, cancelled=None):
+        """
+        Yields ("token", {"text": ...}) events as the answer is generated, then a final
+        ("actions", {"suggested_actions": [...]}) event.
+        """
+        template = prompt_registry.get("chat_stream")
+        messages = self._messages(template, query, context, role, case_block, history)
+        splitter = ActionSplitter()
+        for delta in self._stream(messages, priority=priority, cancelled=cancelled, prompt=template.id):
+            text = splitter.feed(delta)
+            if text:
+                yield "token", {"text": text}
+        if cancelled is not None and cancelled.is_set():
+            return
+        text, actions = splitter.finish()
+        if text:
+            yield "token", {"text": text}
+        yield "actions", {"suggested_actions": actions}
+
+    def summarise(self, previous_summary: str, turns: list) -> str:
+        """Fold older turns into the running summary. Always uses the small model."""
+        transcript = "\n".join(f"{t['role'].upper()}: {t['content']}" for t in turns)
+        template = prompt_registry.get("chat_summary")
+        messages = template.messages(summary=previous_summary or "(none)", transcript=transcript)
+        result = self._call_model(messages, ConversationSummary, self.policy.small_model, SMALL, template.id)
+        return result["summary"]
 
 chat_agent = ChatAgent()
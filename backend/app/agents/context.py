@@ -0,0 +1,163 @@
+"""
+Compact, per-agent serialisation of facts for LLM prompts.
+
+Callers hand agents whatever dict they have (often every column of a Case).
+Before it goes into a prompt it is reduced to the agent's allow-list, empty
+values are pruned, blobs (base64 signatures, data URLs) are replaced by a
+presence marker, repeated key prefixes are folded into nested objects
+(`defendant_first_name` -> `defendant.first_name`) and the result is dumped
+as compact JSON. The token estimate is checked before anything is sent.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+import json
+import re
+
+from ..telemetry.metrics import registry
+from .providers import estimate_tokens
+
+CONTEXT_TOKENS = registry.summary("bondpath_agent_context_tokens", "Estimated tokens of serialised agent context", ["agent"])
+CONTEXT_TRUNCATED = registry.counter("bondpath_agent_context_truncated", "Agent contexts shortened to fit their token budget", ["agent"])
+
+_BASE64 = re.compile(r"^[A-Za-z0-9+/=\s]+$")
+BLOB_MIN_LENGTH = 200
+MIN_STRING_LENGTH = 40
+
+
+@dataclass(frozen=True)
+class ContextSpec:
+    fields: Optional[FrozenSet[str]] = None      # Allow-list of top-level keys; None keeps everything
+    presence_only: FrozenSet[str] = frozenset()  # Reduced to true/false (signatures, document URLs)
+    group_prefixes: Tuple[str, ...] = ("defendant_", "indemnitor_", "co_signer_", "caller_")
+    max_string: int = 400                        # Longer strings are cut with an ellipsis
+    max_tokens: int = 1500                       # Strings are shortened further until the context fits
+
+
+@dataclass
+class AgentContext:
+    text: str
+    tokens: int
+
+
+def _is_blob(value: str) -> bool:
+    if value.startswith("data:"):
+        return True
+    return len(value) >= BLOB_MIN_LENGTH and " " not in value and bool(_BASE64.match(value))
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _clean(value: Any, max_string: int) -> Any:
+    """Normalise scalars, redact blobs and prune empty values recursively."""
+    if isinstance(value, dict):
+        cleaned = {k: _clean(v, max_string) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if not _is_empty(v)}
+    if isinstance(value, (list, tuple, set)):
+        return [v for v in (_clean(v, max_string) for v in value) if not _is_empty(v)]
+    if isinstance(value, Decimal):
+        value = float(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        value = value.strip()
+        if _is_blob(value):
+            return "[blob]"
+        if len(value) > max_string:
+            return value[:max_string] + "…"
+    return value
+
+
+def _group(data: Dict[str, Any], prefixes: Tuple[str, ...]) -> Dict[str, Any]:
+    grouped: Dict[str, Any] = {}
+    for key, value in data.items():
+        prefix = next((p for p in prefixes if key.startswith(p)), None)
+        if prefix is None:
+            if isinstance(grouped.get(key), dict) and isinstance(value, dict):
+                grouped[key] = {**grouped[key], **value}
+            else:
+                grouped[key] = value
+            continue
+        group = prefix.rstrip("_")
+        target = grouped.setdefault(group, {})
+        if isinstance(target, dict):
+            target[key[len(prefix):]] = value
+        else:
+            grouped[key] = value  # A scalar already uses the group name; keep this key flat
+    return grouped
+
+
+def build_context(data: Optional[Dict[str, Any]], spec: ContextSpec, agent: str = "unknown") -> AgentContext:
+    data = data or {}
+    selected = {k: v for k, v in data.items() if spec.fields is None or k in spec.fields or k in spec.presence_only}
+    for key in spec.presence_only:
+        if key in selected:
+            selected[key] = not _is_empty(selected[key])
+
+    max_string = spec.max_string
+    while True:
+        compact = _group(_clean(selected, max_string), spec.group_prefixes)
+        text = json.dumps(compact, separators=(",", ":"), ensure_ascii=False, default=str)
+        tokens = estimate_tokens(text)
+        if tokens <= spec.max_tokens or max_string <= MIN_STRING_LENGTH:
+            break
+        max_string = max(MIN_STRING_LENGTH, max_string // 2)
+
+    if max_string != spec.max_string:
+        CONTEXT_TRUNCATED.inc(agent=agent)
+    if tokens > spec.max_tokens:
+        print(f"Warning: {agent} context is ~{tokens} tokens, over its {spec.max_tokens} budget")
+    CONTEXT_TOKENS.observe(tokens, agent=agent)
+    return AgentContext(text=text, tokens=tokens)
+
+
+_DOCUMENTS = frozenset({"booking_sheet_url", "defendant_id_url", "indemnitor_id_url", "gov_id_url", "collateral_doc_url"})
+_SIGNATURES = frozenset({
+    "terms_signature", "fee_disclosure_signature", "contact_agreement_signature", "indemnitor_signature",
+    "co_signer_signature", "deferred_payment_auth_signature",
+})
+_DEFENDANT = frozenset({
+    "defendant", "defendant_name", "defendant_first_name", "defendant_last_name", "defendant_dob", "defendant_gender",
+})
+_BOND = frozenset({
+    "jail_facility", "county", "state", "state_jurisdiction", "booking_number",
+    "bond_amount", "bond_type", "charges", "charge_severity",
+})
+
+CONTEXT_SPECS: Dict[str, ContextSpec] = {
+    # Raw notes and transcripts are the whole point of intake; only prune and redact
+    "IntakeAgent": ContextSpec(max_string=8000, max_tokens=4000),
+    "RiskAgent": ContextSpec(
+        fields=_DEFENDANT | _BOND | frozenset({
+            "indemnitor", "indemnitor_first_name", "indemnitor_last_name", "indemnitor_relationship", "indemnitor_address",
+            "premium_type", "payment_method", "down_payment_amount", "collateral_description", "has_collateral",
+            "has_booking_sheet", "has_defendant_id", "has_indemnitor_id", "has_gov_id", "has_collateral_doc",
+            "caller_relationship", "intent_signal", "fast_flags", "flags", "potential_duplicate",
+        }),
+        presence_only=_DOCUMENTS,
+    ),
+    "ReadinessAgent": ContextSpec(
+        fields=_DEFENDANT | _BOND | frozenset({
+            "indemnitor_first_name", "indemnitor_last_name", "indemnitor_phone", "indemnitor_email",
+            "indemnitor_address", "indemnitor_relationship", "co_signer_name", "co_signer_phone",
+            "engagement_type", "contact_method", "premium_type", "down_payment_amount", "monthly_payment_amount",
+            "payment_method", "collateral_description", "has_collateral", "signatures_status", "documents_verified",
+            "advisor_notes", "advisor_next_step",
+        }),
+        presence_only=_DOCUMENTS | _SIGNATURES,
+    ),
+    "DocVerifyAgent": ContextSpec(
+        fields=_DEFENDANT | frozenset({
+            "dob", "booking_number", "bond_amount", "charges", "jail_facility", "county",
+            "indemnitor_first_name", "indemnitor_last_name", "indemnitor_address",
+        }),
+        max_tokens=500,
+    ),
+    "ExplanationAgent": ContextSpec(max_string=300),
+    "ChatAgent": ContextSpec(max_string=300, max_tokens=800),
+}
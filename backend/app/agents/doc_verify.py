@@ -1,11 +1,35 @@
 from .base import BaseAgent
 from pydantic import BaseModel
 from typing import List, Optional, Any
-import requests
-from io import BytesIO
+import httpx
 import filetype
 import json
 import base64
+from .prompts import prompt_registry
+from ..config import settings
+from ..rules.document_match import match_document
+from ..storage import storage as default_storage
+
+# What the vision model returns: extraction only, no comparison with the case
+class DocExtractionOutput(BaseModel):
+    is_valid_document: bool
+    document_type_detected: str
+    extracted_data: dict  # Key-value pairs of extracted text
+    confidence_score: int
+
+class DocBatchItemOutput(DocExtractionOutput):
+    index: int  # Position of the image in the request, from 1
+
+class DocBatchExtractionOutput(BaseModel):
+    documents: List[DocBatchItemOutput]
+    confidence_score: int  # Lowest per-document score; escalates the batch like a single document
+
+class FieldMatchOutput(BaseModel):
+    field: str
+    expected: Optional[str] = None
+    found: Optional[str] = None
+    status: str           # "MATCH", "MISMATCH", "UNCLEAR", "MISSING"
+    confidence: float
 
 # Output Schema
 class DocVerificationOutput(BaseModel):
@@ -14,92 +38,114 @@ class DocVerificationOutput(BaseModel):
     extracted_data: dict  # Key-value pairs of extracted text
     match_status: str     # "MATCH", "MISMATCH", "UNCLEAR"
     mismatches: List[str] = []
+    field_matches: List[FieldMatchOutput] = []
     confidence_score: int
 
 class DocVerifyAgent(BaseAgent):
+    def __init__(self, *args, storage=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = storage or default_storage
+
     def run(self, input_data: dict) -> dict:
         """
-        Verifies a document against case data using OpenAI Vision.
-        Input: { "image_url": "...", "case_data": {...}, "doc_type": "booking_sheet" }
+        Verifies a document against case data: fields are read with OpenAI Vision, then compared locally.
+        Input: { "storage_key": "..." or "image_url": "...", "case_data": {...}, "doc_type": "booking_sheet" }
         """
-        file_url = input_data.get('image_url') or input_data.get('file_url')
-        case_data = input_data.get('case_data', {})
-        doc_type = input_data.get('doc_type', 'unknown')
-        
-        if not file_url:
+        if not (input_data.get('storage_key') or input_data.get('image_url') or input_data.get('file_url')):
             return {"error": "No file URL provided"}
-            
-        file_data = None
-        mime_type = "application/octet-stream"
 
-        # 1. Fetch File
-        try:
-            if file_url.startswith('http'):
-                 response = requests.get(file_url)
-                 response.raise_for_status()
-                 file_data = response.content
-            else:
-                with open(file_url, 'rb') as f:
-                    file_data = f.read()
-
-            kind = filetype.guess(file_data)
-            mime_type = kind.mime if kind else 'application/octet-stream'
-
-        except Exception as e:
+        extraction = self.extract(input_data)
+        if "error" in extraction:
             return {
                 "is_valid_document": False, "document_type_detected": "error", "extracted_data": {},
-                "match_status": "ERROR", "mismatches": [f"Could not load file: {str(e)}"], "confidence_score": 0
+                "match_status": "ERROR", "mismatches": [extraction["error"]], "confidence_score": 0
             }
+        # Compared with the case locally (deterministic, no LLM call)
+        match = match_document(extraction["extracted_data"], input_data.get('case_data', {}), input_data.get('doc_type', 'unknown'))
+        return {**extraction, **match.as_dict()}
 
-        # 2. Prepare for OpenAI
-        base64_image = base64.b64encode(file_data).decode('utf-8')
-        
-        prompt = f"""
-        You are an expert Document Verifier for Bail Bonds.
-        Analyze this {doc_type} and compare it against the Case Data.
-
-        Case Data: {json.dumps(case_data, default=str)}
-        
-        Task:
-        1. Identify the document type.
-        2. Extract key fields (Booking #, Name, DOB, Charges, Amounts).
-        3. Compare against Case Data.
-        4. Report Mismatches.
-
-        Output matching the JSON schema provided.
+    def extract(self, input_data: dict) -> dict:
         """
-        
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:{mime_type};base64,{base64_image}"
-                        }
-                    }
-                ]
-            }
-        ]
-        
+        Reads the document's fields with the vision model. Independent of the case facts, so the
+        result can be cached per file. On failure returns {"error": "..."}.
+        """
+        try:
+            image = self._load_image(input_data)
+        except Exception as e:
+            return {"error": f"Could not load file: {str(e)}"}
+
         try:
-            result = self._call_openai(
-                messages=messages,
-                response_format=DocVerificationOutput
+            result = self._call_prompt(
+                prompt_registry.get("doc_verify"),
+                DocExtractionOutput,
+                images=[image],
+                doc_type=input_data.get('doc_type', 'unknown'),
+                # Only rendered by doc_verify@v1, which still compared in the prompt
+                case_data=self._context(input_data.get('case_data', {})).text
             )
-            return result
+            return {k: result[k] for k in DocExtractionOutput.model_fields}
             
         except Exception as e:
             print(f"Doc Verify Agent Failed: {e}")
-            return {
-                "is_valid_document": False,
-                "document_type_detected": "error", "extracted_data": {},
-                "match_status": "ERROR",
-                "mismatches": [f"AI Processing Error: {str(e)}"],
-                "confidence_score": 0
-            }
+            return {"error": f"AI Processing Error: {str(e)}"}
+
+    def extract_many(self, documents: List[dict]) -> List[dict]:
+        """
+        Reads several documents of one case in a single vision call.
+        Input: [{ "storage_key": "...", "doc_type": "..." }, ...]; returns one extraction
+        (or {"error": "..."}) per document, in input order.
+        """
+        results: List[Optional[dict]] = [None] * len(documents)
+        images, loaded = [], []
+        for i, document in enumerate(documents):
+            try:
+                images.append(self._load_image(document))
+                loaded.append(i)
+            except Exception as e:
+                results[i] = {"error": f"Could not load file: {str(e)}"}
+
+        if loaded:
+            listing = "\n".join(f"{n}. {documents[i].get('doc_type', 'unknown')}" for n, i in enumerate(loaded, 1))
+            try:
+                result = self._call_prompt(
+                    prompt_registry.get("doc_verify_batch"), DocBatchExtractionOutput, images=images, documents=listing
+                )
+                by_index = {item["index"]: item for item in result["documents"]}
+                for n, i in enumerate(loaded, 1):
+                    item = by_index.get(n)
+                    results[i] = ({k: item[k] for k in DocExtractionOutput.model_fields} if item
+                                  else {"error": "AI Processing Error: document missing from batch response"})
+            except Exception as e:
+                print(f"Doc Verify Agent batch failed: {e}")
+                for i in loaded:
+                    results[i] = {"error": f"AI Processing Error: {str(e)}"}
+        return results
+
+    def _load_image(self, input_data: dict) -> str:
+        """The document as a data URL: uploads are read from storage, anything else only over HTTP(S)."""
+        storage_key = input_data.get('storage_key')
+        file_url = input_data.get('image_url') or input_data.get('file_url')
+        if storage_key:
+            file_data = self.storage.read_bytes(storage_key)
+        elif file_url and file_url.startswith('http'):
+            file_data = self._download(file_url)
+        else:
+            raise ValueError("Unsupported file location")
+
+        kind = filetype.guess(file_data)
+        mime_type = kind.mime if kind else 'application/octet-stream'
+        return f"data:{mime_type};base64,{base64.b64encode(file_data).decode('utf-8')}"
+
+    def _download(self, url: str) -> bytes:
+        """Fetch an external document, refusing anything over document_max_bytes."""
+        with httpx.stream("GET", url, timeout=30.0, follow_redirects=True) as response:
+            response.raise_for_status()
+            data = bytearray()
+            for chunk in response.iter_bytes():
+                data.extend(chunk)
+                if len(data) > settings.document_max_bytes:
+                    raise ValueError(f"Document exceeds {settings.document_max_bytes} bytes")
+        return bytes(data)
 
 # Use OpenAI for this agent
 doc_verify_agent = DocVerifyAgent(model_name="gpt-4o", provider="openai")
@@ -1,5 +1,7 @@
 from .base import BaseAgent
-from pydantic import BaseModel, Field
+from .prompts import prompt_registry
+from .policy import normalise_confidence
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 
 # Define the output schema for the Intake Agent
@@ -20,7 +22,13 @@ class IntakeOutput(BaseModel):
     indemnitor: IndemnitorInfo
     bond_amount: float
     flags: List[str] = []
-    confidence_score: float
+    confidence_score: float = Field(description="Confidence in the extraction, from 0.0 (guessing) to 1.0 (certain)")
+
+    @field_validator("confidence_score")
+    @classmethod
+    def _fraction(cls, value: float) -> float:
+        # Models sometimes answer on a 0-100 scale despite the description
+        return normalise_confidence(value, 1)
 
 class IntakeAgent(BaseAgent):
     def run(self, raw_input: dict) -> dict:
@@ -28,29 +36,10 @@ class IntakeAgent(BaseAgent):
         Extracts structured data from raw intake parsing.
         input_data: {'raw_text': '...'} or {'transcript': '...'}
         """
-        prompt = """
-        You are an expert Bail Intake Specialist. 
-        Your goal is to extract structured information from the provided raw text or notes.
-        
-        Extract:
-        - Defendant Name (normalize format)
-        - Jail Location
-        - Charges
-        - Bond Amount (number only)
-        - Indemnitor Name, Relationship, Phone, Income
-        
-        Flags to set:
-        - "felony" if charges imply felony
-        - "high_bond" if bond > 20000
-        - "out_of_county" if jail is not local (assume local is 'Harris')
-        
-        Return JSON matching the schema.
-        """
-        
-        return self._call_gemini(
-            prompt=prompt,
-            response_schema=IntakeOutput,
-            context=raw_input
+        return self._call_prompt(
+            prompt_registry.get("intake"),
+            IntakeOutput,
+            context=self._context(raw_input).text
         )
 
 intake_agent = IntakeAgent()
@@ -0,0 +1,177 @@
+"""
+Client-side back-pressure for LLM calls.
+
+Every agent call takes one request token and its estimated prompt tokens from
+two token buckets before it is sent. Callers that can't be admitted queue per
+priority class; the head of the highest-priority non-empty queue is always
+admitted first, and each class has a bounded queue and a deadline so a burst
+of batch work can never hold up an interactive copilot message.
+
+Limits are per process: with N workers, set the per-minute budgets to 1/N of
+the provider quota.
+"""
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable, Dict, Optional
+import threading
+import time
+
+from ..config import settings
+from ..telemetry.metrics import registry
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # A person is waiting on the response (copilot chat)
+    URGENT = 1       # GET_OUT_TODAY intakes
+    STANDARD = 2     # Regular case processing
+    BATCH = 3        # Bulk re-scoring and other background work
+
+
+# Seconds a call may wait in the queue before giving up
+DEFAULT_DEADLINES = {
+    Priority.INTERACTIVE: 10.0,
+    Priority.URGENT: 30.0,
+    Priority.STANDARD: 60.0,
+    Priority.BATCH: 300.0,
+}
+
+QUEUE_DEPTH = registry.gauge("bondpath_llm_queue_depth", "LLM calls waiting for rate-limit capacity", ["priority"])
+QUEUE_WAIT = registry.summary("bondpath_llm_queue_wait_seconds", "Time LLM calls waited for rate-limit capacity", ["priority"])
+REJECTED = registry.counter("bondpath_llm_rejected", "LLM calls rejected by the client-side limiter", ["priority", "reason"])
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class QueueFullError(RateLimitExceeded):
+    pass
+
+
+class RateLimitTimeout(RateLimitExceeded):
+    pass
+
+
+class TokenBucket:
+    """Not thread-safe on its own; LLMRateLimiter serialises access."""
+
+    def __init__(self, rate_per_second: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken. Requests larger than the bucket wait for a full bucket."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) the difference between estimated and actual usage."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class LLMRateLimiter:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_queue_depth: int = 100,
+                 burst_seconds: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.max_queue_depth = max_queue_depth
+        self.requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60 * burst_seconds), clock)
+        self.tokens = TokenBucket(tokens_per_minute / 60, max(1.0, tokens_per_minute / 60 * burst_seconds), clock)
+        self._queues: Dict[Priority, deque] = {p: deque() for p in Priority}
+        self._cond = threading.Condition()
+
+    def _is_next(self, ticket: object, priority: Priority) -> bool:
+        if self._queues[priority][0] is not ticket:
+            return False
+        return all(not self._queues[p] for p in Priority if p < priority)
+
+    def queue_depth(self, priority: Priority) -> int:
+        return len(self._queues[priority])
+
+    def acquire(self, priority: Priority = Priority.STANDARD, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Block until the call may be sent. Returns the seconds spent waiting.
+        Raises QueueFullError if the priority's queue is full, RateLimitTimeout after the deadline.
+        """
+        timeout = DEFAULT_DEADLINES[priority] if timeout is None else timeout
+        start = self.clock()
+        deadline = start + timeout
+        ticket = object()
+        queue = self._queues[priority]
+
+        with self._cond:
+            if len(queue) >= self.max_queue_depth:
+                REJECTED.inc(priority=priority.name, reason="queue_full")
+                raise QueueFullError(f"LLM queue for {priority.name} is full ({self.max_queue_depth} waiting)")
+            queue.append(ticket)
+            QUEUE_DEPTH.set(len(queue), priority=priority.name)
+            try:
+                while True:
+                    wait = None
+                    if self._is_next(ticket, priority):
+                        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                        if wait == 0:
+                            self.requests.consume(1)
+                            self.tokens.consume(tokens)
+                            break
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        REJECTED.inc(priority=priority.name, reason="deadline")
+                        raise RateLimitTimeout(f"Waited {timeout:.1f}s for LLM capacity ({priority.name})")
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                queue.remove(ticket)
+                QUEUE_DEPTH.set(len(queue), priority=priority.name)
+                self._cond.notify_all()
+
+        waited = self.clock() - start
+        QUEUE_WAIT.observe(waited, priority=priority.name)
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the token bucket once real usage is known."""
+        with self._cond:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+            self._cond.notify_all()
+
+
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.STANDARD)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def priority_scope(priority: Priority):
+    """Run LLM calls made inside the block (including graph nodes) at `priority`."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# Singleton instance
+llm_limiter = LLMRateLimiter(
+    requests_per_minute=settings.llm_requests_per_minute,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    max_queue_depth=settings.llm_queue_max_depth,
+)
@@ -0,0 +1,102 @@
+"""
+Per-agent model tiering.
+
+Each agent runs on its small model first and escalates to the large model only
+when the small answer fails schema validation or reports a confidence below the
+agent's threshold. Model names are provider-specific; when the router sends a
+call to a provider that doesn't serve the named model, that provider uses its
+own model for the same tier.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from ..config import settings
+from ..telemetry.metrics import registry
+
+SMALL = "small"
+LARGE = "large"
+
+TIER_CALLS = registry.counter("bondpath_agent_tier_calls", "Agent calls answered per model tier", ["agent", "tier"])
+ESCALATIONS = registry.counter("bondpath_agent_escalations", "Small-model answers escalated to the large model", ["agent", "reason"])
+LATENCY_SAVED = registry.counter(
+    "bondpath_agent_latency_saved_seconds",
+    "Estimated latency saved by small-model answers, net of time wasted on escalated attempts", ["agent"]
+)
+
+
+def normalise_confidence(value: float, scale: float) -> float:
+    """Brings a score onto `scale` (1 or 100): a 0-1 score given as a percentage is divided down, then clamped."""
+    if scale == 1 and 1 < value <= 100:
+        value /= 100
+    return min(max(float(value), 0.0), scale)
+
+
+@dataclass(frozen=True)
+class ModelPolicy:
+    small_model: str
+    large_model: str
+    confidence_field: Optional[str] = None
+    min_confidence: float = 0.0
+    confidence_scale: float = 100.0
+
+    @property
+    def cascades(self) -> bool:
+        return self.small_model != self.large_model
+
+    def needs_escalation(self, result: dict) -> bool:
+        if not self.confidence_field:
+            return False
+        confidence = result.get(self.confidence_field)
+        if not isinstance(confidence, (int, float)):
+            return True
+        return normalise_confidence(confidence, self.confidence_scale) < self.min_confidence
+
+
+def _policy(confidence_field: Optional[str] = None, min_confidence: float = 0.0, small: bool = True, large: bool = True,
+            confidence_scale: float = 100.0) -> ModelPolicy:
+    return ModelPolicy(
+        small_model=settings.llm_small_model if small else settings.llm_large_model,
+        large_model=settings.llm_large_model if large else settings.llm_small_model,
+        confidence_field=confidence_field,
+        min_confidence=min_confidence,
+        confidence_scale=confidence_scale,
+    )
+
+
+AGENT_POLICIES = {
+    # confidence_score is 0-1 for intake, 0-100 for readiness and document verification
+    "IntakeAgent": _policy("confidence_score", 0.7, confidence_scale=1),
+    "ReadinessAgent": _policy("confidence_score", 60),
+    "DocVerifyAgent": _policy("confidence_score", 70),
+    # Risk scores feed underwriting decisions and carry no confidence signal to escalate on
+    "RiskAgent": _policy(small=False),
+    # Cheap, low-stakes text: escalate only if the small model breaks the schema
+    "ChatAgent": _policy(),
+    "ExplanationAgent": _policy(large=False),
+}
+
+
+def policy_for(agent_name: str, default_model: str) -> ModelPolicy:
+    if not settings.llm_tiering_enabled:
+        large = AGENT_POLICIES[agent_name].large_model if agent_name in AGENT_POLICIES else default_model
+        return ModelPolicy(small_model=large, large_model=large)
+    return AGENT_POLICIES.get(agent_name) or ModelPolicy(small_model=default_model, large_model=default_model)
+
+
+def tiering_report() -> dict:
+    """Per-agent cascade effectiveness since process start."""
+    report = {}
+    for agent, policy in AGENT_POLICIES.items():
+        small = TIER_CALLS.value(agent=agent, tier=SMALL)
+        escalated = sum(ESCALATIONS.value(agent=agent, reason=r) for r in ("schema", "low_confidence"))
+        attempts = small + escalated
+        report[agent] = {
+            "small_model": policy.small_model,
+            "large_model": policy.large_model,
+            "small_answers": small,
+            "large_answers": TIER_CALLS.value(agent=agent, tier=LARGE),
+            "escalations": escalated,
+            "escalation_rate": round(escalated / attempts, 4) if attempts else None,
+            "latency_saved_seconds": round(LATENCY_SAVED.value(agent=agent), 3),
+        }
+    return report
@@ -0,0 +1,324 @@
+"""
+LLM provider adapters behind a common interface so the router can pick between them.
+
+Messages always use the OpenAI chat format; adapters translate as needed.
+
+The SDKs (`openai`, `google.generativeai`) are imported and their clients built
+on a provider's first call, not at import, so they stay off the startup path.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, get_args, get_origin
+import json
+import os
+import socket
+import threading
+
+from pydantic import BaseModel, ValidationError
+
+from ..config import settings
+
+
+GEMINI_API_HOST = "generativelanguage.googleapis.com"
+
+# Providers bill a high-detail image at roughly this many prompt tokens
+IMAGE_TOKEN_ESTIMATE = 1000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting before a call is made."""
+    return len(text or "") // 4
+
+
+@dataclass
+class LLMRequest:
+    messages: List[Dict[str, Any]]
+    response_format: Optional[type] = None  # Pydantic model for structured output
+    model: Optional[str] = None             # Agent's preferred model; used by the provider that serves it
+    tier: str = "large"                     # Fallback when the provider doesn't serve `model`: "small" or "large"
+    prompt: Optional[str] = None            # Prompt template id, e.g. "risk@v1"
+
+    @property
+    def has_images(self) -> bool:
+        for message in self.messages:
+            content = message.get("content")
+            if isinstance(content, list) and any(part.get("type") == "image_url" for part in content):
+                return True
+        return False
+
+    @property
+    def estimated_prompt_tokens(self) -> int:
+        """Rough pre-send estimate (~4 characters per token, flat cost per image)."""
+        texts, images = [], 0
+        for message in self.messages:
+            content = message.get("content")
+            if isinstance(content, list):
+                for part in content:
+                    if part.get("type") == "image_url":
+                        images += 1
+                    else:
+                        texts.append(part.get("text", ""))
+            else:
+                texts.append(content or "")
+        return estimate_tokens("".join(texts)) + images * IMAGE_TOKEN_ESTIMATE
+
+
+@dataclass
+class LLMResponse:
+    data: dict
+    provider: str
+    model: str
+    usage: Any = None
+    retries: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class LLMStream:
+    """
+    Text deltas from a streamed completion. `usage` is filled in once the provider
+    reports it (normally with the last chunk); close() aborts the upstream request.
+    """
+
+    def __init__(self, provider: str, model: str, chunks: Iterable[Tuple[Optional[str], Any]],
+                 close: Optional[Callable[[], None]] = None):
+        self.provider = provider
+        self.model = model
+        self.usage = None
+        self._chunks = chunks
+        self._close = close
+
+    def __iter__(self) -> Iterator[str]:
+        for text, usage in self._chunks:
+            if usage is not None:
+                self.usage = usage
+            if text:
+                yield text
+
+    def close(self):
+        if self._close:
+            self._close()
+
+
+class ProviderError(Exception):
+    """Raised by a provider; `rate_limited` marks 429 / quota exhaustion."""
+
+    def __init__(self, provider: str, message: str, rate_limited: bool = False):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.rate_limited = rate_limited
+
+
+class SchemaValidationError(ProviderError):
+    """The provider answered but the output didn't match the requested schema (a model problem, not an outage)."""
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    if getattr(e, "rate_limited", False):
+        return True
+    code = getattr(e, "status_code", None) or getattr(e, "code", None)
+    return code == 429 or "429" in str(e) or "ResourceExhausted" in type(e).__name__
+
+
+class LLMProvider:
+    name = "base"
+    default_model = ""
+    tier_models: Dict[str, str] = {}
+
+    def owns_model(self, model: Optional[str]) -> bool:
+        return False
+
+    def resolve_model(self, request: LLMRequest) -> str:
+        if self.owns_model(request.model):
+            return request.model
+        return self.tier_models.get(request.tier, self.default_model)
+
+    def supports(self, request: LLMRequest) -> bool:
+        return True
+
+    def complete(self, request: LLMRequest) -> LLMResponse:
+        raise NotImplementedError
+
+    def stream(self, request: LLMRequest) -> LLMStream:
+        """Free-text streaming completion; `request.response_format` is ignored."""
+        raise NotImplementedError
+
+    def warm(self, timeout: float):
+        """Load the SDK and open a connection ahead of the first real call. Raises if the provider is unreachable."""
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, default_model: str = "gpt-4o", client: Any = None):
+        self.default_model = default_model
+        self.tier_models = {"small": "gpt-4o-mini", "large": default_model}
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        api_key=settings.openai_api_key or os.environ.get("OPENAI_API_KEY"),
+                        base_url=settings.openai_base_url,
+                    )
+        return self._client
+
+    def owns_model(self, model: Optional[str]) -> bool:
+        return bool(model) and not model.startswith("gemini")
+
+    def warm(self, timeout: float):
+        from openai import APIStatusError
+
+        try:
+            # The copy shares the client's connection pool, so the TLS session is kept for real calls
+            self.client.with_options(timeout=timeout, max_retries=0).models.list()
+        except APIStatusError:
+            pass  # The server answered (e.g. a key without models.list access): the connection is up
+
+    def complete(self, request: LLMRequest) -> LLMResponse:
+        from openai import LengthFinishReasonError
+
+        model = self.resolve_model(request)
+        try:
+            if request.response_format:
+                raw = self.client.beta.chat.completions.with_raw_response.parse(
+                    model=model,
+                    messages=request.messages,
+                    response_format=request.response_format,
+                )
+                completion = raw.parse()
+                parsed = completion.choices[0].message.parsed
+                if parsed is None:
+                    raise SchemaValidationError(self.name, f"{model} refused or returned no parsable output")
+                data = parsed.model_dump()
+            else:
+                raw = self.client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=request.messages,
+                    response_format={"type": "json_object"}
+                )
+                completion = raw.parse()
+                data = json.loads(completion.choices[0].message.content)
+        except (LengthFinishReasonError, ValidationError, json.JSONDecodeError) as e:
+            raise SchemaValidationError(self.name, f"{model}: {e}") from e
+        return LLMResponse(
+            data=data,
+            provider=self.name,
+            model=model,
+            usage=getattr(completion, "usage", None),
+            retries=getattr(raw, "retries_taken", 0) or 0,
+        )
+
+    def stream(self, request: LLMRequest) -> LLMStream:
+        model = self.resolve_model(request)
+        upstream = self.client.chat.completions.create(
+            model=model,
+            messages=request.messages,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        chunks = (
+            (chunk.choices[0].delta.content if chunk.choices else None, chunk.usage)
+            for chunk in upstream
+        )
+        # Closing the response drops the HTTP connection, which stops generation upstream
+        return LLMStream(self.name, model, chunks, close=upstream.close)
+
+
+def _has_free_form_object(schema: type) -> bool:
+    """Gemini's response_schema can't express open-ended dicts (e.g. `extracted_data: dict`)."""
+    for info in schema.model_fields.values():
+        annotation = info.annotation
+        candidates = [annotation, *get_args(annotation)]
+        for candidate in candidates:
+            if candidate is dict or get_origin(candidate) is dict:
+                return True
+            if isinstance(candidate, type) and issubclass(candidate, BaseModel) and _has_free_form_object(candidate):
+                return True
+    return False
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, default_model: str = "gemini-2.0-flash", api_key: Optional[str] = None):
+        self.default_model = default_model
+        self.tier_models = {"small": "gemini-2.0-flash-lite", "large": default_model}
+        self.api_key = api_key or settings.gemini_api_key
+        self._configured = False
+        self._configure_lock = threading.Lock()
+
+    def _genai(self):
+        """The SDK module, configured with this provider's key on first use."""
+        import google.generativeai as genai
+
+        if not self._configured:
+            with self._configure_lock:
+                if not self._configured:
+                    genai.configure(api_key=self.api_key)
+                    self._configured = True
+        return genai
+
+    def owns_model(self, model: Optional[str]) -> bool:
+        return bool(model) and model.startswith("gemini")
+
+    def warm(self, timeout: float):
+        # The SDK opens its own connections per call; loading it and resolving the host is what can be done ahead
+        self._genai()
+        socket.getaddrinfo(GEMINI_API_HOST, 443)
+
+    def supports(self, request: LLMRequest) -> bool:
+        # Vision requests use OpenAI's image_url parts; free-form dict schemas can't be enforced
+        if request.has_images:
+            return False
+        return request.response_format is None or not _has_free_form_object(request.response_format)
+
+    def _model(self, request: LLMRequest):
+        model_name = self.resolve_model(request)
+        system = "\n\n".join(m["content"] for m in request.messages if m["role"] == "system")
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [m["content"]]}
+            for m in request.messages if m["role"] != "system"
+        ]
+        return model_name, self._genai().GenerativeModel(model_name, system_instruction=system or None), contents
+
+    def complete(self, request: LLMRequest) -> LLMResponse:
+        model_name, model, contents = self._model(request)
+
+        config = {"response_mime_type": "application/json"}
+        if request.response_format:
+            config["response_schema"] = request.response_format
+
+        try:
+            response = model.generate_content(contents, generation_config=config)
+        except Exception as e:
+            raise ProviderError(self.name, str(e), rate_limited=is_rate_limit_error(e)) from e
+
+        try:
+            data = json.loads(response.text)
+            if request.response_format:
+                data = request.response_format.model_validate(data).model_dump()
+        except (ValueError, ValidationError) as e:
+            raise SchemaValidationError(self.name, f"{model_name}: {e}") from e
+        return LLMResponse(data=data, provider=self.name, model=model_name, usage=getattr(response, "usage_metadata", None))
+
+    def stream(self, request: LLMRequest) -> LLMStream:
+        model_name, model, contents = self._model(request)
+        try:
+            response = model.generate_content(contents, stream=True)
+        except Exception as e:
+            raise ProviderError(self.name, str(e), rate_limited=is_rate_limit_error(e)) from e
+        chunks = ((_gemini_text(chunk), getattr(chunk, "usage_metadata", None)) for chunk in response)
+        # The SDK has no explicit cancel; once the iterator is dropped no further chunks are pulled
+        return LLMStream(self.name, model_name, chunks)
+
+
+def _gemini_text(chunk) -> Optional[str]:
+    try:
+        return chunk.text
+    except ValueError:
+        # Chunks without text parts (e.g. the final usage-only chunk) raise on .text
+        return None
@@ -2,6 +2,8 @@ from .base import BaseAgent
 from pydantic import BaseModel
 from typing import List, Optional
 from ..rules.engine import rule_engine
+from .prompts import prompt_registry
+import json
 
 # Output Schema
 class ReadinessOutput(BaseModel):
@@ -13,8 +15,8 @@ class ReadinessOutput(BaseModel):
     quality_notes: Optional[str] = None
 
 class ReadinessAgent(BaseAgent):
-    def __init__(self):
-        super().__init__(model_name="gpt-4o", provider="openai")
+    def __init__(self, **kwargs):
+        super().__init__(model_name="gpt-4o", provider="openai", **kwargs)
 
     def run(self, case_data: dict) -> dict:
         """
@@ -40,35 +42,12 @@ class ReadinessAgent(BaseAgent):
             hard_blockers.append("Bond amount must be greater than 0")
 
         # 2. LLM Analysis (Soft Checks / Quality)
-        system_prompt = """You are an expert Bail Underwriter Assistant. 
-Review the following case data and identify any quality issues or specific risks that might cause an underwriter to reject it.
-
-Look for:
-- Vague collateral descriptions (e.g. "jewelry" instead of "Rolex Watch, Model X")
-- Missing or weak indemnitor details (e.g. no employer listed)
-- Inconsistent data (e.g. bond amount doesn't match typical charge severity if evident)
-
-Task:
-- Determine if this case looks ready for a professional underwriter to review.
-- Assign a confidence_score (0-100).
-- List specific warnings about data quality.
-- Provide brief quality_notes.
-"""
-        
-        user_prompt = f"""
-Data:
-{case_data}
-
-Hard Blockers found by system: {hard_blockers}
-"""
-        
         try:
-            llm_result = self._call_openai(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format=ReadinessOutput
+            llm_result = self._call_prompt(
+                prompt_registry.get("readiness"),
+                ReadinessOutput,
+                case_data=self._context(case_data).text,
+                hard_blockers=json.dumps(hard_blockers)
             )
             
             # Merge hard blockers if LLM missed them or just to be safe
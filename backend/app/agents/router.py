@@ -0,0 +1,284 @@
+"""
+Latency-aware routing across LLM providers.
+
+Each provider gets a rolling window of call outcomes and a circuit breaker.
+Requests go to the fastest healthy provider that supports them; if that call
+is still running after the provider's recent p95 latency, a hedge request is
+sent to the next candidate and whichever answers first wins.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+import contextvars
+import threading
+import time
+
+from ..config import settings
+from ..telemetry.metrics import registry, percentile
+from .providers import (
+    GeminiProvider, LLMProvider, LLMRequest, LLMResponse, LLMStream, OpenAIProvider, ProviderError, SchemaValidationError,
+    is_rate_limit_error
+)
+
+PROVIDER_DURATION = registry.summary("bondpath_llm_provider_duration_seconds", "Latency of LLM provider calls", ["provider"])
+PROVIDER_REQUESTS = registry.counter("bondpath_llm_provider_requests", "LLM provider calls by outcome", ["provider", "outcome"])
+HEDGED_REQUESTS = registry.counter("bondpath_llm_hedged_requests", "Hedge requests sent after the primary exceeded its p95", ["provider"])
+CIRCUIT_STATE = registry.gauge("bondpath_llm_circuit_state", "Circuit breaker state (0=closed, 1=half-open, 2=open)", ["provider"])
+
+
+class CircuitBreaker:
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30.0,
+                 rate_limit_cooldown_seconds: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.rate_limit_cooldown_seconds = rate_limit_cooldown_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if self.state == self.OPEN and self.clock() >= self._opened_until:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def available(self) -> bool:
+        """Whether a call could be admitted right now (does not reserve the half-open probe)."""
+        with self._lock:
+            self._refresh()
+            return self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self._probe_in_flight)
+
+    def allow(self) -> bool:
+        """Admit a call. In HALF_OPEN only a single probe is let through."""
+        with self._lock:
+            self._refresh()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, rate_limited: bool = False):
+        with self._lock:
+            self.consecutive_failures += 1
+            if rate_limited:
+                self._open(self.rate_limit_cooldown_seconds)
+            elif self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._open(self.cooldown_seconds)
+
+    def _open(self, seconds: float):
+        self.state = self.OPEN
+        self._opened_until = self.clock() + seconds
+        self._probe_in_flight = False
+
+
+class ProviderStats:
+    """Rolling window of (latency, ok, rate_limited) samples for one provider."""
+
+    def __init__(self, window: int = 100):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool, rate_limited: bool = False):
+        with self._lock:
+            self._samples.append((latency, ok, rate_limited))
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._samples)
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(latency for latency, ok, _ in self._samples if ok)
+        return percentile(latencies, q)
+
+    def error_rate(self) -> float:
+        with self._lock:
+            samples = list(self._samples)
+        return sum(1 for _, ok, _ in samples if not ok) / len(samples) if samples else 0.0
+
+    def rate_limited_count(self) -> int:
+        with self._lock:
+            return sum(1 for _, _, limited in self._samples if limited)
+
+
+class ProviderRouter:
+    def __init__(self, providers: List[LLMProvider], hedge: bool = True, hedge_min_samples: int = 20,
+                 window: int = 100, breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+                 max_workers: int = 16):
+        self.providers = providers
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.stats: Dict[str, ProviderStats] = {p.name: ProviderStats(window) for p in providers}
+        self.breakers: Dict[str, CircuitBreaker] = {p.name: breaker_factory() for p in providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def collect_circuit_state(self):
+        levels = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        for name, breaker in self.breakers.items():
+            breaker.available()  # Let expired OPEN breakers report HALF_OPEN
+            CIRCUIT_STATE.set(levels[breaker.state], provider=name)
+
+    def expected_latency(self, provider: LLMProvider) -> float:
+        """p50 latency inflated by the recent error rate. Unmeasured providers rank first so they get sampled."""
+        stats = self.stats[provider.name]
+        median = stats.latency_quantile(0.5)
+        if median is None:
+            return 0.0
+        return median / max(0.05, 1.0 - stats.error_rate())
+
+    def candidates(self, request: LLMRequest) -> List[LLMProvider]:
+        eligible = [
+            (self.expected_latency(p), index, p) for index, p in enumerate(self.providers)
+            if p.supports(request) and self.breakers[p.name].available()
+        ]
+        return [p for _, _, p in sorted(eligible, key=lambda item: (item[0], item[1]))]
+
+    def hedge_deadline(self, provider: LLMProvider) -> Optional[float]:
+        stats = self.stats[provider.name]
+        if not self.hedge or stats.sample_count < self.hedge_min_samples:
+            return None
+        return stats.latency_quantile(0.95)
+
+    def complete(self, request: LLMRequest) -> LLMResponse:
+        remaining = self.candidates(request)
+        if not remaining:
+            raise ProviderError("router", "No healthy provider supports this request")
+
+        last_error: Optional[Exception] = None
+        while remaining:
+            primary = remaining.pop(0)
+            if not self.breakers[primary.name].allow():
+                continue
+            try:
+                return self._call_with_hedge(primary, remaining, request)
+            except SchemaValidationError:
+                # The provider is healthy; the caller decides whether a bigger model should retry
+                raise
+            except Exception as e:
+                last_error = e
+                print(f"Provider {primary.name} failed, failing over: {e}")
+        raise last_error or ProviderError("router", "All providers are unavailable")
+
+    def stream(self, request: LLMRequest) -> LLMStream:
+        """
+        Open a streamed completion on the best candidate. Failover only happens while
+        opening the stream; once text has been forwarded to a caller it can't be retried.
+        Streams are never hedged and don't feed the latency window, which tracks full completions.
+        """
+        last_error: Optional[Exception] = None
+        for provider in self.candidates(request):
+            if not self.breakers[provider.name].allow():
+                continue
+            try:
+                stream = provider.stream(request)
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                self.breakers[provider.name].record_failure(rate_limited=rate_limited)
+                PROVIDER_REQUESTS.inc(provider=provider.name, outcome="rate_limited" if rate_limited else "error")
+                last_error = e
+                print(f"Provider {provider.name} failed to open stream, failing over: {e}")
+                continue
+            self.breakers[provider.name].record_success()
+            PROVIDER_REQUESTS.inc(provider=provider.name, outcome="ok")
+            return stream
+        raise last_error or ProviderError("router", "No healthy provider can stream this request")
+
+    def _call_with_hedge(self, primary: LLMProvider, alternates: List[LLMProvider], request: LLMRequest) -> LLMResponse:
+        deadline = self.hedge_deadline(primary)
+        if deadline is None or not alternates:
+            return self._invoke(primary, request)
+
+        futures = {self._submit(primary, request)}
+        done, _ = wait(futures, timeout=deadline)
+        if not done:
+            backup = next((p for p in alternates if self.breakers[p.name].allow()), None)
+            if backup is not None:
+                alternates.remove(backup)
+                HEDGED_REQUESTS.inc(provider=backup.name)
+                futures.add(self._submit(backup, request))
+
+        # First successful answer wins; the loser keeps running but its result is discarded
+        errors = []
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+    def _submit(self, provider: LLMProvider, request: LLMRequest):
+        ctx = contextvars.copy_context()
+        return self._executor.submit(ctx.run, self._invoke, provider, request)
+
+    def _invoke(self, provider: LLMProvider, request: LLMRequest) -> LLMResponse:
+        start = time.perf_counter()
+        try:
+            response = provider.complete(request)
+        except SchemaValidationError:
+            # The provider answered, just not in shape: healthy as far as routing goes. Recording the success
+            # also releases a half-open probe, which would otherwise keep the provider unavailable for good.
+            elapsed = time.perf_counter() - start
+            self.stats[provider.name].record(elapsed, ok=True)
+            self.breakers[provider.name].record_success()
+            PROVIDER_REQUESTS.inc(provider=provider.name, outcome="schema_error")
+            raise
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            rate_limited = is_rate_limit_error(e)
+            self.stats[provider.name].record(elapsed, ok=False, rate_limited=rate_limited)
+            self.breakers[provider.name].record_failure(rate_limited=rate_limited)
+            PROVIDER_REQUESTS.inc(provider=provider.name, outcome="rate_limited" if rate_limited else "error")
+            raise
+
+        elapsed = time.perf_counter() - start
+        self.stats[provider.name].record(elapsed, ok=True)
+        self.breakers[provider.name].record_success()
+        PROVIDER_DURATION.observe(elapsed, provider=provider.name)
+        PROVIDER_REQUESTS.inc(provider=provider.name, outcome="ok")
+        return response
+
+
+def _build_provider(name: str) -> LLMProvider:
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "gemini":
+        return GeminiProvider()
+    raise ValueError(f"Unknown LLM provider '{name}'")
+
+
+def build_default_router() -> ProviderRouter:
+    providers = []
+    for name in settings.llm_providers:
+        try:
+            providers.append(_build_provider(name))
+        except Exception as e:
+            print(f"Warning: Failed to initialize {name} provider: {e}")
+    router = ProviderRouter(
+        providers,
+        hedge=settings.llm_hedge_enabled,
+        breaker_factory=lambda: CircuitBreaker(
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            cooldown_seconds=settings.llm_circuit_cooldown_seconds,
+        ),
+    )
+    registry.register_collector(router.collect_circuit_state)
+    return router
+
+
+# Singleton instance
+llm_router = build_default_router()
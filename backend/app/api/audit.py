@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from ..database import get_db
+from ..database import get_async_read_db
 from ..models.audit import AuditLog
 
 router = APIRouter(prefix="/audit", tags=["audit"])
@@ -20,10 +21,13 @@ class AuditLogSchema(BaseModel):
     class Config:
         orm_mode = True
 
+def audit_log_query(case_id: str):
+    return select(AuditLog).where(AuditLog.case_id == case_id).order_by(AuditLog.timestamp.desc())
+
 @router.get("/case/{case_id}", response_model=List[AuditLogSchema])
-def get_case_audit_logs(case_id: str, db: Session = Depends(get_db)):
+async def get_case_audit_logs(case_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """
     Retrieve all audit logs for a specific case.
     """
-    logs = db.query(AuditLog).filter(AuditLog.case_id == case_id).order_by(AuditLog.timestamp.desc()).all()
-    return logs
+    result = await db.execute(audit_log_query(case_id))
+    return result.scalars().all()
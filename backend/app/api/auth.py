@@ -44,3 +44,14 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
         return payload 
     except jwt.JWTError:
         raise credentials_exception
+
+
+# Roles that work every case; anyone else sees the cases assigned to them and the unassigned intake queue
+CASE_WIDE_ROLES = {"ADMIN", "UW"}
+
+
+def can_access_case(user: dict, case) -> bool:
+    if user.get("role") in CASE_WIDE_ROLES:
+        return True
+    owners = {case.assigned_to, case.advisor_id} - {None}
+    return not owners or user.get("user_id") in owners
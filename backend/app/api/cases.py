@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict
-from ..database import get_db
-import os
-import shutil
-from datetime import datetime, date
-from decimal import Decimal
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+from ..database import get_async_db, get_async_read_db, get_db
+from fastapi.concurrency import run_in_threadpool
 from ..models.case import Case as CaseModel
+from ..models.document import Document
 from ..schemas.case import Case, CaseCreate, CaseUpdate
 from ..api.auth import oauth2_scheme 
 from ..orchestrator.graph import app as orchestrator_app
 from ..orchestrator.state import CaseState
+from ..agents.limiter import Priority, priority_scope
+from ..agents.readiness import readiness_agent
+from ..services.document_service import DocumentTooLarge, document_service
+from ..services.facts_service import facts_service
+from ..services.verification_queue import PENDING, mark_pending, pending_result, verification_queue
+from ..storage import StorageError
+from ..telemetry.metrics import registry
 import uuid
 
 router = APIRouter(prefix="/cases", tags=["cases"])
@@ -57,16 +65,7 @@ def create_case(case: CaseCreate, db: Session = Depends(get_db)):
         initial_state = CaseState(
             case_id=str(db_case.id),
             current_state=db_case.state,
-            facts={
-                "defendant_name": f"{db_case.defendant_first_name} {db_case.defendant_last_name}",
-                "bond_amount": float(db_case.bond_amount),
-                "bond_type": db_case.bond_type,
-                "charge_severity": db_case.charge_severity,
-                "county": db_case.county,
-                "state": db_case.state_jurisdiction,
-                "intent_signal": db_case.intent_signal,
-                "fast_flags": db_case.fast_flags
-            },
+            facts=facts_service.project(db_case, "intake"),
             derived_facts={},
             blockers=[],
             next_actions=[],
@@ -75,7 +74,10 @@ def create_case(case: CaseCreate, db: Session = Depends(get_db)):
             history=[]
         )
         
-        final_state = orchestrator_app.invoke(initial_state)
+        # Defendants who want out today jump ahead of routine intakes for LLM capacity
+        priority = Priority.URGENT if db_case.intent_signal == "GET_OUT_TODAY" else Priority.STANDARD
+        with priority_scope(priority):
+            final_state = orchestrator_app.invoke(initial_state)
         
         # Update DB with results
         db_case.state = final_state['current_state']
@@ -99,43 +101,63 @@ def create_case(case: CaseCreate, db: Session = Depends(get_db)):
     return db_case
 
 
+def case_list_query(skip: int = 0, limit: int = 100, state: Optional[str] = None, assigned_to: Optional[str] = None,
+                    advisor_id: Optional[str] = None, booking_number: Optional[str] = None,
+                    updated_since: Optional[datetime] = None):
+    """Newest cases first, optionally filtered; every filter is backed by an index on cases."""
+    query = select(CaseModel)
+    if state:
+        query = query.where(CaseModel.state == state)
+    if assigned_to:
+        query = query.where(CaseModel.assigned_to == assigned_to)
+    if advisor_id:
+        query = query.where(CaseModel.advisor_id == advisor_id)
+    if booking_number:
+        query = query.where(CaseModel.booking_number == booking_number)
+    if updated_since:
+        query = query.where(CaseModel.updated_at > updated_since)
+    return query.order_by(CaseModel.created_at.desc(), CaseModel.id.desc()).offset(skip).limit(limit)
+
 @router.get("/", response_model=List[Case])
-def read_cases(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    cases = db.query(CaseModel).offset(skip).limit(limit).all()
-    return cases
+async def read_cases(skip: int = 0, limit: int = 100, state: Optional[str] = None, assigned_to: Optional[str] = None,
+                     advisor_id: Optional[str] = None, booking_number: Optional[str] = None,
+                     updated_since: Optional[datetime] = None, db: AsyncSession = Depends(get_async_read_db)):
+    result = await db.execute(case_list_query(skip, limit, state, assigned_to, advisor_id, booking_number, updated_since))
+    return result.scalars().all()
 
 @router.get("/{case_id}", response_model=Case)
-def read_case(case_id: str, db: Session = Depends(get_db)):
-    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
+async def read_case(case_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    db_case = await db.get(CaseModel, case_id)
     if db_case is None:
         raise HTTPException(status_code=404, detail="Case not found")
     return db_case
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+DOCUMENT_TYPES = ("booking_sheet", "defendant_id", "indemnitor_id", "gov_id", "collateral_doc", "other")
+UPLOAD_BYTES = registry.counter("bondpath_upload_bytes", "Bytes received through document uploads", ["document_type"])
+UPLOAD_SIZE = registry.histogram(
+    "bondpath_upload_file_size_bytes", "Size distribution of uploaded documents", ["document_type"],
+    buckets=(16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+)
 
-@router.post("/{case_id}/documents")
-async def upload_document(
-    case_id: str, 
-    request: Request,
-    file: UploadFile = File(...), 
-    document_type: str = "other", 
-    db: Session = Depends(get_db)
-):
-    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
-    if db_case is None:
-        raise HTTPException(status_code=404, detail="Case not found")
-        
-    # Secure filename
-    safe_filename = "".join(x for x in file.filename if x.isalnum() or x in "._-")
-    file_path = os.path.join(UPLOAD_DIR, f"{case_id}_{document_type}_{safe_filename}")
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+async def _store_upload(db: Session, db_case: CaseModel, request: Request, file: UploadFile, document_type: str) -> Tuple[Document, dict]:
+    """Store one upload and link it from the case (not committed); mark_pending then shows it on the case."""
+    # Hashing and writing to storage block, so they run off the event loop
+    try:
+        document = await run_in_threadpool(
+            document_service.save, db, db_case.id, document_type, file.filename, file.content_type, file.file
+        )
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except StorageError as e:
+        print(f"Document storage failed: {e}")
+        raise HTTPException(status_code=503, detail="Document storage unavailable")
+
+    metric_type = document_type if document_type in DOCUMENT_TYPES else "other"
+    UPLOAD_BYTES.inc(document.size, document_type=metric_type)
+    UPLOAD_SIZE.observe(document.size, document_type=metric_type)
         
     # URL construction
-    base_url = str(request.base_url).rstrip("/")
-    file_url = f"{base_url}/static/{os.path.basename(file_path)}"
+    file_url = document_service.url(document, str(request.base_url))
     
     # Update model automatically
     if document_type == "booking_sheet":
@@ -149,44 +171,64 @@ async def upload_document(
     elif document_type == "collateral_doc":
         db_case.collateral_doc_url = file_url
         
-    # Trigger AI Verification
-    try:
-        # Convert case to dict for agent
-        case_data = {
-            "defendant_first_name": db_case.defendant_first_name,
-            "defendant_last_name": db_case.defendant_last_name,
-            "defendant_dob": db_case.defendant_dob,
-            "booking_number": db_case.booking_number,
-            "charges": db_case.charges
-        }
-        
-        verification_result = doc_verify_agent.run({
-            "file_url": file_path, # Pass absolute path
-            "case_data": case_data,
-            "doc_type": document_type
-        })
-        
-        # Update verified status
-        current_verified = dict(db_case.documents_verified) if db_case.documents_verified else {}
-        current_verified[document_type] = verification_result
-        db_case.documents_verified = current_verified
-        
-    except Exception as e:
-        print(f"Verification failed: {e}")
-        # Don't fail the upload just because AI didn't work
-        pass
-        
-    db.commit()
-    return {
+    # Verification runs in the background; the case shows PENDING until a worker publishes the result
+    document.verification_status = PENDING
+
+    return document, {
+        "id": document.id,
         "url": file_url, 
         "filename": file.filename,
-        "verification": db_case.documents_verified.get(document_type)
+        "verification": pending_result(document)
     }
 
+@router.post("/{case_id}/documents")
+async def upload_document(
+    case_id: str, 
+    request: Request,
+    file: UploadFile = File(...), 
+    document_type: str = "other", 
+    db: Session = Depends(get_db)
+):
+    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
+    if db_case is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    document, uploaded = await _store_upload(db, db_case, request, file, document_type)
+    mark_pending(db, db_case, [document])
+    db.commit()
+    verification_queue.submit(uploaded["id"], document_type)
+    return uploaded
+
+@router.post("/{case_id}/documents/batch")
+async def upload_documents(
+    case_id: str,
+    request: Request,
+    files: List[UploadFile] = File(...),
+    document_types: List[str] = Query(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-package submission: the i-th file is of the i-th document type (one of each). The documents
+    are verified together, in one vision call, and cross-checked against each other.
+    """
+    if len(files) != len(document_types):
+        raise HTTPException(status_code=400, detail="Give one document_type per file")
+    if len(set(document_types)) != len(document_types):
+        raise HTTPException(status_code=400, detail="Each document type can only be uploaded once per batch")
+    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
+    if db_case is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    stored = [await _store_upload(db, db_case, request, f, t) for f, t in zip(files, document_types)]
+    mark_pending(db, db_case, [document for document, _ in stored])
+    db.commit()
+    verification_queue.submit_case(case_id, document_types)
+    return {"documents": [uploaded for _, uploaded in stored]}
+
 @router.patch("/{case_id}", response_model=Case)
-def update_case(case_id: str, case_update: CaseUpdate, db: Session = Depends(get_db)):
+async def update_case(case_id: str, case_update: CaseUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update case fields (used by Advisor and Underwriter)."""
-    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
+    db_case = await db.get(CaseModel, case_id)
     if db_case is None:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -195,8 +237,8 @@ def update_case(case_id: str, case_update: CaseUpdate, db: Session = Depends(get
     for field, value in update_data.items():
         setattr(db_case, field, value)
     
-    db.commit()
-    db.refresh(db_case)
+    await db.commit()
+    await db.refresh(db_case)
     return db_case
 
 @router.post("/{case_id}/assess-risk", response_model=Dict)
@@ -206,78 +248,12 @@ def reassess_risk(case_id: str, db: Session = Depends(get_db)):
     Called when Advisor submits case to Underwriter.
     """
     from ..agents.risk import risk_agent
-    
-    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
-    if db_case is None:
+
+    facts = facts_service.get(db, case_id, "risk")
+    if facts is None:
         raise HTTPException(status_code=404, detail="Case not found")
-    
-    # Build comprehensive facts dictionary with ALL available case data
-    facts = {
-        # Defendant Information
-        "defendant_first_name": db_case.defendant_first_name,
-        "defendant_last_name": db_case.defendant_last_name,
-        "defendant_name": f"{db_case.defendant_first_name} {db_case.defendant_last_name}",
-        "defendant_dob": str(db_case.defendant_dob) if db_case.defendant_dob else None,
-        "defendant_gender": db_case.defendant_gender,
-        "defendant_ssn_last4": db_case.defendant_ssn_last4,
-        # Fields not currently in DB model, optional for now
-        # "defendant_phone": db_case.defendant_phone,
-        # "defendant_email": db_case.defendant_email,
-        # "defendant_address": db_case.defendant_address,
-        # "defendant_city": db_case.defendant_city,
-        # "defendant_state": db_case.defendant_state,
-        # "defendant_zip": db_case.defendant_zip,
-        # "defendant_employer": db_case.defendant_employer,
-        # "defendant_occupation": db_case.defendant_occupation,
-        
-        # Incarceration Details
-        "jail_facility": db_case.jail_facility,
-        "county": db_case.county,
-        "state_jurisdiction": db_case.state_jurisdiction,
-        "booking_number": db_case.booking_number,
-        
-        # Bond Information
-        "bond_amount": float(db_case.bond_amount) if db_case.bond_amount else 0,
-        "bond_type": db_case.bond_type,
-        "charges": db_case.charges,
-        "charge_severity": db_case.charge_severity,
-        
-        # Indemnitor Information (Critical for risk assessment)
-        "indemnitor_first_name": db_case.indemnitor_first_name,
-        "indemnitor_last_name": db_case.indemnitor_last_name,
-        "indemnitor_relationship": db_case.indemnitor_relationship,
-        "indemnitor_phone": db_case.indemnitor_phone,
-        "indemnitor_email": db_case.indemnitor_email,
-        "indemnitor_address": db_case.indemnitor_address,
-        # Fields not currently in DB model
-        # "indemnitor_city": db_case.indemnitor_city,
-        # "indemnitor_state": db_case.indemnitor_state,
-        # "indemnitor_zip": db_case.indemnitor_zip,
-        # "indemnitor_employer": db_case.indemnitor_employer,
-        # "indemnitor_occupation": db_case.indemnitor_occupation,
-        # "indemnitor_ssn_last4": db_case.indemnitor_ssn_last4,
-        
-        # Financial Information
-        "premium_type": db_case.premium_type,
-        "payment_method": db_case.payment_method,
-        "down_payment_amount": float(db_case.down_payment_amount) if db_case.down_payment_amount else 0,
-        
-        # Document Availability (affects risk)
-        "has_booking_sheet": bool(db_case.booking_sheet_url),
-        "has_defendant_id": bool(db_case.defendant_id_url),
-        "has_indemnitor_id": bool(db_case.indemnitor_id_url),
-        "has_gov_id": bool(db_case.gov_id_url),
-        "has_collateral_doc": bool(db_case.collateral_doc_url),
-        
-        # Caller Information
-        "caller_name": db_case.caller_name,
-        "caller_relationship": db_case.caller_relationship,
-        
-        # Intent & Flags
-        "intent_signal": db_case.intent_signal,
-        "fast_flags": db_case.fast_flags,
-    }
-    
+    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
+
     try:
         # Run risk assessment with complete data
         risk_output = risk_agent.run(facts)
@@ -310,23 +286,12 @@ def check_case_readiness(case_id: str, db: Session = Depends(get_db)):
     """
     Run AI readiness check to see if the case is ready for underwriter review.
     """
-    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
-    if not db_case:
+    case_data = facts_service.get(db, case_id, "readiness")
+    if case_data is None:
         raise HTTPException(status_code=404, detail="Case not found")
+    db_case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
 
     try:
-        # Build comprehensive facts dictionary (reuse logic from reassess_risk or extract to helper)
-        # For now, we dump the model to dict, but specialized formatting helps the AI
-        case_data = {c.name: getattr(db_case, c.name) for c in db_case.__table__.columns}
-        
-        # Clean dates/decimals for JSON serialization
-        # (Pydantic/JSON encoder usually handles this, but agents prefer clean strings)
-        for k, v in case_data.items():
-            if isinstance(v, (datetime, date)):
-                case_data[k] = v.isoformat()
-            if isinstance(v, Decimal):
-                case_data[k] = float(v)
-
         # Run Agent
         readiness_output = readiness_agent.run(case_data)
         
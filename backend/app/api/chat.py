@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+import json
+import threading
 
-from ..database import get_db
-from ..models.case import Case
+from ..database import SessionLocal, get_db
+from ..models.conversation import Conversation
 from ..agents.chat import chat_agent
+from ..services.conversation_service import conversation_service
+from ..agents.limiter import Priority, RateLimitExceeded, priority_scope
 from ..api.auth import get_current_user
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -19,6 +25,26 @@ class ChatResponse(BaseModel):
     response: str
     suggested_actions: list[str]
 
+def build_context(request: ChatRequest, current_user: dict) -> dict:
+    """Per-request context; the case itself goes in the cached case block."""
+    return {
+        "page": request.page_context,
+        "user_role": current_user.get("role")
+    }
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def save_streamed_turn(conversation_id: str, question: str, answer: str):
+    """On its own session: the request's get_db session is closed by the time a streamed answer completes."""
+    db = SessionLocal()
+    try:
+        conversation = db.get(Conversation, conversation_id)
+        if conversation is not None:
+            conversation_service.record_turn(db, conversation, question, answer)
+    finally:
+        db.close()
+
 @router.post("/message", response_model=ChatResponse)
 async def chat_message(
     request: ChatRequest,
@@ -26,36 +52,112 @@ async def chat_message(
     current_user: dict = Depends(get_current_user)
 ):
     try:
-        context = {
-            "page": request.page_context,
-            "user_role": current_user.get("role")
-        }
-        
-        # If case_id is provided, fetch case details
-        if request.case_id:
-            case = db.query(Case).filter(Case.id == request.case_id).first()
-            if case:
-                # Construct a summary of the case for the agent
-                case_summary = {
-                    "id": case.id,
-                    "defendant": f"{case.defendant_first_name} {case.defendant_last_name}",
-                    "charges": case.charges,
-                    "bond_amount": case.bond_amount,
-                    "status": case.state,
-                    "risk_assessment": case.derived_facts.get('risk') if case.derived_facts else None,
-                    "missing_info": case.derived_facts.get('missing_info', []) if case.derived_facts else []
-                }
-                context["vehicle_case"] = case_summary
-        
-        # Run the agent
-        result = chat_agent.run(
-            query=request.message,
-            context=context,
-            role=current_user.get("role")
-        )
-        
+        conversation = conversation_service.get_or_create(db, current_user.get("sub"), request.case_id)
+
+        case_block = conversation_service.case_context(db, request.case_id)
+        history = conversation_service.history(conversation)
+
+        def ask():
+            # Ahead of background LLM work; set here because the priority is a contextvar of this thread
+            with priority_scope(Priority.INTERACTIVE):
+                return chat_agent.run(
+                    query=request.message,
+                    context=build_context(request, current_user),
+                    role=current_user.get("role"),
+                    case_block=case_block,
+                    history=history
+                )
+
+        # Waiting for a rate-limit slot and the provider blocks, so keep it off the event loop
+        result = await run_in_threadpool(ask)
+
+        # May summarise older turns with an LLM call, so keep it off the event loop
+        await run_in_threadpool(conversation_service.record_turn, db, conversation, request.message, result["response"])
         return result
-        
+
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=503, detail=f"Copilot is busy, please retry: {e}")
+    except Exception as e:
+        print(f"Chat Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/message/stream")
+async def chat_message_stream(
+    request: ChatRequest,
+    http_request: Request,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Server-sent events variant of /chat/message: `token` events carry text as it is
+    generated, then one `actions` event carries the suggested_actions. An `error`
+    event ends the stream if generation fails midway. The upstream completion is
+    closed as soon as the client disconnects.
+    """
+    conversation = conversation_service.get_or_create(db, current_user.get("sub"), request.case_id)
+    conversation_id = conversation.id
+    cancelled = threading.Event()
+    events = chat_agent.stream(
+        query=request.message,
+        context=build_context(request, current_user),
+        role=current_user.get("role"),
+        case_block=conversation_service.case_context(db, request.case_id),
+        history=conversation_service.history(conversation),
+        priority=Priority.INTERACTIVE,
+        cancelled=cancelled
+    )
+
+    # Wait for the first event here so queueing and provider failures still get a proper status code
+    try:
+        first = await run_in_threadpool(next, events, None)
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=503, detail=f"Copilot is busy, please retry: {e}")
     except Exception as e:
         print(f"Chat Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+    async def event_source():
+        event, answer, completed = first, [], False
+        try:
+            while event is not None:
+                yield sse_event(*event)
+                if event[0] == "token":
+                    answer.append(event[1]["text"])
+                completed = event[0] == "actions"
+                if await http_request.is_disconnected():
+                    break
+                event = await run_in_threadpool(next, events, None)
+        except Exception as e:
+            print(f"Chat Stream Error: {e}")
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            # Stops a worker thread still reading chunks, then closes the upstream request
+            cancelled.set()
+            try:
+                events.close()
+            except ValueError:
+                pass  # Generator is mid-chunk in a worker thread; it sees `cancelled` and closes itself
+
+        # Abandoned answers aren't remembered; the user never saw them in full
+        if completed:
+            try:
+                await run_in_threadpool(save_streamed_turn, conversation_id, request.message, "".join(answer))
+            except Exception as e:
+                print(f"Warning: Failed to save copilot turn: {e}")
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.delete("/conversation")
+def clear_conversation(
+    case_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Forget the copilot conversation for the current user on this case (or outside any case)."""
+    conversation = conversation_service.get_or_create(db, current_user.get("sub"), case_id)
+    conversation_service.clear(db, conversation)
+    return {"status": "cleared"}
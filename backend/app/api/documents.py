@@ -0,0 +1,186 @@
+"""
+Uploaded documents, served to signed-in users who can access the case.
+
+A document's content never changes (it is stored under its SHA-256), so
+responses carry the hash as a strong ETag and a long private cache lifetime:
+screens that show the same ID photo again load it from the browser cache or
+get a 304. Originals support Range requests; `?rendition=thumbnail|preview`
+returns a downscaled JPEG from the rendition cache.
+
+<img> tags and new tabs can't send the Authorization header, so they use a
+link from `POST /documents/{id}/link`: a `?token=` signed for that one
+document and user, valid for `document_link_seconds`. The session JWT itself
+never goes in a URL, where it would end up in access logs, browser history
+and Referer headers.
+"""
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import get_async_read_db
+from ..models.case import Case
+from ..models.document import Document
+from ..services.renditions import RENDERABLE_TYPES, RENDITIONS, UnsupportedRendition, rendition_cache
+from ..storage import ObjectNotFound, content_disposition, storage
+from .auth import can_access_case, get_current_user
+
+router = APIRouter(prefix="/documents", tags=["documents"])
+
+bearer_scheme = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
+
+RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+LINK_SCOPE = "document"
+
+
+class DocumentLink(BaseModel):
+    url: str
+    expires_at: datetime
+
+
+def sign_document_link(document_id: str, user: dict, expires_at: datetime) -> str:
+    # No `sub` claim, so get_current_user won't take it as a session token
+    claims = {"scope": LINK_SCOPE, "document_id": document_id, "user_id": user.get("user_id"),
+              "role": user.get("role"), "exp": expires_at}
+    return jwt.encode(claims, settings.jwt_secret, algorithm=settings.algorithm)
+
+
+async def document_reader(document_id: str, token: Optional[str] = None, bearer: Optional[str] = Depends(bearer_scheme)) -> dict:
+    """The signed-in user (Authorization header), or the user a `?token=` link for this document was issued to."""
+    if bearer or not token:
+        return await get_current_user(bearer or "")
+    try:
+        claims = jwt.decode(token, settings.jwt_secret, algorithms=[settings.algorithm])
+    except JWTError:
+        claims = {}
+    if claims.get("scope") != LINK_SCOPE or claims.get("document_id") != document_id:
+        raise HTTPException(status_code=401, detail="Invalid or expired document link")
+    return claims
+
+
+async def _accessible_document(db: AsyncSession, document_id: str, user: dict) -> Document:
+    document = await db.get(Document, document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    case = await db.get(Case, document.case_id)
+    if case is None or not can_access_case(user, case):
+        raise HTTPException(status_code=403, detail="Not allowed to access this case")
+    return document
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single `bytes=` range; None to send the whole body. Raises 416 if unsatisfiable."""
+    match = RANGE.fullmatch(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # Multiple or malformed ranges: a full 200 response is allowed
+    first, last = match.groups()
+    if first == "":
+        start, end = max(size - int(last), 0), size - 1  # Suffix range: the last N bytes
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    return etag in candidates or "*" in candidates
+
+
+def _cache_headers(document: Document, etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.document_cache_seconds}, immutable",
+        "Content-Disposition": content_disposition(document.filename),
+        "Referrer-Policy": "no-referrer",  # Pages opened from a ?token= link don't pass it on
+    }
+
+
+@router.post("/{document_id}/link", response_model=DocumentLink)
+async def create_document_link(
+    document_id: str,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """A short-lived URL for this document that works without the Authorization header."""
+    await _accessible_document(db, document_id, user)
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.document_link_seconds)
+    return DocumentLink(url=f"/documents/{document_id}?token={sign_document_link(document_id, user, expires_at)}",
+                        expires_at=expires_at)
+
+
+@router.api_route("/{document_id}", methods=["GET", "HEAD"])
+async def read_document(
+    document_id: str,
+    request: Request,
+    rendition: Optional[str] = None,
+    user: dict = Depends(document_reader),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Download an uploaded document or one of its renditions."""
+    document = await _accessible_document(db, document_id, user)
+    if rendition is not None:
+        return await _rendition(document, rendition, request)
+
+    etag = f'"{document.sha256}"'
+    headers = {**_cache_headers(document, etag), "Accept-Ranges": "bytes"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    # Object stores serve ranges themselves; the browser may reuse the redirect for half the link's lifetime
+    url = storage.presigned_url(document.storage_key, settings.s3_presign_seconds, document.filename,
+                                document.content_type, cache_control=headers["Cache-Control"])
+    if url:
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": f"private, max-age={settings.s3_presign_seconds // 2}"})
+
+    status, start, end = 200, 0, document.size - 1
+    requested = request.headers.get("range")
+    # If-Range: only honour the range if the client's copy is still the current content
+    if requested and request.headers.get("if-range", etag) == etag:
+        byte_range = parse_range(requested, document.size)
+        if byte_range:
+            (start, end), status = byte_range, 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{document.size}"
+    headers["Content-Length"] = str(end - start + 1 if document.size else 0)
+
+    if request.method == "HEAD":
+        return Response(status_code=status, headers=headers, media_type=document.content_type)
+    try:
+        chunks = storage.open(document.storage_key, start, end if document.size else None)
+    except ObjectNotFound:
+        raise HTTPException(status_code=404, detail="Document content missing")
+
+    # A sync iterator, so Starlette reads each chunk in a worker thread
+    return StreamingResponse(chunks, status_code=status, media_type=document.content_type, headers=headers)
+
+
+async def _rendition(document: Document, name: str, request: Request) -> Response:
+    if name not in RENDITIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown rendition; expected one of {', '.join(RENDITIONS)}")
+    if document.content_type not in RENDERABLE_TYPES:
+        raise HTTPException(status_code=415, detail=f"No {name} available for {document.content_type}")
+
+    etag = f'"{document.sha256}-{name}"'
+    headers = _cache_headers(document, etag)
+    headers["Content-Disposition"] = content_disposition(f"{name}-{document.filename}.jpg")
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data = await run_in_threadpool(
+            rendition_cache.get_or_create, document.sha256, RENDITIONS[name], lambda: storage.read_bytes(document.storage_key)
+        )
+    except ObjectNotFound:
+        raise HTTPException(status_code=404, detail="Document content missing")
+    except UnsupportedRendition as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    return Response(b"" if request.method == "HEAD" else data, media_type="image/jpeg",
+                    headers={**headers, "Content-Length": str(len(data))})
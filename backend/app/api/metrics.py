@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..telemetry.metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus scrape endpoint (text exposition format 0.0.4).
+    Async so collectors can read event-loop state such as threadpool usage.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
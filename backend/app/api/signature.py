@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-from ..database import get_db
+from ..database import get_async_db
 from ..models.case import Case as CaseModel
 from ..models.signature_token import SignatureToken
+from ..models.email import OutboundEmail
+from ..services.email_outbox import email_outbox
 from ..services.email_service import EmailService
 from ..config import settings
 import logging
@@ -29,6 +32,21 @@ class SignatureSubmission(BaseModel):
     indemnitor_signature_date: Optional[str] = None
 
 
+class EmailStatus(BaseModel):
+    id: str
+    template: str
+    to_address: str
+    status: str
+    attempts: int
+    last_error: Optional[str]
+    next_attempt_at: datetime
+    created_at: datetime
+    sent_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
 class SignatureTokenResponse(BaseModel):
     case_id: str
     defendant_name: str
@@ -39,14 +57,14 @@ class SignatureTokenResponse(BaseModel):
 
 # Advisor endpoint to send signature request
 @router.post("/cases/{case_id}/send-remote-signature")
-def send_signature_request(
+async def send_signature_request(
     case_id: str,
     request: SendSignatureRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send remote signature request email to client"""
     # Get case
-    case = db.query(CaseModel).filter(CaseModel.id == case_id).first()
+    case = await db.get(CaseModel, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -56,8 +74,8 @@ def send_signature_request(
         email=request.email
     )
     db.add(token)
-    db.commit()
-    db.refresh(token)
+    await db.commit()
+    await db.refresh(token)
     
     # Generate signature link
     signature_link = f"{settings.FRONTEND_URL}/signature/{token.token}"
@@ -66,7 +84,8 @@ def send_signature_request(
     defendant_name = f"{case.defendant_first_name} {case.defendant_last_name}"
     advisor_name = case.advisor_id or "Your Advisor"  # TODO: Get actual advisor name
     
-    email_sent = EmailService.send_signature_request(
+    # Queued in the same commit as the case update; the mail worker delivers it
+    email = EmailService.signature_request(
         to_email=request.email,
         case_id=case_id,
         defendant_name=defendant_name,
@@ -74,34 +93,42 @@ def send_signature_request(
         advisor_name=advisor_name,
         signature_link=signature_link
     )
-    
-    if not email_sent:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to send signature request email"
-        )
+    db.add(email)
     
     # Update case
     case.client_email_for_remote = request.email
     case.remote_acknowledgment_sent = "YES"
-    db.commit()
+    await db.commit()
+    email_outbox.notify()
     
     return {
         "success": True,
-        "message": "Signature request sent successfully",
+        "message": "Signature request queued for delivery",
         "token": token.token,
-        "expires_at": token.expires_at
+        "expires_at": token.expires_at,
+        "email_id": email.id,
+        "email_status": email.status
     }
 
 
+# Advisor endpoint to track delivery of a case's emails
+@router.get("/cases/{case_id}/emails", response_model=List[EmailStatus])
+async def list_case_emails(case_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Delivery status of every email sent for a case, newest first"""
+    result = await db.execute(
+        select(OutboundEmail).where(OutboundEmail.case_id == case_id).order_by(OutboundEmail.created_at.desc())
+    )
+    return result.scalars().all()
+
+
 # Public endpoint to get signature page data
 @router.get("/public/signature/{token}", response_model=SignatureTokenResponse)
-def get_signature_page(token: str, db: Session = Depends(get_db)):
+async def get_signature_page(token: str, db: AsyncSession = Depends(get_async_db)):
     """Get case data for signature page (public endpoint)"""
     # Find token
-    signature_token = db.query(SignatureToken).filter(
-        SignatureToken.token == token
-    ).first()
+    signature_token = (await db.execute(
+        select(SignatureToken).where(SignatureToken.token == token)
+    )).scalar_one_or_none()
     
     if not signature_token:
         raise HTTPException(status_code=404, detail="Invalid signature link")
@@ -114,7 +141,7 @@ def get_signature_page(token: str, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="This signature link has expired")
     
     # Get case
-    case = db.query(CaseModel).filter(CaseModel.id == signature_token.case_id).first()
+    case = await db.get(CaseModel, signature_token.case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -131,16 +158,16 @@ def get_signature_page(token: str, db: Session = Depends(get_db)):
 
 # Public endpoint to submit signatures
 @router.post("/public/signature/{token}/submit")
-def submit_signatures(
+async def submit_signatures(
     token: str,
     submission: SignatureSubmission,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit signatures (public endpoint)"""
     # Find token
-    signature_token = db.query(SignatureToken).filter(
-        SignatureToken.token == token
-    ).first()
+    signature_token = (await db.execute(
+        select(SignatureToken).where(SignatureToken.token == token)
+    )).scalar_one_or_none()
     
     if not signature_token:
         raise HTTPException(status_code=404, detail="Invalid signature link")
@@ -153,7 +180,7 @@ def submit_signatures(
             raise HTTPException(status_code=400, detail="This signature link has expired")
     
     # Get case
-    case = db.query(CaseModel).filter(CaseModel.id == signature_token.case_id).first()
+    case = await db.get(CaseModel, signature_token.case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -177,7 +204,7 @@ def submit_signatures(
     # Update case state if needed
     case.remote_acknowledgment_sent = "COMPLETED"
     
-    db.commit()
+    await db.commit()
     
     logger.info(f"Signatures submitted for case {case.id} via token {token}")
     
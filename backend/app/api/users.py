@@ -1,53 +1,43 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List
-from ..database import get_db
+from ..database import get_async_read_db
 from ..models.user import User
 from ..models.case import Case as CaseModel
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+
+def workload_query(role: str, active_states: List[str]):
+    """Users with `role` and how many cases in `active_states` each is assigned, in one round trip."""
+    active = (
+        select(CaseModel.assigned_to, func.count().label("active_cases"))
+        .where(CaseModel.state.in_(active_states))
+        .group_by(CaseModel.assigned_to)
+        .subquery()
+    )
+    return (
+        select(User.id, User.email, func.coalesce(active.c.active_cases, 0))
+        .outerjoin(active, active.c.assigned_to == User.id)
+        .where(User.role == role)
+    )
+
+
+async def _users_with_workload(db: AsyncSession, role: str, active_states: List[str]):
+    rows = await db.execute(workload_query(role, active_states))
+    return [
+        {"id": user_id, "email": email, "active_cases": active_cases}
+        for user_id, email, active_cases in rows
+    ]
+
+
 @router.get("/advisors")
-def get_advisors_with_workload(db: Session = Depends(get_db)):
+async def get_advisors_with_workload(db: AsyncSession = Depends(get_async_read_db)):
     """Get all advisors with their current active case count."""
-    # Get all users with PRODUCER role
-    advisors = db.query(User).filter(User.role == "PRODUCER").all()
-    
-    result = []
-    for advisor in advisors:
-        # Count active cases assigned to this advisor
-        active_count = db.query(CaseModel).filter(
-            CaseModel.assigned_to == advisor.id,
-            CaseModel.state.in_(['QUALIFIED', 'ADVISOR_ACTIVE'])
-        ).count()
-        
-        result.append({
-            "id": advisor.id,
-            "email": advisor.email,
-            "active_cases": active_count
-        })
-    
-    return result
+    return await _users_with_workload(db, "PRODUCER", ['QUALIFIED', 'ADVISOR_ACTIVE'])
 
 @router.get("/underwriters")
-def get_underwriters_with_workload(db: Session = Depends(get_db)):
+async def get_underwriters_with_workload(db: AsyncSession = Depends(get_async_read_db)):
     """Get all underwriters with their current active case count."""
-    # Get all users with UW role
-    underwriters = db.query(User).filter(User.role == "UW").all()
-    
-    result = []
-    for uw in underwriters:
-        # Count active cases assigned to this underwriter
-        active_count = db.query(CaseModel).filter(
-            CaseModel.assigned_to == uw.id,
-            CaseModel.state == 'UNDERWRITING_REVIEW'
-        ).count()
-        
-        result.append({
-            "id": uw.id,
-            "email": uw.email,
-            "active_cases": active_count
-        })
-    
-    return result
+    return await _users_with_workload(db, "UW", ['UNDERWRITING_REVIEW'])
@@ -0,0 +1,50 @@
+"""
+Run the microbenchmarks and compare them with the committed baselines.
+
+    python -m app.benchmarks                        # full sizes, exit 1 on regressions
+    python -m app.benchmarks --quick                # small sizes; smoke test, not compared
+    python -m app.benchmarks --filter serialise --update-baselines
+"""
+from pathlib import Path
+import argparse
+import json
+import sys
+
+from . import suites  # noqa: F401  (registers the benchmarks)
+from .runner import BASELINES_PATH, BENCHMARKS, compare, load_baselines, run_benchmark, save_baselines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks", description="Hot-path microbenchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="Run at the small sizes")
+    parser.add_argument("--rounds", type=int, help="Override the number of timed rounds")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs. baseline (0.25 = 25%%)")
+    parser.add_argument("--baselines", type=Path, default=BASELINES_PATH)
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, bench in BENCHMARKS.items():
+        if args.filter in name:
+            results.append(run_benchmark(bench, bench.quick_size if args.quick else None, args.rounds))
+
+    if args.update_baselines:
+        save_baselines(results, args.baselines)
+
+    rows = compare(results, load_baselines(args.baselines), args.threshold)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'benchmark':34} {'size':>9} {'median s':>10} {'ops/s':>12} {'baseline':>10} {'change':>8}  status")
+        for row in rows:
+            change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+            baseline = row["baseline_seconds"] if row["baseline_seconds"] is not None else "-"
+            print(f"{row['name']:34} {row['size']:>9} {row['median_seconds']:>10} {row['ops_per_second']:>12} "
+                  f"{baseline:>10} {change:>8}  {row['status']}")
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Minimal benchmark runner with committed baselines.
+
+A benchmark is a setup function that takes a problem size and returns the
+callable to time plus how many operations one call performs. Each benchmark
+is warmed up once, then timed for a number of rounds; the median round is
+compared with the baseline recorded for the same size, and anything slower
+than `threshold` (fractional) is reported as a regression.
+
+Baselines are machine-specific: refresh them with --update-baselines on the
+machine (or CI runner class) that enforces them.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import gc
+import json
+import platform
+import statistics
+import time
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+Setup = Callable[[int], Tuple[Callable[[], None], int]]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Setup
+    size: int
+    quick_size: int
+    unit: str
+    rounds: int = 5
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    size: int
+    unit: str
+    ops_per_round: int
+    timings: List[float]
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.ops_per_round / self.median if self.median else float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "unit": self.unit,
+            "median_seconds": round(self.median, 6),
+            "min_seconds": round(min(self.timings), 6),
+            "stdev_seconds": round(statistics.stdev(self.timings), 6) if len(self.timings) > 1 else 0.0,
+            "ops_per_second": round(self.ops_per_second, 1),
+        }
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, size: int, quick_size: int, unit: str, rounds: int = 5):
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = Benchmark(name, setup, size, quick_size, unit, rounds)
+        return setup
+    return register
+
+
+def run_benchmark(bench: Benchmark, size: Optional[int] = None, rounds: Optional[int] = None) -> BenchmarkResult:
+    size = size or bench.size
+    run, ops = bench.setup(size)
+    run()  # Warm-up: imports, statement compilation, caches
+    timings = []
+    for _ in range(rounds or bench.rounds):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return BenchmarkResult(bench.name, size, bench.unit, ops, timings)
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> dict:
+    if not path.exists():
+        return {"benchmarks": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results: List[BenchmarkResult], path: Path = BASELINES_PATH):
+    baselines = load_baselines(path)
+    baselines["machine"] = f"{platform.system()} {platform.machine()} / Python {platform.python_version()}"
+    baselines["benchmarks"].update({r.name: r.to_dict() for r in results})
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results: List[BenchmarkResult], baselines: dict, threshold: float) -> List[dict]:
+    """One row per result; `status` is "ok", "regression", "improved" or "no-baseline"."""
+    rows = []
+    for result in results:
+        baseline = baselines.get("benchmarks", {}).get(result.name)
+        row = {"name": result.name, **result.to_dict(), "baseline_seconds": None, "change": None}
+        if not baseline or baseline.get("size") != result.size:
+            row["status"] = "no-baseline"
+        else:
+            change = result.median / baseline["median_seconds"] - 1
+            row.update(baseline_seconds=baseline["median_seconds"], change=round(change, 4))
+            row["status"] = "regression" if change > threshold else "improved" if change < -threshold else "ok"
+        rows.append(row)
+    return rows
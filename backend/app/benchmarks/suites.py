@@ -0,0 +1,169 @@
+"""
+Benchmarks for the rules engine, duplicate lookup, response serialisation and audit logging.
+
+Inputs are synthetic and seeded so every run times the same work. The
+dedup table is expensive to build at full size (1M rows), so it is cached in
+the temp directory and reused while its row count matches.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import List
+import os
+import random
+import tempfile
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
+
+from ..database import Base
+from ..models.audit import AuditLog  # noqa: F401  (registers the table)
+from ..models.signature_token import SignatureToken  # noqa: F401  (Case relationship target)
+from ..models.case import Case as CaseModel
+from ..orchestrator.nodes import find_duplicate
+from ..rules import bail_rules  # noqa: F401  (registers the rules)
+from ..rules.engine import rule_engine
+from ..schemas.case import Case as CaseSchema
+from ..services.audit import AuditService
+from ..telemetry.db import instrument_engine
+from .runner import benchmark
+
+# A drawn signature as a base64 PNG is typically 20-200 KB
+SIGNATURE_BYTES = 150_000
+SIGNATURE_COLUMNS = (
+    "terms_signature", "fee_disclosure_signature", "contact_agreement_signature", "indemnitor_signature",
+    "co_signer_signature", "deferred_payment_auth_signature",
+)
+
+
+def _engine(path: Path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    instrument_engine(engine, name="benchmark")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def synthetic_facts(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    facts = []
+    for i in range(count):
+        bond = rng.choice([500, 2500, 10000, 25000, 75000, 600000])
+        facts.append({
+            "bond_amount": bond,
+            "state_jurisdiction": rng.choice(["TX", "TX", "TX", "OK"]),
+            "financial": {"down_payment": bond * rng.choice([0.02, 0.05, 0.1]), "monthly_payment": rng.choice([100, 250, 900])},
+            "indemnitor": {"income": rng.choice([0, 2500, 4000, 8000])},
+            "documents": [{"type": t} for t in rng.sample(["indemnitor_id", "proof_of_income", "collateral_proof"], rng.randint(0, 3))],
+            "defendant": {"jail": rng.choice(["Harris County Jail", "Dallas County Jail"])},
+            "charge": {"type": rng.choice(["misdemeanor", "felony"])},
+        })
+    return facts
+
+
+def synthetic_case(i: int, signatures: bool = False) -> CaseModel:
+    now = datetime(2024, 1, 1)
+    case = CaseModel(
+        id=str(uuid.UUID(int=i)), state="QUALIFIED", defendant_first_name=f"First{i % 5000}",
+        defendant_last_name=f"Last{i // 5000}", defendant_dob=f"19{60 + i % 40}-0{1 + i % 9}-1{i % 10}",
+        jail_facility="Harris County Jail", county="Harris", state_jurisdiction="TX", booking_number=f"HC-{i}",
+        bond_amount=2500 + i % 50 * 500, bond_type="SURETY", charge_severity="MISDEMEANOR", caller_name=f"Caller{i}",
+        caller_relationship="Mother", caller_phone="555-0100", intent_signal="CHECKING_COST", fast_flags=["high_bond"],
+        charges="Theft", signatures_status={"terms": signatures}, documents_verified={},
+        derived_facts={"risk": {"risk_score": i % 100, "risk_tier": "Medium Risk", "risk_factors": ["a", "b"]}},
+        decisions=[{"qualification_check": {"passed": True, "blockers": []}}],
+        created_at=now, updated_at=now, version=1,
+    )
+    if signatures:
+        blob = "data:image/png;base64," + "A" * SIGNATURE_BYTES
+        for column in SIGNATURE_COLUMNS:
+            setattr(case, column, blob)
+    return case
+
+
+@benchmark("rules.evaluate_all", size=10_000, quick_size=200, unit="case")
+def rules_evaluate_all(size: int):
+    cases = synthetic_facts(size)
+
+    def run():
+        for facts in cases:
+            rule_engine.evaluate_all(facts)
+    return run, size
+
+
+DEDUP_LOOKUPS = 20
+
+
+def _dedup_table(rows: int):
+    path = Path(tempfile.gettempdir()) / f"bondpath-bench-dedup-{rows}.db"
+    engine = _engine(path)
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(CaseModel.__table__)).scalar()
+    if existing == rows:
+        # create_all skips existing tables, so bring a cached table's indexes up to date
+        with engine.begin() as conn:
+            for index in CaseModel.__table__.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        return engine
+
+    engine.dispose()
+    os.remove(path)
+    engine = _engine(path)
+    now = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for start in range(0, rows, 10_000):
+            conn.execute(CaseModel.__table__.insert(), [{
+                "id": str(uuid.UUID(int=i)), "state": "QUALIFIED", "defendant_first_name": f"First{i % 5000}",
+                "defendant_last_name": f"Last{i // 5000}", "defendant_dob": f"19{60 + i % 40}-0{1 + i % 9}-1{i % 10}",
+                "jail_facility": "Harris County Jail", "county": "Harris", "state_jurisdiction": "TX", "bond_amount": 2500,
+                "bond_type": "SURETY", "charge_severity": "MISDEMEANOR", "caller_name": "Caller", "caller_relationship": "Mother",
+                "caller_phone": "555-0100", "intent_signal": "CHECKING_COST", "created_at": now, "updated_at": now, "version": 1,
+            } for i in range(start, min(rows, start + 10_000))])
+    return engine
+
+
+@benchmark("dedup.find_duplicate", size=1_000_000, quick_size=5_000, unit="lookup", rounds=3)
+def dedup_lookup(size: int):
+    session = sessionmaker(bind=_dedup_table(size))()
+    rng = random.Random(0)
+    # Half the lookups hit an existing defendant, half miss
+    lookups = []
+    for n in range(DEDUP_LOOKUPS):
+        i = rng.randrange(size)
+        if n % 2:
+            lookups.append((f"first{i % 5000}", f"LAST{i // 5000}", None))
+        else:
+            lookups.append((f"Nobody{n}", f"Last{i // 5000}", "1990-01-01"))
+
+    def run():
+        for first, last, dob in lookups:
+            find_duplicate(session, "new-case", first, last, dob)
+    return run, DEDUP_LOOKUPS
+
+
+CASE_LIST = TypeAdapter(List[CaseSchema])
+
+
+@benchmark("serialise.case_list", size=1_000, quick_size=20, unit="case")
+def serialise_case_list(size: int):
+    cases = [synthetic_case(i) for i in range(size)]
+    return (lambda: CASE_LIST.dump_json(CASE_LIST.validate_python(cases))), size
+
+
+@benchmark("serialise.case_with_signatures", size=100, quick_size=5, unit="case")
+def serialise_case_with_signatures(size: int):
+    cases = [synthetic_case(i, signatures=True) for i in range(size)]
+    return (lambda: CASE_LIST.dump_json(CASE_LIST.validate_python(cases))), size
+
+
+@benchmark("audit.log_action", size=500, quick_size=20, unit="entry")
+def audit_log_action(size: int):
+    workdir = tempfile.mkdtemp(prefix="bondpath-bench-audit-")
+    session = sessionmaker(bind=_engine(Path(workdir) / "audit.db"))()
+    details = {"risk_score": 42, "risk_tier": "Medium Risk", "risk_factors": ["Felony", "Payment plan"]}
+
+    def run():
+        for _ in range(size):
+            AuditService.log_action(session, "case-1", "RISK_ASSESSED", details)
+    return run, size
@@ -1,15 +1,78 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     database_url: str
+    # Connection pool, per engine and worker process (ignored for SQLite)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10  # Extra connections opened under burst load, closed when returned
+    db_pool_timeout: float = 10.0  # Seconds to wait for a connection before answering 503
+    db_pool_recycle: int = 1800  # Reconnect connections older than this, before server/proxy idle timeouts
+    db_pool_pre_ping: bool = True  # Test connections on checkout so a failover doesn't surface as request errors
+    # Read replicas for read-only routes; a client that just wrote reads from the primary for a while
+    database_replica_urls: List[str] = []
+    db_replica_sticky_seconds: float = 5.0
     gemini_api_key: str
     openai_api_key: str | None = None
+    openai_base_url: str | None = None  # OpenAI-compatible endpoint, e.g. the fake LLM server used by load tests
     jwt_secret: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     cors_origins: List[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
     log_level: str = "INFO"
+
+    # LLM Providers
+    llm_providers: List[str] = ["openai", "gemini"]  # Order breaks ties between unmeasured providers
+    llm_small_model: str = "gpt-4o-mini"  # Tried first by agents that cascade
+    llm_large_model: str = "gpt-4o"  # Escalation target on schema failure or low confidence
+    llm_tiering_enabled: bool = True
+    llm_hedge_enabled: bool = True  # Send a backup request once the primary passes its p95 latency
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_cooldown_seconds: float = 30.0
+    # Client-side rate limits, per worker process
+    llm_requests_per_minute: int = 500
+    llm_tokens_per_minute: int = 200000
+    llm_queue_max_depth: int = 100  # Waiting calls per priority class
+    prompt_versions: Dict[str, int] = {}  # Pin a prompt template to an older version, e.g. {"risk": 1}
+
+    # Copilot memory
+    chat_history_token_budget: int = 2000  # Older turns are summarised once the history exceeds this
+    chat_keep_recent_turns: int = 6  # Messages always kept verbatim after compaction
+    chat_context_cache_size: int = 256  # Serialised case context blocks kept in memory
+
+    # Case facts projections
+    facts_cache_size: int = 1024  # Views memoised per case version
+    verification_cache_size: int = 4096  # Document match results memoised per (file, doc type, case facts)
+
+    # Background document verification
+    verification_workers: int = 4  # Worker threads; 0 leaves jobs queued until run_pending() is called
+    verification_max_attempts: int = 3  # Vision failures are retried, then published as ERROR
+    verification_retry_seconds: float = 2.0  # First retry delay, doubled on each further attempt
+    verification_batch_size: int = 6  # Most document images sent in one case-level vision call
+
+    # Document storage
+    storage_backend: str = "local"  # "local" or "s3" (any S3-compatible service, e.g. MinIO)
+    storage_local_root: str = "uploads"
+    s3_endpoint_url: str = "https://s3.amazonaws.com"
+    s3_bucket: str = ""
+    s3_region: str = "us-east-1"
+    s3_access_key: str = ""
+    s3_secret_key: str = ""
+    s3_presign_seconds: int = 900  # Lifetime of the download links documents redirect to
+    document_max_bytes: int = 25 * 1024 * 1024  # Upload cap, and for documents fetched by URL for verification
+    document_cache_seconds: int = 31536000  # Browser cache lifetime; a document's content never changes
+    document_link_seconds: int = 300  # Lifetime of the signed links <img> tags and new tabs open documents with
+    rendition_cache_dir: str = "rendition-cache"  # Thumbnails and previews, generated on first request
+    rendition_cache_max_bytes: int = 512 * 1024 * 1024  # Least recently served renditions are evicted past this
+
+    # Startup warm-up; /ready reports 503 until it has finished
+    warmup_enabled: bool = True
+    warmup_db_connections: int = 4  # Connections opened per engine before taking traffic
+    warmup_provider_timeout_seconds: float = 5.0
+
+    # Telemetry
+    trace_to_db: bool = True  # Persist node/agent spans to trace_spans
+    slow_query_ms: int = 200  # Statements slower than this count as slow queries
     
     # Email Configuration
     EMAIL_FROM: str = "noreply@bondpath.com"
@@ -18,6 +81,15 @@ class Settings(BaseSettings):
     SMTP_TLS: bool = False
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_TIMEOUT: float = 20.0
+    SMTP_POOL_SIZE: int = 2  # Authenticated connections kept open to the relay
+    SMTP_IDLE_SECONDS: float = 60.0  # Pooled connections unused for longer are closed rather than reused
+    EMAIL_WORKERS: int = 2  # Outbox worker threads; 0 leaves emails queued until run_pending() is called
+    EMAIL_BATCH_SIZE: int = 20  # Emails claimed and sent over one connection at a time
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_SECONDS: float = 30.0  # First retry delay, doubled on each further attempt
+    EMAIL_POLL_SECONDS: float = 5.0  # How often idle workers look for due retries
+    EMAIL_LEASE_SECONDS: float = 300.0  # A SENDING email whose worker died is picked up again after this
     FRONTEND_URL: str = "http://localhost:5173"
 
     class Config:
@@ -1,24 +1,159 @@
+from pathlib import Path
+from typing import Optional
+import itertools
+import time
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
+from .telemetry.db import SESSIONS, instrument_engine
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+
+# Set on responses to writes; until it expires the client's reads go to the primary. The header carries
+# the same marker for clients that can't send the cookie (a cross-site SPA) and echo it back instead.
+PRIMARY_COOKIE = "bondpath_read_primary_until"
+PRIMARY_HEADER = "X-Read-Primary-Until"
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings from config. SQLite gets only the ones its single-file pools understand."""
+    options = {"pool_pre_ping": settings.db_pool_pre_ping, "pool_recycle": settings.db_pool_recycle}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    return {
+        **options,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
+
+def pool_capacity(url: str):
+    if make_url(url).get_backend_name() == "sqlite":
+        return None
+    return settings.db_pool_size + settings.db_max_overflow
+
+
 connect_args = {}
 if "sqlite" in SQLALCHEMY_DATABASE_URL:
     connect_args = {"check_same_thread": False}
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args=connect_args
+    connect_args=connect_args,
+    **engine_options(SQLALCHEMY_DATABASE_URL)
 )
+instrument_engine(engine, capacity=pool_capacity(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+def async_database_url(url: str) -> str:
+    """The same database through its asyncio driver: asyncpg for Postgres, aiosqlite for SQLite."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
+
+
+def _async_engine(url: str, name: str):
+    async_engine = create_async_engine(async_database_url(url), **engine_options(url))
+    instrument_engine(async_engine.sync_engine, name=name, capacity=pool_capacity(url))
+    return async_engine
+
+
+# Async engine for routes that only touch the database: while a query is in flight
+# the event loop serves other requests instead of parking a threadpool worker
+async_engine = _async_engine(SQLALCHEMY_DATABASE_URL, "async")
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+replica_engines = [_async_engine(url, f"replica{i}") for i, url in enumerate(settings.database_replica_urls)]
+ReplicaSessionLocals = [async_sessionmaker(e, class_=AsyncSession, expire_on_commit=False) for e in replica_engines]
+_next_replica = itertools.cycle(range(len(ReplicaSessionLocals)))
+
+
+def reads_from_primary(request: Request) -> bool:
+    """True while the client's last write may not have reached the replicas yet."""
+    marker = request.cookies.get(PRIMARY_COOKIE) or request.headers.get(PRIMARY_HEADER) or 0
+    try:
+        return float(marker) > time.time()
+    except ValueError:
+        return False
+
+
+def run_migrations(database_url: Optional[str] = None, revision: str = "head"):
+    """`alembic upgrade` from code, for seed scripts, tests and tooling that start from an empty database."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    if database_url:
+        config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    command.upgrade(config, revision)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    """Session for read-only routes: a replica (round robin) unless none is configured or the client just wrote."""
+    if not ReplicaSessionLocals:
+        session_factory, target = AsyncSessionLocal, "primary"
+    elif reads_from_primary(request):
+        session_factory, target = AsyncSessionLocal, "primary_sticky"
+    else:
+        session_factory, target = ReplicaSessionLocals[next(_next_replica)], "replica"
+    SESSIONS.inc(target=target)
+    async with session_factory() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marks clients that made a successful write (POST/PUT/PATCH/DELETE) so their
+    reads skip the replicas for db_replica_sticky_seconds. A cookie (and the same
+    value in the X-Read-Primary-Until header) rather than server state, so it
+    holds across workers and instances.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + settings.db_replica_sticky_seconds
+                cookie = f"{PRIMARY_COOKIE}={until:.3f}; Max-Age={int(settings.db_replica_sticky_seconds) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                    (PRIMARY_HEADER.lower().encode(), f"{until:.3f}".encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
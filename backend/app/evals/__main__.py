@@ -0,0 +1,73 @@
+"""
+Run the offline agent evaluation.
+
+    python -m app.evals                                  # replay the corpus with the configured prompts
+    python -m app.evals --pin risk=2 --baseline-pin risk=1 --max-score-delta 10
+    python -m app.evals --record --pin risk=2            # call the live providers and store their answers
+
+Exits with status 1 if the report shows a regression.
+"""
+from pathlib import Path
+import argparse
+import json
+import sys
+
+from ..config import settings
+from .harness import FIXTURES_DIR, drift, load_fixtures, regressions, run_corpus, summarise
+from .replay import RecordingProvider, ReplayProvider, load_recordings, save_recordings
+
+
+def _pins(values) -> dict:
+    pins = {}
+    for value in values or []:
+        name, _, version = value.partition("=")
+        pins[name] = int(version)
+    return pins
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.evals", description="Offline agent evaluation")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR / "cases.json")
+    parser.add_argument("--recordings", type=Path, default=FIXTURES_DIR / "recordings.json")
+    parser.add_argument("--pin", action="append", metavar="PROMPT=VERSION", help="Prompt versions to evaluate")
+    parser.add_argument("--baseline-pin", action="append", metavar="PROMPT=VERSION",
+                        help="Prompt versions to compare against; enables the drift report")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Fraction of recorded latency to replay (0 = instant)")
+    parser.add_argument("--max-schema-failure-rate", type=float, default=0.2)
+    parser.add_argument("--max-score-delta", type=float, default=None)
+    parser.add_argument("--record", action="store_true", help="Record live answers instead of replaying")
+    parser.add_argument("--output", type=Path, help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    # Evaluation calls shouldn't land in the production trace tables
+    settings.trace_to_db = False
+    fixtures = load_fixtures(args.fixtures)
+    recordings = load_recordings(args.recordings)
+    pins = _pins(args.pin)
+
+    if args.record:
+        from ..agents.router import build_default_router
+        run_corpus(fixtures, RecordingProvider(build_default_router(), recordings), pins)
+        save_recordings(args.recordings, recordings)
+        print(f"Recorded {len(fixtures)} fixtures to {args.recordings}")
+        return 0
+
+    report = summarise(run_corpus(fixtures, ReplayProvider(recordings, args.latency_scale), pins), pins)
+    baseline = None
+    if args.baseline_pin:
+        baseline_pins = _pins(args.baseline_pin)
+        baseline = summarise(run_corpus(fixtures, ReplayProvider(recordings, args.latency_scale), baseline_pins), baseline_pins)
+        report["baseline"] = baseline["agents"]
+        report["drift"] = drift(baseline, report)
+
+    problems = regressions(report, args.max_schema_failure_rate, args.max_score_delta, baseline)
+    report["regressions"] = problems
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text)
+    print(text)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Offline evaluation of the case agents against a fixed corpus.
+
+Each fixture is an anonymised case: raw intake notes, the case row and
+(optionally) a document. The harness runs IntakeAgent, RiskAgent,
+ReadinessAgent and DocVerifyAgent over every fixture through a router whose
+only provider replays recorded answers, and reports per-agent latency,
+prompt tokens and schema-failure rates. Running the corpus under two sets of
+prompt versions and comparing the reports gives the score drift a prompt
+change would cause, before it is deployed.
+"""
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+import tempfile
+import time
+
+from ..agents.doc_verify import DocVerifyAgent
+from ..agents.intake import IntakeAgent
+from ..agents.limiter import LLMRateLimiter
+from ..agents.prompts import prompt_registry
+from ..agents.providers import LLMProvider
+from ..agents.readiness import ReadinessAgent
+from ..agents.risk import RiskAgent
+from ..agents.router import CircuitBreaker, ProviderRouter
+from ..services.facts_service import VIEWS
+from ..storage import LocalStorage
+from ..telemetry.metrics import percentile
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+AGENT_PROMPTS = {"IntakeAgent": "intake", "RiskAgent": "risk", "ReadinessAgent": "readiness", "DocVerifyAgent": "doc_verify"}
+
+# (numeric score, categorical outcome) compared between runs to measure drift
+SCORE_FIELDS: Dict[str, Tuple[str, Optional[str]]] = {
+    "IntakeAgent": ("confidence_score", None),
+    "RiskAgent": ("risk_score", "risk_tier"),
+    "ReadinessAgent": ("confidence_score", "ready_for_submission"),
+    "DocVerifyAgent": ("confidence_score", "match_status"),
+}
+
+
+def load_fixtures(path: Path = FIXTURES_DIR / "cases.json") -> List[dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _facts(case: dict, view: str) -> dict:
+    """Project a fixture's case row through the same view the API uses."""
+    projection = VIEWS[view]
+    return projection.from_row({c: case.get(c) for c in projection.columns + projection.presence})
+
+
+def _agents(provider: LLMProvider) -> Dict[str, Any]:
+    # Replay failures are expected outcomes here, so the breaker must never open
+    router = ProviderRouter([provider], hedge=False, breaker_factory=lambda: CircuitBreaker(failure_threshold=10 ** 9))
+    limiter = LLMRateLimiter(requests_per_minute=10 ** 9, tokens_per_minute=10 ** 12)
+    return {
+        "IntakeAgent": IntakeAgent(router=router, limiter=limiter),
+        "RiskAgent": RiskAgent(router=router, limiter=limiter),
+        "ReadinessAgent": ReadinessAgent(router=router, limiter=limiter),
+        "DocVerifyAgent": DocVerifyAgent(model_name="gpt-4o", provider="openai", router=router, limiter=limiter),
+    }
+
+
+@dataclass
+class AgentRun:
+    fixture: str
+    agent: str
+    latency_ms: float
+    output: Optional[dict]
+    error: Optional[str] = None
+    calls: List[Any] = field(default_factory=list)
+
+    @property
+    def failed(self) -> bool:
+        # Readiness and document verification swallow LLM errors and return a fallback
+        return self.error is not None or not self.calls or self.calls[-1].outcome != "ok"
+
+
+def run_fixture(fixture: dict, agents: Dict[str, Any], provider: LLMProvider, workdir: Path) -> List[AgentRun]:
+    provider.fixture = fixture["id"]
+    case = fixture.get("case", {})
+    inputs = {}
+    if "intake" in fixture:
+        inputs["IntakeAgent"] = fixture["intake"]
+    if case:
+        inputs["RiskAgent"] = _facts(case, "risk")
+        inputs["ReadinessAgent"] = _facts(case, "readiness")
+    document = fixture.get("document")
+    if document:
+        key = f"{fixture['id']}-{document['doc_type']}"
+        (workdir / key).write_bytes(base64.b64decode(document["content_base64"]))
+        inputs["DocVerifyAgent"] = {"storage_key": key, "doc_type": document["doc_type"], "case_data": _facts(case, "doc_verify")}
+
+    runs = []
+    for name, payload in inputs.items():
+        calls_before = len(getattr(provider, "calls", []))
+        start = time.perf_counter()
+        output, error = None, None
+        try:
+            output = agents[name].run(payload)
+        except Exception as e:
+            error = str(e)
+        run = AgentRun(fixture["id"], name, (time.perf_counter() - start) * 1000, output, error)
+        run.calls = list(getattr(provider, "calls", [])[calls_before:])
+        runs.append(run)
+    return runs
+
+
+def run_corpus(fixtures: List[dict], provider: LLMProvider, pins: Optional[Dict[str, int]] = None) -> List[AgentRun]:
+    """Run every fixture through the agents with `pins` applied on top of the configured prompt versions."""
+    agents = _agents(provider)
+    runs = []
+    with ExitStack() as stack:
+        stack.enter_context(prompt_registry.pinned_to(pins or {}))
+        workdir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        agents["DocVerifyAgent"].storage = LocalStorage(str(workdir))  # Fixture documents are written here
+        for fixture in fixtures:
+            runs.extend(run_fixture(fixture, agents, provider, workdir))
+    return runs
+
+
+def _distribution(values: List[float]) -> Optional[dict]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "p50": round(percentile(ordered, 0.5), 2),
+        "p95": round(percentile(ordered, 0.95), 2),
+        "max": round(ordered[-1], 2),
+        "mean": round(sum(ordered) / len(ordered), 2),
+    }
+
+
+def summarise(runs: List[AgentRun], pins: Optional[Dict[str, int]] = None) -> dict:
+    """Per-agent latency, token and failure report plus every output, keyed by fixture."""
+    with prompt_registry.pinned_to(pins or {}):
+        prompts = {agent: prompt_registry.get(name).id for agent, name in AGENT_PROMPTS.items()}
+
+    agents = {}
+    for agent in AGENT_PROMPTS:
+        agent_runs = [r for r in runs if r.agent == agent]
+        if not agent_runs:
+            continue
+        calls = [c for r in agent_runs for c in r.calls]
+        schema_failures = sum(1 for c in calls if c.outcome == "schema_error")
+        agents[agent] = {
+            "prompt": prompts[agent],
+            "runs": len(agent_runs),
+            "failures": sum(1 for r in agent_runs if r.failed),
+            "llm_calls": len(calls),
+            "escalated_runs": sum(1 for r in agent_runs if len(r.calls) > 1),
+            "missing_recordings": sum(1 for c in calls if c.outcome == "missing"),
+            "schema_failures": schema_failures,
+            "schema_failure_rate": round(schema_failures / len(calls), 4) if calls else None,
+            "latency_ms": _distribution([r.latency_ms for r in agent_runs]),
+            "prompt_tokens": _distribution([c.prompt_tokens for c in calls]),
+            "completion_tokens": _distribution([c.completion_tokens for c in calls if c.outcome != "missing"]),
+        }
+
+    outputs: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        outputs.setdefault(run.fixture, {})[run.agent] = None if run.failed else run.output
+    return {"agents": agents, "outputs": outputs}
+
+
+def drift(baseline: dict, candidate: dict) -> dict:
+    """Per-agent score and outcome changes between two reports over the same corpus."""
+    result = {}
+    for agent, (score_field, label_field) in SCORE_FIELDS.items():
+        deltas, label_changes, compared = [], [], 0
+        for fixture, before_outputs in baseline["outputs"].items():
+            before = before_outputs.get(agent)
+            after = candidate["outputs"].get(fixture, {}).get(agent)
+            if not before or not after:
+                continue
+            compared += 1
+            if isinstance(before.get(score_field), (int, float)) and isinstance(after.get(score_field), (int, float)):
+                deltas.append(after[score_field] - before[score_field])
+            if label_field and before.get(label_field) != after.get(label_field):
+                label_changes.append({"fixture": fixture, "before": before.get(label_field), "after": after.get(label_field)})
+        if not compared:
+            continue
+        result[agent] = {
+            "compared": compared,
+            "mean_score_delta": round(sum(deltas) / len(deltas), 3) if deltas else None,
+            "max_abs_score_delta": round(max(abs(d) for d in deltas), 3) if deltas else None,
+            "label_changes": label_changes,
+        }
+    return result
+
+
+def regressions(report: dict, max_schema_failure_rate: float = 0.0, max_abs_score_delta: Optional[float] = None,
+                baseline: Optional[dict] = None) -> List[str]:
+    """Reasons the candidate should not ship; empty when it passes."""
+    problems = []
+    for agent, stats in report["agents"].items():
+        if stats["missing_recordings"]:
+            problems.append(f"{agent}: {stats['missing_recordings']} call(s) have no recording for {stats['prompt']}")
+        rate = stats["schema_failure_rate"] or 0
+        if rate > max_schema_failure_rate:
+            problems.append(f"{agent}: schema failure rate {rate:.1%} exceeds {max_schema_failure_rate:.1%}")
+        if baseline and agent in baseline["agents"]:
+            before, after = baseline["agents"][agent]["prompt_tokens"], stats["prompt_tokens"]
+            if before and after and after["mean"] > before["mean"] * 1.2:
+                problems.append(f"{agent}: mean prompt tokens grew from {before['mean']} to {after['mean']}")
+    for agent, changes in report.get("drift", {}).items():
+        delta = changes["max_abs_score_delta"]
+        if max_abs_score_delta is not None and delta is not None and delta > max_abs_score_delta:
+            problems.append(f"{agent}: score moved by up to {delta} (limit {max_abs_score_delta})")
+    return problems
@@ -0,0 +1,126 @@
+"""
+Recorded LLM responses for offline evaluation.
+
+Recordings are stored per fixture and prompt id (`"risk@v1"`), optionally per
+tier (`"intake@v1/large"`), so a change to how context is serialised replays
+the same answers while a new prompt version needs its own recordings. Usage is
+rebuilt from the request actually sent, so prompt-size regressions show up
+without re-recording.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import json
+import time
+
+from pydantic import ValidationError
+
+from ..agents.providers import LLMProvider, LLMRequest, LLMResponse, ProviderError, SchemaValidationError, estimate_tokens
+
+
+class RecordingMissing(ProviderError):
+    """No recorded response for this fixture and prompt."""
+
+
+@dataclass
+class ReplayCall:
+    fixture: Optional[str]
+    prompt: Optional[str]
+    tier: str
+    outcome: str  # "ok", "schema_error" or "missing"
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float
+
+
+def _key(prompt: Optional[str], tier: Optional[str] = None) -> str:
+    return f"{prompt}/{tier}" if tier else str(prompt)
+
+
+def load_recordings(path: Path) -> Dict[str, Dict[str, dict]]:
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_recordings(path: Path, recordings: Dict[str, Dict[str, dict]]):
+    with open(path, "w") as f:
+        json.dump(recordings, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Serves recorded responses for the fixture currently being evaluated.
+    Recorded latency is slept for `latency_scale` times its length (0 replays instantly).
+    Responses that don't match the requested schema raise SchemaValidationError,
+    exactly as a live provider would.
+    """
+
+    name = "replay"
+
+    def __init__(self, recordings: Dict[str, Dict[str, dict]], latency_scale: float = 1.0):
+        self.recordings = recordings
+        self.latency_scale = latency_scale
+        self.fixture: Optional[str] = None
+        self.calls: List[ReplayCall] = []
+
+    def owns_model(self, model: Optional[str]) -> bool:
+        return True
+
+    def _lookup(self, request: LLMRequest) -> Optional[dict]:
+        recorded = self.recordings.get(self.fixture or "", {})
+        return recorded.get(_key(request.prompt, request.tier)) or recorded.get(_key(request.prompt))
+
+    def complete(self, request: LLMRequest) -> LLMResponse:
+        prompt_tokens = request.estimated_prompt_tokens
+        recording = self._lookup(request)
+        if recording is None:
+            self.calls.append(ReplayCall(self.fixture, request.prompt, request.tier, "missing", prompt_tokens, 0, 0.0))
+            raise RecordingMissing(self.name, f"no recording for {self.fixture} {request.prompt}")
+
+        latency_ms = recording.get("latency_ms", 0.0)
+        if self.latency_scale > 0 and latency_ms:
+            time.sleep(latency_ms * self.latency_scale / 1000)
+
+        data = recording["response"]
+        completion_tokens = recording.get("completion_tokens") or estimate_tokens(json.dumps(data))
+        call = ReplayCall(self.fixture, request.prompt, request.tier, "ok", prompt_tokens, completion_tokens, latency_ms)
+        self.calls.append(call)
+        if request.response_format:
+            try:
+                data = request.response_format.model_validate(data).model_dump()
+            except ValidationError as e:
+                call.outcome = "schema_error"
+                raise SchemaValidationError(self.name, f"{request.prompt}: {e}") from e
+
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return LLMResponse(data=data, provider=self.name, model=request.model or "replay", usage=usage)
+
+
+class RecordingProvider(LLMProvider):
+    """Forwards calls to a live router and stores each answer as a recording for the current fixture."""
+
+    name = "recorder"
+
+    def __init__(self, router, recordings: Dict[str, Dict[str, dict]]):
+        self.router = router
+        self.recordings = recordings
+        self.fixture: Optional[str] = None
+
+    def owns_model(self, model: Optional[str]) -> bool:
+        return True
+
+    def complete(self, request: LLMRequest) -> LLMResponse:
+        start = time.perf_counter()
+        response = self.router.complete(request)
+        usage = response.usage
+        self.recordings.setdefault(self.fixture or "", {})[_key(request.prompt, request.tier)] = {
+            "response": response.data,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "completion_tokens": getattr(usage, "completion_tokens", None) or getattr(usage, "candidates_token_count", None),
+            "model": response.model,
+        }
+        return response
@@ -0,0 +1,163 @@
+"""
+Deterministic OpenAI-compatible chat completions server for load tests.
+
+Point the API at it with OPENAI_BASE_URL=http://host:port/v1 and
+LLM_PROVIDERS='["openai"]'. Structured-output requests get a schema-valid
+answer built from the JSON schema the client sent (confidence fields land
+above every escalation threshold), streamed requests get a fixed answer in
+the copilot's text + ACTIONS format. Latency is the configured base plus a
+jitter derived from the request body, so identical runs sleep identically.
+
+    python -m app.loadtest.fake_llm --port 9100 --latency-ms 800 --jitter-ms 200
+"""
+from typing import Any, Dict, Optional
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STREAM_ANSWER = "This is a simulated copilot answer from the load-test LLM server. It has no knowledge of the case."
+STREAM_ACTIONS = ["View Case", "Draft Email"]
+
+
+def example_from_schema(schema: Dict[str, Any], definitions: Optional[Dict[str, Any]] = None) -> Any:
+    """A minimal value that satisfies `schema` (the subset pydantic emits for structured outputs)."""
+    definitions = definitions if definitions is not None else {**schema.get("$defs", {}), **schema.get("definitions", {})}
+    if "$ref" in schema:
+        return example_from_schema(definitions[schema["$ref"].rsplit("/", 1)[-1]], definitions)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return example_from_schema(options[0], definitions)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema and schema["default"] is not None:
+        return schema["default"]
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object" or "properties" in schema:
+        return {name: example_from_schema(prop, definitions) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [example_from_schema(schema["items"], definitions)] if schema.get("items") else []
+    if kind == "string":
+        return "sample"
+    if kind == "integer":
+        return 75
+    if kind == "number":
+        return 0.9
+    if kind == "boolean":
+        return True
+    return None
+
+
+def _prompt_text(messages: list) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            parts.extend(p.get("text", "") for p in content if p.get("type") == "text")
+        else:
+            parts.append(content or "")
+    return "".join(parts)
+
+
+def _usage(prompt: str, completion: str) -> dict:
+    prompt_tokens, completion_tokens = len(prompt) // 4, max(1, len(completion) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+
+
+def create_app(latency_ms: float = 500.0, jitter_ms: float = 0.0, stream_chunk_ms: float = 20.0) -> FastAPI:
+    app = FastAPI(title="Fake LLM")
+
+    def delay(body: bytes) -> float:
+        seed = int.from_bytes(hashlib.sha256(body).digest()[:8], "big")
+        return max(0.0, latency_ms + random.Random(seed).uniform(-jitter_ms, jitter_ms)) / 1000
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.body()
+        payload = json.loads(body)
+        model = payload.get("model", "fake")
+        prompt = _prompt_text(payload.get("messages", []))
+        created = int(time.time())
+        completion_id = f"chatcmpl-{hashlib.sha256(body).hexdigest()[:12]}"
+
+        if payload.get("stream"):
+            return StreamingResponse(
+                _stream(completion_id, created, model, prompt, delay(body), stream_chunk_ms / 1000),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(delay(body))
+        response_format = payload.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(example_from_schema(response_format["json_schema"]["schema"]))
+        elif response_format.get("type") == "json_object":
+            content = "{}"
+        else:
+            content = STREAM_ANSWER
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": _usage(prompt, content),
+        })
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def _stream(completion_id: str, created: int, model: str, prompt: str, first_token_delay: float, chunk_delay: float):
+    def chunk(delta: Optional[dict], usage: Optional[dict] = None) -> str:
+        choices = [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": None}]
+        data = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": choices, "usage": usage}
+        return f"data: {json.dumps(data)}\n\n"
+
+    text = f"{STREAM_ANSWER}\nACTIONS: {json.dumps(STREAM_ACTIONS)}"
+    await asyncio.sleep(first_token_delay)
+    yield chunk({"role": "assistant", "content": ""})
+    for word in text.split(" "):
+        yield chunk({"content": word + " "})
+        await asyncio.sleep(chunk_delay)
+    yield chunk(None, _usage(prompt, text))
+    yield "data: [DONE]\n\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.loadtest.fake_llm", description="Fake OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--stream-chunk-ms", type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms, args.stream_chunk_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Closed-loop load generator for the HTTP API.
+
+A fixed number of virtual users each pick a scenario by weight, run it, and
+immediately pick the next one until the run ends. Every request is recorded
+under its route template (`GET /cases/{id}`), and the report gives
+throughput, error counts and latency percentiles per route.
+"""
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import base64
+import itertools
+import random
+import time
+
+import httpx
+
+from ..telemetry.metrics import percentile
+
+# Smallest valid PNG, so document uploads exercise the verification path without real images
+TINY_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+DEFAULT_MIX = {
+    "create_case": 2,
+    "poll_dashboard": 10,
+    "read_case": 5,
+    "update_case": 3,
+    "upload_document": 1,
+    "chat": 2,
+}
+
+
+@dataclass
+class Sample:
+    route: str
+    status: int
+    seconds: float
+
+
+@dataclass
+class LoadTestState:
+    token: Optional[str] = None
+    case_ids: List[str] = field(default_factory=list)
+    samples: List[Sample] = field(default_factory=list)
+    counter: itertools.count = field(default_factory=itertools.count)
+
+
+async def _request(client: httpx.AsyncClient, state: LoadTestState, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        status = response.status_code
+    except httpx.HTTPError:
+        response, status = None, 0  # Connection errors and timeouts
+    state.samples.append(Sample(route, status, time.perf_counter() - start))
+    return response
+
+
+def _case_payload(n: int) -> dict:
+    return {
+        "defendant_first_name": f"Load{n}",
+        "defendant_last_name": "Test",
+        "jail_facility": "Harris County Jail",
+        "county": "Harris",
+        "state_jurisdiction": "TX",
+        "bond_amount": 2500 + (n % 20) * 1000,
+        "bond_type": "SURETY",
+        "charge_severity": "FELONY" if n % 4 == 0 else "MISDEMEANOR",
+        "caller_name": f"Caller{n}",
+        "caller_relationship": "Mother",
+        "caller_phone": "555-0100",
+        "intent_signal": "GET_OUT_TODAY" if n % 3 == 0 else "CHECKING_COST",
+        "fast_flags": [],
+    }
+
+
+async def create_case(client, state, rng):
+    response = await _request(client, state, "POST /cases/", "POST", "/cases/", json=_case_payload(next(state.counter)))
+    if response is not None and response.status_code == 200:
+        state.case_ids.append(response.json()["id"])
+
+
+async def poll_dashboard(client, state, rng):
+    await _request(client, state, "GET /cases/", "GET", "/cases/", params={"limit": 50})
+
+
+async def read_case(client, state, rng):
+    if state.case_ids:
+        await _request(client, state, "GET /cases/{id}", "GET", f"/cases/{rng.choice(state.case_ids)}")
+
+
+async def update_case(client, state, rng):
+    if state.case_ids:
+        await _request(client, state, "PATCH /cases/{id}", "PATCH", f"/cases/{rng.choice(state.case_ids)}",
+                       json={"advisor_notes": f"Follow-up {next(state.counter)}", "premium_type": "PAYMENT_PLAN"})
+
+
+async def upload_document(client, state, rng):
+    if state.case_ids:
+        await _request(client, state, "POST /cases/{id}/documents", "POST", f"/cases/{rng.choice(state.case_ids)}/documents",
+                       params={"document_type": "booking_sheet"}, files={"file": ("booking.png", TINY_PNG, "image/png")})
+
+
+async def chat(client, state, rng):
+    if state.token:
+        case_id = rng.choice(state.case_ids) if state.case_ids else None
+        await _request(client, state, "POST /chat/message", "POST", "/chat/message",
+                       json={"message": "What is missing on this case?", "case_id": case_id},
+                       headers={"Authorization": f"Bearer {state.token}"})
+
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "create_case": create_case,
+    "poll_dashboard": poll_dashboard,
+    "read_case": read_case,
+    "update_case": update_case,
+    "upload_document": upload_document,
+    "chat": chat,
+}
+
+
+async def _user(client: httpx.AsyncClient, state: LoadTestState, mix: Dict[str, float], deadline: float, seed: int):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        await SCENARIOS[rng.choices(names, weights)[0]](client, state, rng)
+        await asyncio.sleep(0)  # Scenarios with nothing to do yet return without awaiting
+
+
+async def run_load(base_url: str, users: int = 10, duration: float = 30.0, mix: Optional[Dict[str, float]] = None,
+                   token: Optional[str] = None, seed: int = 0, timeout: float = 60.0, transport=None) -> dict:
+    """Drive `users` concurrent virtual users against `base_url` for `duration` seconds and return the report."""
+    state = LoadTestState(token=token)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, transport=transport,
+                                 limits=httpx.Limits(max_connections=users)) as client:
+        # A few cases up front so reads and updates have something to hit from the start
+        for _ in range(min(users, 5)):
+            await create_case(client, state, None)
+        state.samples.clear()
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(_user(client, state, mix or DEFAULT_MIX, deadline, seed + i) for i in range(users)))
+        elapsed = time.perf_counter() - start
+    return summarise(state.samples, elapsed, users)
+
+
+def summarise(samples: List[Sample], elapsed: float, users: int) -> dict:
+    routes = {}
+    for route in sorted({s.route for s in samples}):
+        route_samples = [s for s in samples if s.route == route]
+        latencies = sorted(s.seconds * 1000 for s in route_samples)
+        errors = sum(1 for s in route_samples if not 200 <= s.status < 300)
+        routes[route] = {
+            "requests": len(route_samples),
+            "errors": errors,
+            "rps": round(len(route_samples) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.5), 1),
+            "p95_ms": round(percentile(latencies, 0.95), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "max_ms": round(latencies[-1], 1),
+        }
+    return {
+        "users": users,
+        "duration_seconds": round(elapsed, 2),
+        "requests": len(samples),
+        "errors": sum(r["errors"] for r in routes.values()),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "routes": routes,
+    }
@@ -1,43 +1,91 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
-from .api import auth, cases, audit, users, signature, agents, chat
+from .services.email_outbox import email_outbox
+from .services.verification_queue import verification_queue
+from .services.warmup import check_database, check_providers, default_steps, warmup
+from .telemetry.db import POOL_TIMEOUTS
+from .telemetry.http import MetricsMiddleware
+from .api import auth, cases, audit, users, signature, agents, chat, metrics, documents
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: liveness answers at once, readiness once warm
+    warmup.steps = default_steps()
+    task = asyncio.create_task(warmup.run())
+    # Document verification workers; re-queueing leftover PENDING documents queries the database
+    await asyncio.to_thread(verification_queue.start)
+    email_outbox.start()
+    yield
+    task.cancel()
+    await asyncio.to_thread(verification_queue.stop)
+    await asyncio.to_thread(email_outbox.stop)
 
 app = FastAPI(
     title="Bail Decision System",
     description="Control plane for orchestrating bail decisions",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
-# Ensure uploads directory exists
-os.makedirs("uploads", exist_ok=True)
-app.mount("/static", StaticFiles(directory="uploads"), name="static")
+# Documents are served by /documents (authorised, cacheable); files the old /static mount served
+# are moved there with `python -m app.storage import-static uploads`
 
-# Create tables on startup (for development)
-from .database import engine, Base
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic: run `alembic upgrade head` before starting
+from .database import PRIMARY_HEADER, ReadYourWritesMiddleware
 
+# Credentials: the SPA sends cookies (read-your-writes marker) with withCredentials, which needs explicit origins
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_HEADER],
 )
+if settings.database_replica_urls:
+    app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(cases.router)
+app.include_router(documents.router)
 app.include_router(audit.router)
 app.include_router(users.router)
 app.include_router(signature.router)
 app.include_router(agents.router)
 app.include_router(chat.router)
+app.include_router(metrics.router)
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Every connection stayed busy for db_pool_timeout: shed load instead of queueing further
+    POOL_TIMEOUTS.inc()
+    return JSONResponse(status_code=503, content={"detail": "Database busy, retry shortly"}, headers={"Retry-After": "1"})
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "version": "0.1.0"}
+    """Liveness: always 200 while the process can serve, with component latencies for dashboards."""
+    database = check_database()
+    return {
+        "status": "healthy" if database["status"] == "ok" else "degraded",
+        "version": "0.1.0",
+        "ready": warmup.ready,
+        "components": {"database": database, "llm_providers": check_providers()},
+        "warmup": warmup.report(),
+    }
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness: 503 until warm-up has finished and while the database is unreachable."""
+    database = check_database() if warmup.ready else None
+    ready = warmup.ready and database["status"] == "ok"
+    body = {"ready": ready, "database": database, "warmup": warmup.report()}
+    return JSONResponse(status_code=200 if ready else 503, content=body)
 
 if __name__ == "__main__":
     import uvicorn
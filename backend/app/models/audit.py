@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Index
 import uuid
 from datetime import datetime
 from ..database import Base
@@ -7,8 +7,11 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    case_id = Column(String, ForeignKey("cases.id"), nullable=False, index=True)
+    case_id = Column(String, ForeignKey("cases.id"), nullable=False)
     action = Column(String, nullable=False, index=True)
     details = Column(JSON, default={})
     performed_by = Column(String, default="SYSTEM")
     timestamp = Column(DateTime, default=datetime.now, index=True)
+
+    # A case's history, newest first, straight from the index with no sort step
+    __table_args__ = (Index("ix_audit_logs_case_id_timestamp", case_id, timestamp),)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DECIMAL, DateTime, Integer, JSON, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DECIMAL, DateTime, Integer, JSON, Date, Index, event, func, text
+from sqlalchemy.orm import relationship, object_session
 import uuid
 from datetime import datetime
 from ..database import Base
@@ -119,3 +119,26 @@ class Case(Base):
     # Relationships
     signature_tokens = relationship("SignatureToken", back_populates="case", cascade="all, delete-orphan")
     version = Column(Integer, default=1)
+
+    # Indexes for the hot queries; tests/test_query_plans.py checks they are used
+    __table_args__ = (
+        # Duplicate defendant lookup compares lower-cased names
+        Index("ix_cases_defendant_name_lower", func.lower(defendant_last_name), func.lower(defendant_first_name)),
+        # Workload counts: state IN (...) grouped by assignee
+        Index("ix_cases_state_assigned_to", state, assigned_to),
+        # Most cases are never assigned an advisor or booking number, so only index the rows that have one
+        Index("ix_cases_assigned_to", assigned_to, sqlite_where=text("assigned_to IS NOT NULL"), postgresql_where=text("assigned_to IS NOT NULL")),
+        Index("ix_cases_advisor_id", advisor_id, sqlite_where=text("advisor_id IS NOT NULL"), postgresql_where=text("advisor_id IS NOT NULL")),
+        Index("ix_cases_booking_number", booking_number, sqlite_where=text("booking_number IS NOT NULL"), postgresql_where=text("booking_number IS NOT NULL")),
+        # Dashboards list newest first and poll for recent changes
+        Index("ix_cases_created_at", created_at, id),
+        Index("ix_cases_updated_at", updated_at),
+    )
+
+
+@event.listens_for(Case, "before_update")
+def _bump_version(mapper, connection, target):
+    """Every real change to a case gets a new version; projections and caches key on it."""
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.version = (target.version or 0) + 1
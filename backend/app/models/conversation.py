@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, Integer, JSON, Text, UniqueConstraint
+import uuid
+from datetime import datetime
+from ..database import Base
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+    __table_args__ = (UniqueConstraint("user_id", "case_id", name="uq_conversation_user_case"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, nullable=False, index=True)  # JWT subject (email)
+    case_id = Column(String, nullable=True, index=True)   # NULL for general questions outside a case
+
+    # Rolling memory: a running summary of older turns plus the recent turns verbatim
+    summary = Column(Text, nullable=True)
+    turns = Column(JSON, default=[])  # [{"role": "user" | "assistant", "content": "..."}]
+    summarized_turns = Column(Integer, default=0)  # Turns folded into the summary so far
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
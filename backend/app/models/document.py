@@ -0,0 +1,36 @@
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Index, JSON
+from datetime import datetime
+import uuid
+from app.database import Base
+
+
+class Document(Base):
+    """An uploaded file. Bytes live in storage under a content-addressed key, shared by identical uploads."""
+    __tablename__ = "documents"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    case_id = Column(String, ForeignKey("cases.id"), nullable=False, index=True)
+    document_type = Column(String, nullable=False)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)  # Dedup index: one stored object per distinct content
+    storage_key = Column(String, nullable=False)
+    verification_status = Column(String, nullable=True, index=True)  # PENDING while queued, then DONE or FAILED
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DocumentExtraction(Base):
+    """Fields read from a document by the vision model, shared by every upload of the same content."""
+    __tablename__ = "document_extractions"
+    __table_args__ = (Index("ix_document_extractions_lookup", "sha256", "doc_type", "prompt"),)
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False)
+    doc_type = Column(String, nullable=False)
+    prompt = Column(String, nullable=False)  # Prompt id (e.g. doc_verify@v1): a new prompt version re-extracts
+    is_valid_document = Column(Boolean, nullable=False)
+    document_type_detected = Column(String, nullable=False)
+    extracted_data = Column(JSON, nullable=False)
+    confidence_score = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
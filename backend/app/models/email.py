@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from datetime import datetime
+import uuid
+from app.database import Base
+
+
+class OutboundEmail(Base):
+    """
+    An email in the outbox. Requests only insert the row; the mail worker sends it
+    and records the delivery status (QUEUED -> SENDING -> SENT, or FAILED after the last attempt).
+    """
+    __tablename__ = "outbound_emails"
+    __table_args__ = (Index("ix_outbound_emails_due", "status", "next_attempt_at"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    case_id = Column(String, ForeignKey("cases.id"), nullable=True, index=True)
+    template = Column(String, nullable=False)  # e.g. signature_request; metrics are labelled by it
+    to_address = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="QUEUED")
+    attempts = Column(Integer, nullable=False, default=0)
+    # When the worker may next pick the email up: the retry time, or the lease expiry while SENDING
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    message_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, DateTime, Float, Integer, Boolean
+import uuid
+from datetime import datetime
+from ..database import Base
+
+class TraceSpan(Base):
+    __tablename__ = "trace_spans"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    parent_id = Column(String, nullable=True)
+    case_id = Column(String, nullable=True, index=True)
+    kind = Column(String, nullable=False)  # node, agent
+    name = Column(String, nullable=False, index=True)  # Node function or agent class name
+    model = Column(String, nullable=True)
+    prompt = Column(String, nullable=True)  # Prompt template id, e.g. risk@v1
+    status = Column(String, nullable=False, default="OK")  # OK, ERROR
+    error = Column(String, nullable=True)
+
+    # Timing (milliseconds)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    duration_ms = Column(Float, nullable=False, default=0.0)
+    queue_wait_ms = Column(Float, nullable=False, default=0.0)
+
+    # LLM usage
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cost_usd = Column(Float, default=0.0)
+    cache_hit = Column(Boolean, default=False)
+    cached_prompt_tokens = Column(Integer, default=0)  # Prompt tokens served from the provider's prefix cache
+    retries = Column(Integer, default=0)
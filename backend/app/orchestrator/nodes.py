@@ -4,10 +4,13 @@ from ..agents.risk import risk_agent
 from ..agents.explanation import explanation_agent
 from ..rules.engine import rule_engine
 from ..rules import bail_rules # Ensure rules are registered
+from sqlalchemy import func, select
 from ..database import SessionLocal
 from ..models.case import Case as CaseModel
 from ..services.audit import AuditService
+from ..telemetry.tracing import traced_node
 
+@traced_node
 def intake_node(state: CaseState) -> CaseState:
     """
     Run the Intake Agent to extract facts from raw input.
@@ -35,6 +38,22 @@ def intake_node(state: CaseState) -> CaseState:
         
     return state
 
+def duplicate_query(case_id: str, first_name: str, last_name: str, dob: str = None):
+    """Another case for the same defendant: case-insensitive name match, plus DOB when known."""
+    # lower() = lower() rather than ILIKE so ix_cases_defendant_name_lower can serve it
+    query = select(CaseModel).where(
+        func.lower(CaseModel.defendant_last_name) == last_name.lower(),
+        func.lower(CaseModel.defendant_first_name) == first_name.lower(),
+        CaseModel.id != case_id
+    )
+    if dob:
+        query = query.where(CaseModel.defendant_dob == dob)
+    return query.limit(1)
+
+def find_duplicate(db, case_id: str, first_name: str, last_name: str, dob: str = None):
+    return db.execute(duplicate_query(case_id, first_name, last_name, dob)).scalars().first()
+
+@traced_node
 def dedup_node(state: CaseState) -> CaseState:
     """
     Check for existing cases with the same defendant details to prevent duplicates.
@@ -51,17 +70,7 @@ def dedup_node(state: CaseState) -> CaseState:
 
     db = SessionLocal()
     try:
-        # Simple exact match on Name + DOB (if available)
-        query = db.query(CaseModel).filter(
-            CaseModel.defendant_first_name.ilike(first_name),
-            CaseModel.defendant_last_name.ilike(last_name),
-            CaseModel.id != case_id
-        )
-        
-        if dob:
-            query = query.filter(CaseModel.defendant_dob == dob)
-            
-        existing_case = query.first()
+        existing_case = find_duplicate(db, case_id, first_name, last_name, dob)
         
         if existing_case:
             msg = f"Potential Duplicate Found: Case ID {existing_case.id} matches Defendant {first_name} {last_name}"
@@ -83,6 +92,7 @@ def dedup_node(state: CaseState) -> CaseState:
         
     return state
 
+@traced_node
 def decision_node(state: CaseState) -> CaseState:
     """
     Evaluate rules based on current state to determine next state or blockers.
@@ -116,6 +126,7 @@ def decision_node(state: CaseState) -> CaseState:
     
     return state
 
+@traced_node
 def risk_node(state: CaseState) -> CaseState:
     db = SessionLocal()
     try:
@@ -131,6 +142,7 @@ def risk_node(state: CaseState) -> CaseState:
         db.close()
     return state
 
+@traced_node
 def explanation_node(state: CaseState) -> CaseState:
     db = SessionLocal()
     try:
@@ -144,7 +156,7 @@ def explanation_node(state: CaseState) -> CaseState:
         output = explanation_agent.run(context)
         state['agent_outputs']['explanation'] = output
         state['history'].append("Explanation Agent ran")
-        AuditService.log_action(db, state['case_id'], "EXPLANATION_GENERATED", {"summary": output[:100] + "..."})
+        AuditService.log_action(db, state['case_id'], "EXPLANATION_GENERATED", {"summary": output.get("summary")})
     except Exception as e:
         state['history'].append(f"Explanation Agent Failed: {str(e)}")
     finally:
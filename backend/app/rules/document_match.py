@@ -0,0 +1,204 @@
+"""
+Deterministic comparison of fields read off a document with the case facts.
+
+The vision model only extracts; deciding whether "DOE, JOHN A." on a booking
+sheet is the case's "John Doe" happens here: names are compared
+accent-, case-, order- and suffix-insensitively with a fuzzy fallback for OCR
+noise, dates are canonicalised from the formats jails and IDs print, and
+booking numbers are compared without punctuation or zero padding. Each field
+gets a status and a confidence, so a document can be re-matched instantly when
+the case is edited.
+
+`cross_check` compares documents of one case with each other: a booking
+sheet and an ID that disagree about the defendant need a human even when each
+is close enough to the case on its own.
+"""
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+import itertools
+import re
+import unicodedata
+
+MATCH, MISMATCH, UNCLEAR, MISSING = "MATCH", "MISMATCH", "UNCLEAR", "MISSING"
+
+NAME_MATCH = 0.9  # Similarity at or above which a name counts as the same (tolerates a misread letter)
+NAME_UNCLEAR = 0.75  # Between this and NAME_MATCH a human should look
+
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y%m%d", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%m-%d-%y", "%d/%m/%Y",
+                "%d-%m-%Y", "%d.%m.%Y", "%d %b %Y", "%d-%b-%Y", "%b %d %Y", "%B %d %Y", "%d %B %Y")
+
+# Keys the vision model may use for each field in extracted_data (normalised to lower-case alphanumerics)
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    "name": ("fullname", "name", "defendantname", "defendant", "holdername", "indemnitorname"),
+    "dob": ("dateofbirth", "dob", "birthdate"),
+    "booking_number": ("bookingnumber", "booking", "bookingno", "bookingid"),
+}
+
+
+@dataclass
+class FieldMatch:
+    field: str
+    expected: Optional[str]
+    found: Optional[str]
+    status: str
+    confidence: float
+
+
+@dataclass
+class MatchResult:
+    match_status: str
+    mismatches: List[str]
+    fields: List[FieldMatch]
+
+    def as_dict(self) -> dict:
+        return {"match_status": self.match_status, "mismatches": self.mismatches,
+                "field_matches": [asdict(f) for f in self.fields]}
+
+
+def _fold(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)).lower()
+
+
+def name_tokens(name: str) -> List[str]:
+    """Lower-case, accent-free name parts in first-to-last order ("DOE, JOHN A." -> john, a, doe), suffixes dropped."""
+    name = _fold(str(name))
+    if "," in name:
+        last, _, rest = name.partition(",")
+        name = f"{rest} {last}"
+    return [t for t in re.split(r"[^a-z]+", name) if t and t not in NAME_SUFFIXES]
+
+
+def compare_names(expected: str, found: str) -> float:
+    want, got = name_tokens(expected), name_tokens(found)
+    if not want or not got:
+        return 0.0
+    # Every part on file appears on the document (a middle name or initial on the ID is fine)
+    if set(want) <= set(got):
+        return 1.0
+    # First and last present but the document has a middle initial where the case has the full middle name
+    if want[0] == got[0] and want[-1] == got[-1]:
+        return 0.95
+    return SequenceMatcher(None, " ".join(sorted(want)), " ".join(sorted(got))).ratio()
+
+
+def canonical_dates(value) -> List[date]:
+    """Every date `value` can be read as; two readings for ambiguous day/month orders like 03/04/1990."""
+    if isinstance(value, datetime):
+        return [value.date()]
+    if isinstance(value, date):
+        return [value]
+    text = " ".join(str(value).replace(",", " ").split())
+    readings = []
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+        if "%y" in fmt and parsed.year > date.today().year:  # Two-digit years: 05/06/30 is 1930, not 2030
+            parsed = parsed.replace(year=parsed.year - 100)
+        if parsed not in readings:
+            readings.append(parsed)
+    return readings
+
+
+def normalise_booking(value) -> str:
+    return re.sub(r"[^A-Z0-9]", "", str(value).upper())
+
+
+def _strip_zeros(booking: str) -> str:
+    return re.sub(r"(?<![0-9])0+(?=[0-9])", "", booking)
+
+
+def compare_bookings(expected, found) -> float:
+    want, got = normalise_booking(expected), normalise_booking(found)
+    if not want or not got:
+        return 0.0
+    if want == got:
+        return 1.0
+    if _strip_zeros(want) == _strip_zeros(got):
+        return 0.95
+    # Same number, printed with or without the facility prefix (HC-100231 vs 100231)
+    digits_want, digits_got = re.sub(r"\D", "", want).lstrip("0"), re.sub(r"\D", "", got).lstrip("0")
+    if digits_want and digits_want == digits_got:
+        return 0.85
+    return 0.0
+
+
+def _field(name: str, expected, found) -> FieldMatch:
+    if found in (None, ""):
+        return FieldMatch(name, str(expected), None, MISSING, 0.0)
+    if name.endswith("name"):
+        score = compare_names(expected, found)
+        status = MATCH if score >= NAME_MATCH else UNCLEAR if score >= NAME_UNCLEAR else MISMATCH
+    elif name.endswith("dob"):
+        want, got = canonical_dates(expected), canonical_dates(found)
+        if not want or not got:
+            score, status = 0.3, UNCLEAR
+        elif want[0] in got:
+            score, status = (1.0 if len(got) == 1 else 0.9), MATCH
+        else:
+            score, status = 0.0, MISMATCH
+    else:
+        score = compare_bookings(expected, found)
+        status = MATCH if score >= 0.85 else MISMATCH
+    return FieldMatch(name, str(expected), str(found), status, round(score, 3))
+
+
+# Which case facts each document type is checked against: (field, case fact, extracted key group)
+DOCUMENT_FIELDS: Dict[str, Tuple[Tuple[str, str, str], ...]] = {
+    "booking_sheet": (("defendant_name", "defendant_name", "name"), ("defendant_dob", "defendant_dob", "dob"),
+                      ("booking_number", "booking_number", "booking_number")),
+    "defendant_id": (("defendant_name", "defendant_name", "name"), ("defendant_dob", "defendant_dob", "dob")),
+    "gov_id": (("defendant_name", "defendant_name", "name"), ("defendant_dob", "defendant_dob", "dob")),
+    "indemnitor_id": (("indemnitor_name", "indemnitor_name", "name"),),
+}
+
+
+def _extracted(extracted_data: dict, group: str):
+    values = {re.sub(r"[^a-z0-9]", "", k.lower()): v for k, v in (extracted_data or {}).items()}
+    return next((values[a] for a in ALIASES[group] if values.get(a) not in (None, "")), None)
+
+
+def match_document(extracted_data: dict, case_data: dict, doc_type: str) -> MatchResult:
+    """
+    Compare a document's extracted fields with the case. Fields the case has no value for are skipped;
+    document types with nothing to cross-check (collateral, other) match if they were read at all.
+    """
+    fields = [
+        _field(name, case_data[fact], _extracted(extracted_data, group))
+        for name, fact, group in DOCUMENT_FIELDS.get(doc_type, ())
+        if case_data.get(fact) not in (None, "")
+    ]
+    mismatches = [f"{f.field}: document says '{f.found}', case has '{f.expected}'" for f in fields if f.status == MISMATCH]
+    if mismatches:
+        status = MISMATCH
+    elif any(f.status in (UNCLEAR, MISSING) for f in fields):
+        status = UNCLEAR
+    else:
+        status = MATCH if fields or extracted_data else UNCLEAR
+    return MatchResult(status, mismatches, fields)
+
+
+# Documents that all describe the defendant, so their names and dates of birth must agree
+DEFENDANT_DOCUMENTS = ("booking_sheet", "defendant_id", "gov_id")
+
+
+def cross_check(documents: Dict[str, dict]) -> Dict[str, List[str]]:
+    """Inconsistencies between the extracted data of a case's documents (by doc type), listed under each document involved."""
+    issues: Dict[str, List[str]] = {doc_type: [] for doc_type in documents}
+    found = {t: (_extracted(documents[t], "name"), _extracted(documents[t], "dob")) for t in DEFENDANT_DOCUMENTS if t in documents}
+    for a, b in itertools.combinations(found, 2):
+        (name_a, dob_a), (name_b, dob_b) = found[a], found[b]
+        problems = []
+        # Either way round: one document may carry a middle name the other lacks
+        if name_a and name_b and max(compare_names(name_a, name_b), compare_names(name_b, name_a)) < NAME_UNCLEAR:
+            problems.append(f"name: {a} says '{name_a}', {b} says '{name_b}'")
+        dates_a, dates_b = (canonical_dates(dob_a) if dob_a else []), (canonical_dates(dob_b) if dob_b else [])
+        if dates_a and dates_b and not set(dates_a) & set(dates_b):
+            problems.append(f"date of birth: {a} says '{dob_a}', {b} says '{dob_b}'")
+        issues[a] += problems
+        issues[b] += problems
+    return issues
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from typing import Optional
+import threading
+
+from ..config import settings
+from ..models.conversation import Conversation
+from ..agents.chat import chat_agent
+from ..agents.context import CONTEXT_SPECS, build_context
+from ..agents.providers import estimate_tokens
+from .facts_service import facts_service
+from ..telemetry.metrics import registry
+
+CONTEXT_CACHE = registry.counter("bondpath_chat_context_cache", "Copilot case context block lookups", ["result"])
+COMPACTIONS = registry.counter("bondpath_chat_compactions", "Copilot conversations whose older turns were summarised")
+
+
+class ConversationService:
+    """
+    Per-user, per-case copilot memory.
+
+    History sent to the model is a running summary plus the most recent turns,
+    kept under `chat_history_token_budget`. The serialised case block is cached
+    per case version so follow-up questions don't re-serialise the case.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self._context_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, db: Session, user_id: str, case_id: Optional[str] = None) -> Conversation:
+        conversation = db.query(Conversation).filter(
+            Conversation.user_id == user_id,
+            Conversation.case_id == case_id if case_id else Conversation.case_id.is_(None)
+        ).first()
+        if not conversation:
+            conversation = Conversation(user_id=user_id, case_id=case_id, turns=[])
+            db.add(conversation)
+            db.commit()
+            db.refresh(conversation)
+        return conversation
+
+    def history(self, conversation: Conversation) -> list:
+        """Chat messages for the prompt: the summary (if any) followed by the recent turns."""
+        messages = []
+        if conversation.summary:
+            messages.append({"role": "system", "content": f"EARLIER IN THIS CONVERSATION:\n{conversation.summary}"})
+        messages.extend(conversation.turns or [])
+        return messages
+
+    def record_turn(self, db: Session, conversation: Conversation, question: str, answer: str):
+        conversation.turns = [
+            *(conversation.turns or []),
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer},
+        ]
+        self.compact(conversation)
+        db.commit()
+
+    def compact(self, conversation: Conversation) -> bool:
+        """
+        Summarise the oldest turns once the history is over budget, keeping the
+        newest `chat_keep_recent_turns` messages verbatim. On LLM failure the turns
+        are kept as-is and compaction is retried on the next turn.
+        """
+        turns = conversation.turns or []
+        used = estimate_tokens(conversation.summary) + sum(estimate_tokens(t["content"]) for t in turns)
+        keep = settings.chat_keep_recent_turns
+        if used <= settings.chat_history_token_budget or len(turns) <= keep:
+            return False
+
+        older, recent = turns[:-keep], turns[-keep:]
+        try:
+            summary = chat_agent.summarise(conversation.summary, older)
+        except Exception as e:
+            print(f"Warning: Failed to summarise conversation {conversation.id}: {e}")
+            return False
+
+        conversation.summary = summary
+        conversation.turns = recent
+        conversation.summarized_turns = (conversation.summarized_turns or 0) + len(older)
+        COMPACTIONS.inc()
+        return True
+
+    def clear(self, db: Session, conversation: Conversation):
+        conversation.summary = None
+        conversation.turns = []
+        conversation.summarized_turns = 0
+        db.commit()
+
+    def case_context(self, db: Session, case_id: Optional[str]) -> Optional[str]:
+        """
+        Compact JSON block describing the case for the copilot, cached per case
+        version. Only the version columns are read unless the block is stale.
+        """
+        if not case_id:
+            return None
+        stamp = facts_service.version(db, case_id)
+        if not stamp:
+            return None
+
+        key = (case_id, *stamp)
+        with self._lock:
+            block = self._context_cache.get(key)
+            if block is not None:
+                self._context_cache.move_to_end(key)
+                CONTEXT_CACHE.inc(result="hit")
+                return block
+
+        CONTEXT_CACHE.inc(result="miss")
+        facts = facts_service.get(db, case_id, "chat")
+        if facts is None:
+            return None
+        block = build_context(facts, CONTEXT_SPECS["ChatAgent"], agent="ChatAgent").text
+
+        with self._lock:
+            # Older versions of this case can never be hit again
+            for stale in [k for k in self._context_cache if k[0] == case_id]:
+                del self._context_cache[stale]
+            self._context_cache[key] = block
+            while len(self._context_cache) > self.cache_size:
+                self._context_cache.popitem(last=False)
+        return block
+
+
+conversation_service = ConversationService(cache_size=settings.chat_context_cache_size)
@@ -0,0 +1,101 @@
+"""
+Uploaded documents: storing them through the storage backend and mapping the
+`/documents/{id}` URLs saved on cases back to stored objects.
+
+Objects are keyed by the SHA-256 of their content, so a file uploaded twice
+(the same ID for two cases, a retried upload) is stored once; each upload
+still gets its own `documents` row.
+"""
+from pathlib import Path
+from typing import BinaryIO, Optional
+from urllib.parse import urlsplit
+import mimetypes
+import re
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.case import Case
+from ..models.document import Document
+from ..storage import content_key, hash_stream, storage
+from ..telemetry.metrics import registry
+
+DOCUMENTS_STORED = registry.counter("bondpath_documents_stored", "Document uploads by whether the content was already stored", ["result"])
+
+# Case columns that link to an uploaded document, by document type
+URL_COLUMNS = {
+    "booking_sheet": "booking_sheet_url",
+    "defendant_id": "defendant_id_url",
+    "indemnitor_id": "indemnitor_id_url",
+    "gov_id": "gov_id_url",
+    "collateral_doc": "collateral_doc_url",
+}
+
+DOCUMENT_PATH = re.compile(r"^/documents/([0-9a-f-]{36})$")
+
+
+class DocumentTooLarge(Exception):
+    pass
+
+
+class DocumentService:
+    def save(self, db: Session, case_id: str, document_type: str, filename: str,
+             content_type: Optional[str], fileobj: BinaryIO) -> Document:
+        """Hash and store an upload (unless identical content is already stored) and record it. Blocking: call from a thread."""
+        sha256, size = hash_stream(fileobj)
+        if size > settings.document_max_bytes:
+            raise DocumentTooLarge(f"Document is {size} bytes; the limit is {settings.document_max_bytes}")
+
+        key = content_key(sha256)
+        # The sha256 index answers the common case; the stat covers an object written before its row was committed
+        known = db.query(Document.id).filter(Document.sha256 == sha256).first() is not None
+        if known or storage.exists(key):
+            DOCUMENTS_STORED.inc(result="deduplicated")
+        else:
+            storage.put(key, fileobj, size, sha256, content_type or "application/octet-stream")
+            DOCUMENTS_STORED.inc(result="stored")
+
+        # Letters (any script), digits and ._- only; content_disposition encodes the non-ASCII ones for headers
+        safe_filename = "".join(x for x in filename or "" if x.isalnum() or x in "._-") or "document"
+        document = Document(
+            case_id=case_id, document_type=document_type, filename=safe_filename,
+            content_type=content_type or "application/octet-stream", size=size, sha256=sha256, storage_key=key,
+        )
+        db.add(document)
+        db.flush()
+        return document
+
+    def url(self, document: Document, base_url: str) -> str:
+        return f"{base_url.rstrip('/')}/documents/{document.id}"
+
+    def for_url(self, db: Session, url: str) -> Optional[Document]:
+        """The document behind one of our `/documents/{id}` URLs, or None for anything else."""
+        match = DOCUMENT_PATH.match(urlsplit(url).path)
+        return db.get(Document, match.group(1)) if match else None
+
+    def import_static_uploads(self, db: Session, directory: str) -> int:
+        """
+        Move files uploaded before the storage backend (linked as .../static/<case>_<type>_<name>)
+        into storage and point their cases at /documents/{id}. Idempotent; returns the number moved.
+        """
+        moved = 0
+        for case in db.query(Case).all():
+            for document_type, column in URL_COLUMNS.items():
+                url = getattr(case, column)
+                if not url or "/static/" not in url:
+                    continue
+                base, name = url.rsplit("/static/", 1)
+                path = Path(directory) / name
+                if not path.is_file():
+                    print(f"Legacy upload missing for case {case.id}: {path}")
+                    continue
+                filename = name.removeprefix(f"{case.id}_{document_type}_")
+                with open(path, "rb") as f:
+                    document = self.save(db, case.id, document_type, filename, mimetypes.guess_type(filename)[0], f)
+                setattr(case, column, self.url(document, base))
+                moved += 1
+        db.commit()
+        return moved
+
+
+document_service = DocumentService()
@@ -0,0 +1,298 @@
+"""
+Outbound mail: a database-backed queue drained by worker threads over pooled
+SMTP connections.
+
+Requests never talk to the relay. They insert an `OutboundEmail` row and
+nudge the outbox; a worker claims due emails in batches, sends each batch
+over one authenticated connection borrowed from `SMTPPool` (kept open between
+batches, so the TLS handshake and login are paid once per connection rather
+than per email) and records the outcome on the row:
+
+- SENT, with the Message-ID and time;
+- a transient failure (connection trouble, 4xx) goes back to QUEUED with
+  exponential backoff, until `max_attempts`;
+- a permanent rejection (5xx) or the last attempt ends in FAILED.
+
+Claiming moves a row to SENDING with a lease; if the worker dies mid-send the
+lease runs out and another worker picks the email up again. Because the queue
+is the table, queued mail survives restarts and several processes can share
+it.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import make_msgid
+from typing import Callable, Iterator, List, Optional, Tuple
+import logging
+import smtplib
+import ssl
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.email import OutboundEmail
+from ..telemetry.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+QUEUED, SENDING, SENT, FAILED = "QUEUED", "SENDING", "SENT", "FAILED"
+
+EMAIL_SEND_DURATION = registry.histogram(
+    "bondpath_email_send_duration_seconds", "Time to hand one email to the relay over a pooled connection", ["template", "status"]
+)
+EMAILS = registry.counter("bondpath_emails", "Outbound email delivery attempts", ["template", "outcome"])
+SMTP_CONNECTIONS = registry.counter("bondpath_smtp_connections", "SMTP connections opened (connect, TLS, login)", ["result"])
+
+
+class SMTPPool:
+    """Authenticated SMTP connections, reused across batches; a connection idle for too long is closed, not reused."""
+
+    def __init__(self, host: str, port: int, tls: bool = False, user: str = "", password: str = "",
+                 size: int = 2, timeout: float = 20.0, idle_seconds: float = 60.0):
+        self.host, self.port, self.tls = host, port, tls
+        self.user, self.password = user, password
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        logger.info(f"Connecting to SMTP server {self.host}:{self.port}...")
+        if self.port == 465:
+            # Implicit SSL (SMTPS)
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+            server.ehlo()
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.ehlo()
+            if self.tls:
+                # Explicit TLS (STARTTLS)
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+        try:
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        return server
+
+    def _close(self, server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                server, last_used = self._idle.pop() if self._idle else (None, 0.0)
+            if server is None:
+                break
+            if time.monotonic() - last_used > self.idle_seconds:
+                self._close(server)
+                continue
+            # Relays drop idle connections without telling us; a NOOP finds out before a message is lost to it
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            server.close()
+        try:
+            server = self._connect()
+        except Exception:
+            SMTP_CONNECTIONS.inc(result="error")
+            raise
+        SMTP_CONNECTIONS.inc(result="ok")
+        return server
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """Borrow a connection; it goes back to the pool unless the block raised."""
+        with self._slots:
+            server = self._checkout()
+            try:
+                yield server
+            except BaseException:
+                server.close()
+                raise
+            with self._lock:
+                self._idle.append((server, time.monotonic()))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+
+def _permanent(error: Exception) -> bool:
+    """5xx replies won't change on retry; connection problems and 4xx replies might."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException) and not isinstance(error, smtplib.SMTPAuthenticationError):
+        return error.smtp_code >= 500
+    return False
+
+
+class EmailOutbox:
+    def __init__(self, pool: SMTPPool, session_factory: Optional[Callable[[], Session]] = None, workers: int = 2,
+                 batch_size: int = 20, max_attempts: int = 5, retry_seconds: float = 30.0,
+                 poll_seconds: float = 5.0, lease_seconds: float = 300.0, sender: Optional[str] = None):
+        self.pool = pool
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.sender = sender or settings.EMAIL_FROM
+        self._threads: List[threading.Thread] = []
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from ..database import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def notify(self):
+        """Wake a worker: call after committing new emails so they go out now, not at the next poll."""
+        self._wake.set()
+
+    def start(self):
+        if self._threads or self.workers <= 0:
+            return
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"mail-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        self._stopping.clear()
+        self.pool.close()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            self._wake.clear()  # Before looking, so an email committed meanwhile still wakes the wait below
+            try:
+                if self.run_pending():
+                    continue
+            except Exception as e:
+                print(f"Mail worker error: {e}")
+            self._wake.wait(self.poll_seconds)
+
+    def run_pending(self, now: Optional[datetime] = None) -> int:
+        """Send every email due at `now` (default: the current time), batch by batch. Returns the number attempted."""
+        attempted = 0
+        while not self._stopping.is_set():
+            db = self._session()
+            try:
+                emails = self._claim(db, now or datetime.utcnow())
+                if not emails:
+                    return attempted
+                self._send_batch(db, emails, now or datetime.utcnow())
+                db.commit()
+                attempted += len(emails)
+            finally:
+                db.close()
+        return attempted
+
+    def _claim(self, db: Session, now: datetime) -> List[OutboundEmail]:
+        """Move up to batch_size due emails to SENDING under a lease; a row another worker claimed first is skipped."""
+        due = db.query(OutboundEmail.id).filter(
+            OutboundEmail.status.in_((QUEUED, SENDING)), OutboundEmail.next_attempt_at <= now
+        ).order_by(OutboundEmail.next_attempt_at).limit(self.batch_size).all()
+        lease = now + timedelta(seconds=self.lease_seconds)
+        claimed = [
+            email_id for (email_id,) in due
+            if db.query(OutboundEmail).filter(
+                OutboundEmail.id == email_id, OutboundEmail.status.in_((QUEUED, SENDING)), OutboundEmail.next_attempt_at <= now
+            ).update({"status": SENDING, "next_attempt_at": lease}, synchronize_session=False)
+        ]
+        db.commit()
+        if not claimed:
+            return []
+        return db.query(OutboundEmail).filter(OutboundEmail.id.in_(claimed)).order_by(OutboundEmail.created_at).all()
+
+    def _message(self, email: OutboundEmail) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = email.subject
+        msg['From'] = self.sender
+        msg['To'] = email.to_address
+        msg['Message-ID'] = email.message_id
+        msg.attach(MIMEText(email.html_body, 'html'))
+        return msg
+
+    def _send_batch(self, db: Session, emails: List[OutboundEmail], now: datetime):
+        for email in emails:
+            email.attempts += 1
+            email.message_id = email.message_id or make_msgid(domain=self.sender.partition("@")[2] or None)
+        try:
+            with self.pool.connection() as server:
+                for email in emails:
+                    started = time.perf_counter()
+                    try:
+                        server.send_message(self._message(email))
+                    except smtplib.SMTPServerDisconnected:
+                        raise  # The connection is gone: the rest of the batch is retried below
+                    except smtplib.SMTPException as e:
+                        # Rejected message; the session stays usable for the next one
+                        EMAIL_SEND_DURATION.observe(time.perf_counter() - started, template=email.template, status="error")
+                        self._failed(email, e, now)
+                        server.rset()
+                        continue
+                    except OSError:
+                        raise  # Socket error (SMTPException is an OSError too, so this comes after it)
+                    except Exception as e:
+                        # The message itself can't be built or sent (e.g. a malformed address); retrying won't help
+                        self._failed(email, e, now, permanent=True)
+                        continue
+                    EMAIL_SEND_DURATION.observe(time.perf_counter() - started, template=email.template, status="sent")
+                    self._sent(email)
+        except (smtplib.SMTPException, OSError) as e:
+            logger.error(f"SMTP Error: {str(e)}")
+            for email in emails:
+                if email.status == SENDING:
+                    self._failed(email, e, now)
+
+    def _sent(self, email: OutboundEmail):
+        email.status, email.sent_at, email.last_error = SENT, datetime.utcnow(), None
+        EMAILS.inc(template=email.template, outcome="sent")
+        logger.info(f"{email.template} email sent to {email.to_address} for case {email.case_id}")
+
+    def _failed(self, email: OutboundEmail, error: Exception, now: datetime, permanent: bool = False):
+        email.last_error = f"{type(error).__name__}: {error}"[:500]
+        if permanent or _permanent(error) or email.attempts >= self.max_attempts:
+            email.status = FAILED
+            EMAILS.inc(template=email.template, outcome="failed")
+            logger.error(f"Giving up on {email.template} email to {email.to_address}: {email.last_error}")
+            return
+        email.status = QUEUED
+        email.next_attempt_at = now + timedelta(seconds=self.retry_seconds * 2 ** (email.attempts - 1))
+        EMAILS.inc(template=email.template, outcome="retried")
+
+
+smtp_pool = SMTPPool(
+    settings.SMTP_HOST, settings.SMTP_PORT, tls=settings.SMTP_TLS, user=settings.SMTP_USER,
+    password=settings.SMTP_PASSWORD, size=settings.SMTP_POOL_SIZE, timeout=settings.SMTP_TIMEOUT,
+    idle_seconds=settings.SMTP_IDLE_SECONDS,
+)
+email_outbox = EmailOutbox(
+    smtp_pool, workers=settings.EMAIL_WORKERS, batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS, retry_seconds=settings.EMAIL_RETRY_SECONDS,
+    poll_seconds=settings.EMAIL_POLL_SECONDS, lease_seconds=settings.EMAIL_LEASE_SECONDS, sender=settings.EMAIL_FROM,
+)
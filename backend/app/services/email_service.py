@@ -1,27 +1,20 @@
-from typing import Optional
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from app.config import settings
-import logging
-
-logger = logging.getLogger(__name__)
+from app.models.email import OutboundEmail
 
 
 class EmailService:
-    """Service for sending emails"""
+    """Builds outbound emails; they are delivered by the outbox (services/email_outbox.py)"""
     
     @staticmethod
-    def send_signature_request(
+    def signature_request(
         to_email: str,
         case_id: str,
         defendant_name: str,
         bond_amount: float,
         advisor_name: str,
         signature_link: str
-    ) -> bool:
+    ) -> OutboundEmail:
         """
-        Send signature request email to client
+        Build the signature request email to a client; add it to a session and commit to send it
         
         Args:
             to_email: Client email address
@@ -32,17 +25,10 @@ class EmailService:
             signature_link: Unique signature link
             
         Returns:
-            True if email sent successfully, False otherwise
+            The queued email, not yet added to a session
         """
-        try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f'Bail Bond Agreement - {defendant_name}'
-            msg['From'] = settings.EMAIL_FROM
-            msg['To'] = to_email
-            
-            # Create HTML content
-            html_content = f"""
+        # Create HTML content
+        html_content = f"""
             <!DOCTYPE html>
             <html>
             <head>
@@ -105,65 +91,12 @@ class EmailService:
             </html>
             """
             
-            # Attach HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Send email via SMTP
-            try:
-                logger.info(f"Connecting to SMTP server {settings.SMTP_HOST}:{settings.SMTP_PORT}...")
-                
-                if settings.SMTP_PORT == 465:
-                    # Implicit SSL (SMTPS) - Preferred for stability
-                    server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, timeout=20)
-                    server.set_debuglevel(0) # Set to 1 to see SMTP conversation in stdout
-                    server.ehlo()
-                    
-                    if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                        
-                elif settings.SMTP_TLS:
-                    # Explicit TLS (STARTTLS)
-                    import ssl
-                    context = ssl.create_default_context()
-                    
-                    server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=20)
-                    server.set_debuglevel(0)
-                    server.ehlo()
-                    server.starttls(context=context)
-                    server.ehlo()
-                    
-                    if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                else:
-                    # Plain SMTP (No encryption - e.g. MailHog)
-                    server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=20)
-                    if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                
-                # Send email
-                server.send_message(msg)
-                server.quit()
-                
-                logger.info(f"Signature request email sent to {to_email} for case {case_id}")
-                return True
-                
-            except smtplib.SMTPAuthenticationError as auth_err:
-                logger.error(f"SMTP Authentication Error: {str(auth_err)} - Check your API Key and Verified Email")
-                return False
-            except smtplib.SMTPException as smtp_err:
-                logger.error(f"SMTP Error: {str(smtp_err)}")
-                return False
-            except Exception as conn_err:
-                logger.error(f"Connection Error: {str(conn_err)}")
-                return False
-            
-        except Exception as e:
-            logger.error(f"Failed to send signature request email: {str(e)}")
-            # Fallback for development/quota exceeded
-            logger.warning("==================================================================")
-            logger.warning(f"MOCK EMAIL (Send Failed): To {to_email}")
-            logger.warning(f"Signature Link: {signature_link}")
-            logger.warning("Returning True to allow flow to proceed.")
-            logger.warning("==================================================================")
-            return True
+        return OutboundEmail(
+            case_id=case_id,
+            template="signature_request",
+            to_address=to_email,
+            subject=f'Bail Bond Agreement - {defendant_name}',
+            html_body=html_content,
+            status="QUEUED",
+            attempts=0,
+        )
@@ -0,0 +1,219 @@
+"""
+Case-to-facts projections shared by agents, rules and the copilot.
+
+Each view names the columns it needs and builds a plain, JSON-safe dict from
+them. Views are compiled once into a single SELECT of just those columns;
+large text columns that only matter for presence (signatures, document URLs)
+are selected as `IS NOT NULL` flags instead of loading the blob. Results are
+memoised per (case, version, updated_at), so repeated reads of an unchanged
+case cost one indexed single-row lookup.
+"""
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+import threading
+
+from sqlalchemy import and_, bindparam, inspect, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.case import Case
+from ..telemetry.metrics import registry
+
+FACTS_CACHE = registry.counter("bondpath_facts_cache", "Case facts projection lookups", ["view", "result"])
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _amount(value: Any) -> float:
+    return float(value) if value else 0
+
+
+@dataclass
+class FactsView:
+    name: str
+    columns: Tuple[str, ...]
+    build: Callable[[Dict[str, Any]], Dict[str, Any]]
+    presence: Tuple[str, ...] = ()  # Loaded as booleans, never as values
+    statement: Any = field(init=False, repr=False)
+
+    def __post_init__(self):
+        flags = [and_(getattr(Case, c).isnot(None), getattr(Case, c) != "").label(c) for c in self.presence]
+        self.statement = select(
+            Case.version, Case.updated_at, *[getattr(Case, c) for c in self.columns], *flags
+        ).where(Case.id == bindparam("case_id"))
+
+    def from_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        values = {c: _plain(row[c]) for c in self.columns}
+        values.update({c: bool(row[c]) for c in self.presence})
+        return self.build(values)
+
+
+def _intake(r: dict) -> dict:
+    return {
+        "defendant_name": f"{r['defendant_first_name']} {r['defendant_last_name']}",
+        "bond_amount": _amount(r["bond_amount"]),
+        "bond_type": r["bond_type"],
+        "charge_severity": r["charge_severity"],
+        "county": r["county"],
+        "state": r["state_jurisdiction"],
+        "intent_signal": r["intent_signal"],
+        "fast_flags": r["fast_flags"],
+    }
+
+
+def _risk(r: dict) -> dict:
+    facts = {c: r[c] for c in RISK_COLUMNS}
+    facts["defendant_name"] = f"{r['defendant_first_name']} {r['defendant_last_name']}"
+    facts["bond_amount"] = _amount(r["bond_amount"])
+    facts["down_payment_amount"] = _amount(r["down_payment_amount"])
+    for column in DOCUMENT_COLUMNS:
+        facts[f"has_{column[:-len('_url')]}"] = r[column]
+    return facts
+
+
+def _readiness(r: dict) -> dict:
+    facts = dict(r)
+    facts["bond_amount"] = _amount(r["bond_amount"])
+    return facts
+
+
+def _doc_verify(r: dict) -> dict:
+    indemnitor = " ".join(filter(None, (r["indemnitor_first_name"], r["indemnitor_last_name"])))
+    return {
+        **r,
+        "defendant_name": f"{r['defendant_first_name']} {r['defendant_last_name']}",
+        "indemnitor_name": indemnitor or None,
+    }
+
+
+def _chat(r: dict) -> dict:
+    derived = r["derived_facts"] or {}
+    return {
+        "id": r["id"],
+        "defendant": f"{r['defendant_first_name']} {r['defendant_last_name']}",
+        "charges": r["charges"],
+        "bond_amount": r["bond_amount"],
+        "status": r["state"],
+        "risk_assessment": derived.get('risk'),
+        "missing_info": derived.get('missing_info', [])
+    }
+
+
+DOCUMENT_COLUMNS = ("booking_sheet_url", "defendant_id_url", "indemnitor_id_url", "gov_id_url", "collateral_doc_url")
+SIGNATURE_COLUMNS = (
+    "terms_signature", "fee_disclosure_signature", "contact_agreement_signature", "indemnitor_signature",
+    "co_signer_signature", "deferred_payment_auth_signature",
+)
+RISK_COLUMNS = (
+    "defendant_first_name", "defendant_last_name", "defendant_dob", "defendant_gender", "defendant_ssn_last4",
+    "jail_facility", "county", "state_jurisdiction", "booking_number",
+    "bond_amount", "bond_type", "charges", "charge_severity",
+    "indemnitor_first_name", "indemnitor_last_name", "indemnitor_relationship", "indemnitor_phone",
+    "indemnitor_email", "indemnitor_address",
+    "premium_type", "payment_method", "down_payment_amount",
+    "caller_name", "caller_relationship", "intent_signal", "fast_flags",
+)
+
+VIEWS: Dict[str, FactsView] = {view.name: view for view in (
+    FactsView("intake", (
+        "defendant_first_name", "defendant_last_name", "bond_amount", "bond_type", "charge_severity",
+        "county", "state_jurisdiction", "intent_signal", "fast_flags",
+    ), _intake),
+    FactsView("risk", RISK_COLUMNS, _risk, presence=DOCUMENT_COLUMNS),
+    FactsView("readiness", (
+        "id", "state", "defendant_first_name", "defendant_last_name", "defendant_dob", "defendant_gender",
+        "jail_facility", "county", "state_jurisdiction", "booking_number",
+        "bond_amount", "bond_type", "charges", "charge_severity",
+        "indemnitor_first_name", "indemnitor_last_name", "indemnitor_phone", "indemnitor_email",
+        "indemnitor_address", "indemnitor_relationship", "co_signer_name", "co_signer_phone",
+        "engagement_type", "contact_method", "premium_type", "down_payment_amount", "monthly_payment_amount",
+        "payment_method", "collateral_description", "has_collateral", "signatures_status", "documents_verified",
+        "advisor_notes", "advisor_next_step",
+    ), _readiness, presence=DOCUMENT_COLUMNS + SIGNATURE_COLUMNS),
+    FactsView("doc_verify", (
+        "defendant_first_name", "defendant_last_name", "defendant_dob", "booking_number", "bond_amount", "charges",
+        "indemnitor_first_name", "indemnitor_last_name",
+    ), _doc_verify),
+    FactsView("chat", (
+        "id", "state", "defendant_first_name", "defendant_last_name", "charges", "bond_amount", "derived_facts",
+    ), _chat),
+)}
+
+
+class FactsService:
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            facts = self._cache.get(key)
+            if facts is not None:
+                self._cache.move_to_end(key)
+            return facts
+
+    def _store(self, key: tuple, facts: dict):
+        with self._lock:
+            self._cache[key] = facts
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def version(self, db: Session, case_id: str) -> Optional[tuple]:
+        """(version, updated_at) of the case, or None if it doesn't exist."""
+        row = db.execute(select(Case.version, Case.updated_at).where(Case.id == case_id)).first()
+        return (row.version, row.updated_at) if row else None
+
+    def get(self, db: Session, case_id: str, view: str) -> Optional[dict]:
+        """Facts for `view`, reading only that view's columns. None if the case doesn't exist."""
+        projection = VIEWS[view]
+        stamp = self.version(db, case_id)
+        if stamp is None:
+            return None
+        key = (case_id, view, *stamp)
+        facts = self._lookup(key)
+        if facts is not None:
+            FACTS_CACHE.inc(view=view, result="hit")
+            return deepcopy(facts)
+
+        FACTS_CACHE.inc(view=view, result="miss")
+        row = db.execute(projection.statement, {"case_id": case_id}).mappings().first()
+        if row is None:
+            return None
+        facts = projection.from_row(row)
+        self._store((case_id, view, row["version"], row["updated_at"]), facts)
+        return deepcopy(facts)
+
+    def project(self, case: Case, view: str) -> dict:
+        """
+        Facts for `view` from a Case the caller already has loaded. Unflushed
+        changes on the instance bypass the memo so callers always see their edits.
+        """
+        projection = VIEWS[view]
+        pending = inspect(case).modified
+        key = (case.id, view, case.version, case.updated_at)
+        if not pending:
+            facts = self._lookup(key)
+            if facts is not None:
+                FACTS_CACHE.inc(view=view, result="hit")
+                return deepcopy(facts)
+
+        FACTS_CACHE.inc(view=view, result="miss")
+        row = {c: getattr(case, c) for c in projection.columns + projection.presence}
+        facts = projection.from_row(row)
+        if not pending:
+            self._store(key, facts)
+        return deepcopy(facts)
+
+
+facts_service = FactsService(cache_size=settings.facts_cache_size)
@@ -0,0 +1,189 @@
+"""
+Minimal SMTP server for tests and local development of the mail outbox, in
+the spirit of the MailHog setup the SMTP settings default to. Speaks enough
+ESMTP for smtplib (EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT),
+keeps every accepted message in memory and counts connections and logins so
+pooling can be observed. Failures can be injected per stage to exercise
+retries:
+
+    python -m app.services.fake_smtp --port 1025
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import argparse
+import base64
+import socket
+import socketserver
+import threading
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    recipients: List[str]
+    data: bytes
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _reply(self, code: int, text: str):
+        self.wfile.write(f"{code} {text}\r\n".encode())
+
+    def handle(self):
+        smtp = self.server.smtp
+        smtp._opened(self.connection)
+        try:
+            self._session(smtp)
+        finally:
+            smtp._closed(self.connection)
+
+    def _session(self, smtp: "FakeSMTPServer"):
+        self._reply(220, "fake-smtp ready")
+        authenticated = smtp.username is None
+        mail_from, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode("utf-8", "replace").rstrip("\r\n").partition(" ")
+            command = command.upper()
+
+            if command == "EHLO":
+                self.wfile.write(b"250-fake-smtp\r\n250-8BITMIME\r\n250 AUTH PLAIN\r\n")
+            elif command == "HELO":
+                self._reply(250, "fake-smtp")
+            elif command == "AUTH":
+                mechanism, _, response = argument.partition(" ")
+                try:
+                    _, username, password = base64.b64decode(response).decode().split("\0")
+                except ValueError:
+                    self._reply(501, "Malformed AUTH PLAIN response")
+                    continue
+                if mechanism.upper() != "PLAIN" or (username, password) != (smtp.username, smtp.password):
+                    self._reply(535, "Authentication failed")
+                    continue
+                authenticated = True
+                smtp.logins += 1
+                self._reply(235, "Authentication succeeded")
+            elif command in ("NOOP", "RSET"):
+                if command == "RSET":
+                    mail_from, recipients = None, []
+                self._reply(250, "OK")
+            elif command == "QUIT":
+                self._reply(221, "Bye")
+                return
+            elif not authenticated:
+                self._reply(530, "Authentication required")
+            elif command == "MAIL":
+                mail_from, recipients = argument.partition(":")[2].strip().split(" ")[0].strip("<>"), []
+                self._reply(250, "OK")
+            elif command == "RCPT":
+                failure = smtp._failure("rcpt")
+                if failure:
+                    self._reply(*failure)
+                    continue
+                recipients.append(argument.partition(":")[2].strip().strip("<>"))
+                self._reply(250, "OK")
+            elif command == "DATA":
+                if mail_from is None or not recipients:
+                    self._reply(503, "Need MAIL and RCPT first")
+                    continue
+                self._reply(354, "End data with <CR><LF>.<CR><LF>")
+                data = bytearray()
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk == b".\r\n":
+                        break
+                    data.extend(chunk[1:] if chunk.startswith(b"..") else chunk)
+                failure = smtp._failure("data")
+                if failure:
+                    self._reply(*failure)
+                else:
+                    smtp.messages.append(ReceivedMessage(mail_from, recipients, bytes(data)))
+                    if smtp.echo:
+                        print(f"Message {len(smtp.messages)}: {mail_from} -> {', '.join(recipients)} ({len(data)} bytes)")
+                    self._reply(250, f"OK queued as {len(smtp.messages)}")
+                mail_from, recipients = None, []
+            else:
+                self._reply(502, "Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeSMTPServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, username: Optional[str] = None, password: Optional[str] = None,
+                 echo: bool = False):
+        self.username, self.password = username, password
+        self.echo = echo
+        self.messages: List[ReceivedMessage] = []
+        self.connections = 0
+        self.logins = 0
+        self._failures: List[Tuple[str, int, str]] = []
+        self._open: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.smtp = self
+        self.host, self.port = self._server.server_address[:2]
+
+    def fail(self, stage: str, code: int, text: str = "Injected failure", times: int = 1):
+        """Answer the next `times` commands of `stage` ("rcpt" or "data") with `code`."""
+        with self._lock:
+            self._failures += [(stage, code, text)] * times
+
+    def _failure(self, stage: str) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            for i, (failing, code, text) in enumerate(self._failures):
+                if failing == stage:
+                    del self._failures[i]
+                    return code, text
+        return None
+
+    def _opened(self, conn: socket.socket):
+        with self._lock:
+            self.connections += 1
+            self._open.append(conn)
+
+    def _closed(self, conn: socket.socket):
+        with self._lock:
+            if conn in self._open:
+                self._open.remove(conn)
+
+    def drop_connections(self):
+        """Close every open client connection, as a relay does with idle ones."""
+        with self._lock:
+            connections, self._open = self._open, []
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def start(self) -> "FakeSMTPServer":
+        threading.Thread(target=self._server.serve_forever, name="fake-smtp", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.drop_connections()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP server that keeps messages in memory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+    server = FakeSMTPServer(args.host, args.port, args.username, args.password, echo=True)
+    print(f"fake SMTP listening on {server.host}:{server.port}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
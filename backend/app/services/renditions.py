@@ -0,0 +1,129 @@
+"""
+Thumbnail and preview renditions of uploaded images.
+
+Renditions are generated on first request and kept in a local disk cache keyed
+by the source content hash, so the same ID photo attached to several cases is
+resized once. The cache is bounded by size: when it grows past
+rendition_cache_max_bytes the least recently served files are evicted.
+"""
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional
+import os
+import tempfile
+import threading
+
+from ..config import settings
+from ..telemetry.metrics import registry
+
+RENDITION_CACHE = registry.counter("bondpath_rendition_cache", "Rendition lookups by result", ["rendition", "result"])
+RENDITION_CACHE_BYTES = registry.gauge("bondpath_rendition_cache_bytes", "Bytes held in the rendition disk cache")
+
+
+@dataclass(frozen=True)
+class Rendition:
+    name: str
+    max_side: int
+    quality: int
+
+
+RENDITIONS: Dict[str, Rendition] = {
+    "thumbnail": Rendition("thumbnail", 256, 70),
+    "preview": Rendition("preview", 1280, 80),
+}
+
+RENDERABLE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp", "image/bmp", "image/tiff")
+
+
+class UnsupportedRendition(Exception):
+    pass
+
+
+def render(data: bytes, rendition: Rendition) -> bytes:
+    """Downscale to fit `max_side` (never upscale) and encode as JPEG, honouring EXIF rotation from phone cameras."""
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((rendition.max_side, rendition.max_side))
+            out = BytesIO()
+            image.convert("RGB").save(out, "JPEG", quality=rendition.quality, optimize=True)
+            return out.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise UnsupportedRendition(f"Could not render image: {e}") from e
+
+
+class RenditionCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: Optional[Dict[Path, int]] = None
+
+    def _index(self) -> Dict[Path, int]:
+        # Built lazily from what's on disk, so the cache survives restarts
+        if self._sizes is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._sizes = {path: path.stat().st_size for path in self.root.glob("*.jpg")}
+            RENDITION_CACHE_BYTES.set(sum(self._sizes.values()))
+        return self._sizes
+
+    def path(self, sha256: str, rendition: Rendition) -> Path:
+        return self.root / f"{sha256}-{rendition.name}.jpg"
+
+    def get(self, sha256: str, rendition: Rendition) -> Optional[bytes]:
+        path = self.path(sha256, rendition)
+        with self._lock:
+            if path not in self._index():
+                return None
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mtime doubles as the last-served time for eviction
+        except FileNotFoundError:
+            # Evicted by another worker sharing the directory
+            with self._lock:
+                self._index().pop(path, None)
+            return None
+        return data
+
+    def put(self, sha256: str, rendition: Rendition, data: bytes):
+        path = self.path(sha256, rendition)
+        with self._lock:
+            sizes = self._index()
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".rendition-")
+            with os.fdopen(fd, "wb") as out:
+                out.write(data)
+            os.replace(tmp, path)
+            sizes[path] = len(data)
+            self._evict(sizes, keep=path)
+            RENDITION_CACHE_BYTES.set(sum(sizes.values()))
+
+    def _evict(self, sizes: Dict[Path, int], keep: Path):
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_age = sorted((p for p in sizes if p != keep), key=lambda p: p.stat().st_mtime if p.exists() else 0)
+        for path in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= sizes.pop(path)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def get_or_create(self, sha256: str, rendition: Rendition, load) -> bytes:
+        """Cached rendition of the content `load()` returns; renders and stores it on a miss. Blocking."""
+        data = self.get(sha256, rendition)
+        if data is not None:
+            RENDITION_CACHE.inc(rendition=rendition.name, result="hit")
+            return data
+        RENDITION_CACHE.inc(rendition=rendition.name, result="miss")
+        data = render(load(), rendition)
+        self.put(sha256, rendition, data)
+        return data
+
+
+rendition_cache = RenditionCache(settings.rendition_cache_dir, settings.rendition_cache_max_bytes)
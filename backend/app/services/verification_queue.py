@@ -0,0 +1,314 @@
+"""
+Background document verification.
+
+An upload is stored and answered straight away with its verification
+PENDING; the vision call runs here, on a pool of worker threads fed by a
+priority queue. Booking sheets go first, then IDs, then everything else, so
+the documents that gate a bond are checked before collateral paperwork.
+
+A job that fails (vision error, provider outage, crash) is retried with
+exponential backoff up to `max_attempts`, then published as ERROR. Results
+are published to the case record (`documents_verified`, which bumps the case
+version and `updated_at`, so `GET /cases?updated_since=` picks it up) and as
+a DOCUMENT_VERIFIED event. The queue itself is in memory; the document row
+keeps its PENDING status until published, so jobs lost in a restart are
+re-queued by `recover()` when the workers start.
+
+Full-package submissions queue one job for the case instead of one per
+document: `process_case` verifies every PENDING document of the case in a
+single multi-image vision call and cross-checks them against each other.
+"""
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+import itertools
+import queue
+import threading
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.case import Case
+from ..models.document import Document
+from ..models.event import Event
+from ..telemetry.metrics import registry
+from .facts_service import facts_service
+from .verification_service import error_result, verification_service
+
+PENDING, DONE, FAILED, SUPERSEDED = "PENDING", "DONE", "FAILED", "SUPERSEDED"
+CASE_JOB = "case"  # Job document_type for a case-level job, whose id is the case id
+
+# Lower runs first: booking sheets gate every bond, IDs gate the defendant and indemnitor checks
+PRIORITY = {"booking_sheet": 0, "defendant_id": 1, "indemnitor_id": 1, "gov_id": 1}
+DEFAULT_PRIORITY = 2
+_STOP = -1  # Sorts ahead of every job so stop() doesn't wait for the backlog
+
+VERIFICATION_JOBS = registry.counter("bondpath_verification_jobs", "Background verification attempts", ["document_type", "outcome"])
+VERIFICATION_QUEUE_DEPTH = registry.gauge("bondpath_verification_queue_depth", "Verification jobs waiting for a worker")
+VERIFICATION_WAIT = registry.histogram("bondpath_verification_wait_seconds", "Upload to published verification result",
+                                       ["document_type"], buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+
+
+def pending_result(document: Document) -> dict:
+    """What the case shows for a document between upload and the worker publishing its result."""
+    return {"match_status": PENDING, "document_id": document.id}
+
+
+def mark_pending(db: Session, case: Case, documents: List[Document]):
+    """Show newly uploaded documents as PENDING on the case, keeping results workers published meanwhile."""
+    # Workers write documents_verified too: re-read it under a row lock so their results aren't overwritten
+    db.refresh(case, ["documents_verified"], with_for_update=True)
+    current = dict(case.documents_verified or {})
+    for document in documents:
+        current[document.document_type] = pending_result(document)
+    case.documents_verified = current
+
+
+class VerificationQueue:
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, workers: int = 4,
+                 max_attempts: int = 3, retry_seconds: float = 2.0, service=None):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.service = service or verification_service
+        self._queue: "queue.PriorityQueue[tuple]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._outstanding = 0  # Submitted jobs not yet published, including ones waiting to be retried
+        self._idle = threading.Condition()
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from ..database import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def submit(self, document_id: str, document_type: str):
+        """Queue verification of a committed document row."""
+        with self._idle:
+            self._outstanding += 1
+        self._put(document_id, document_type, 1)
+
+    def submit_case(self, case_id: str, document_types: Iterable[str]):
+        """Queue one verification of all of a case's PENDING documents, at the priority of the most urgent."""
+        with self._idle:
+            self._outstanding += 1
+        priority = min((PRIORITY.get(t, DEFAULT_PRIORITY) for t in document_types), default=DEFAULT_PRIORITY)
+        self._queue.put((priority, next(self._seq), case_id, CASE_JOB, 1))
+        VERIFICATION_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _put(self, document_id: str, document_type: str, attempt: int):
+        priority = PRIORITY.get(document_type, 0 if document_type == CASE_JOB else DEFAULT_PRIORITY)
+        self._queue.put((priority, next(self._seq), document_id, document_type, attempt))
+        VERIFICATION_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _finished(self):
+        with self._idle:
+            self._outstanding -= 1
+            self._idle.notify_all()
+
+    def start(self):
+        """Start the worker pool and re-queue documents a previous process left PENDING."""
+        if self._threads or self.workers <= 0:
+            return
+        try:
+            self.recover()
+        except Exception as e:
+            print(f"Could not re-queue pending verifications: {e}")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"verification-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put((_STOP, next(self._seq), None, None, 0))
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def recover(self) -> int:
+        db = self._session()
+        try:
+            pending = db.query(Document.id, Document.case_id, Document.document_type).filter(
+                Document.verification_status == PENDING).all()
+        finally:
+            db.close()
+        by_case: Dict[str, list] = {}
+        for document_id, case_id, document_type in pending:
+            by_case.setdefault(case_id, []).append((document_id, document_type))
+        # A case with several documents waiting gets them verified in one call
+        for case_id, documents in by_case.items():
+            if len(documents) > 1:
+                self.submit_case(case_id, [t for _, t in documents])
+            else:
+                self.submit(*documents[0])
+        return len(pending)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted job has been published; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def run_pending(self):
+        """Process queued jobs in the calling thread (no workers, e.g. tests and one-off scripts)."""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._run(*job[2:])
+
+    def clear(self):
+        with self._idle:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._outstanding = 0
+            self._idle.notify_all()
+        VERIFICATION_QUEUE_DEPTH.set(0)
+
+    def _work(self):
+        while True:
+            priority, _, document_id, document_type, attempt = self._queue.get()
+            VERIFICATION_QUEUE_DEPTH.set(self._queue.qsize())
+            if priority == _STOP:
+                return
+            self._run(document_id, document_type, attempt)
+
+    def _run(self, document_id: str, document_type: str, attempt: int):
+        process = self.process_case if document_type == CASE_JOB else self.process
+        try:
+            if process(document_id, attempt):
+                VERIFICATION_JOBS.inc(document_type=document_type, outcome="published")
+                self._finished()
+                return
+            error = "vision call failed"
+        except Exception as e:
+            error = e
+            print(f"Verification of document {document_id} failed (attempt {attempt}): {e}")
+
+        if attempt < self.max_attempts:
+            VERIFICATION_JOBS.inc(document_type=document_type, outcome="retried")
+            self._retry(document_id, document_type, attempt + 1)
+            return
+        # Out of attempts: publish the failure so the case doesn't stay PENDING
+        VERIFICATION_JOBS.inc(document_type=document_type, outcome="failed")
+        try:
+            process(document_id, attempt, failure=f"Verification failed: {error}")
+        except Exception as e:
+            print(f"Could not publish failed verification of document {document_id}: {e}")
+        finally:
+            self._finished()
+
+    def _retry(self, document_id: str, document_type: str, attempt: int):
+        delay = self.retry_seconds * 2 ** (attempt - 2)
+        if delay <= 0 or not self._threads:
+            self._put(document_id, document_type, attempt)
+            return
+        timer = threading.Timer(delay, self._put, (document_id, document_type, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def process(self, document_id: str, attempt: int = 1, failure: Optional[str] = None) -> bool:
+        """
+        Verify one document and publish the result. Returns False when the vision call failed and
+        there are attempts left; the last attempt publishes whatever came back, ERROR included.
+        """
+        db = self._session()
+        try:
+            document = db.get(Document, document_id)
+            if document is None or document.verification_status != PENDING:
+                return True  # Deleted, or already published by another worker
+            case = db.get(Case, document.case_id)
+
+            if failure is not None:
+                result = error_result(failure)
+            else:
+                case_data = facts_service.project(case, "doc_verify")
+                result = self.service.verify(db, document.sha256, document.storage_key, document.document_type, case_data)
+                if result.get("match_status") == "ERROR" and attempt < self.max_attempts:
+                    db.rollback()
+                    return False
+
+            self.publish(db, case, document, result)
+            db.commit()
+            VERIFICATION_WAIT.observe((datetime.utcnow() - document.created_at).total_seconds(), document_type=document.document_type)
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def process_case(self, case_id: str, attempt: int = 1, failure: Optional[str] = None) -> bool:
+        """
+        Verify all of a case's PENDING documents together and publish each result. Documents that
+        failed stay PENDING for the retry (False) until the last attempt publishes them as ERROR.
+        """
+        db = self._session()
+        try:
+            case = db.get(Case, case_id)
+            pending = db.query(Document).filter(Document.case_id == case_id, Document.verification_status == PENDING) \
+                .order_by(Document.created_at).all()
+            if case is None or not pending:
+                return True
+
+            # One document per type: the latest upload; ones it replaced before they were read are skipped
+            latest = {document.document_type: document for document in pending}
+            for document in pending:
+                if latest[document.document_type] is not document:
+                    document.verification_status = SUPERSEDED
+            documents = list(latest.values())
+
+            if failure is not None:
+                results = [error_result(failure) for _ in documents]
+            else:
+                case_data = facts_service.project(case, "doc_verify")
+                results = self.service.verify_many(
+                    db, [(d.sha256, d.storage_key, d.document_type) for d in documents], case_data
+                )
+
+            retry = False
+            for document, result in zip(documents, results):
+                if result.get("match_status") == "ERROR" and attempt < self.max_attempts:
+                    retry = True
+                    continue
+                self.publish(db, case, document, result)
+                VERIFICATION_WAIT.observe((datetime.utcnow() - document.created_at).total_seconds(),
+                                          document_type=document.document_type)
+            db.commit()
+            return not retry
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def publish(self, db: Session, case: Case, document: Document, result: dict):
+        document.verification_status = FAILED if result.get("match_status") == "ERROR" else DONE
+
+        # The case was loaded before the vision call; other workers and uploads may have written
+        # documents_verified since. Re-read it under a row lock so their entries survive the merge.
+        db.refresh(case, with_for_update=True)
+
+        # A newer upload of the same document type has replaced this one on the case: keep its entry
+        current = dict(case.documents_verified or {})
+        entry = current.get(document.document_type) or {}
+        if entry.get("document_id") in (None, document.id):
+            current[document.document_type] = {**result, "document_id": document.id}
+            case.documents_verified = current
+            db.flush()  # Bumps the case version the event records
+
+        db.add(Event(
+            case_id=case.id, event_type="DOCUMENT_VERIFIED", actor_id="DocVerifyAgent", actor_role="SYSTEM",
+            payload={"document_id": document.id, "document_type": document.document_type,
+                     "match_status": result.get("match_status")},
+            version=case.version or 1,
+        ))
+
+
+verification_queue = VerificationQueue(
+    workers=settings.verification_workers,
+    max_attempts=settings.verification_max_attempts,
+    retry_seconds=settings.verification_retry_seconds,
+)
@@ -0,0 +1,161 @@
+"""
+Document verification with the vision call cached by content.
+
+Verification has two halves with very different costs: reading fields off
+the image (a vision call) and comparing them with the case facts (string
+work). They are cached separately:
+
+- extractions, per (file SHA-256, doc type, prompt version), in the
+  `document_extractions` table, so the same ID photo or booking sheet is only
+  ever read once, across cases and workers;
+- match results, per (file SHA-256, doc type, case-facts fingerprint), in
+  memory.
+
+The comparison is deterministic (rules/document_match.py), so after a case
+edit re-verification reuses the extraction and only re-runs it.
+
+`verify_many` verifies a case's documents together: the ones not read before
+go to the vision model in one multi-image call (doc_verify_batch), and the
+documents are cross-checked against each other. Extractions from either
+prompt serve both modes.
+"""
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+import hashlib
+import json
+import threading
+
+from sqlalchemy.orm import Session
+
+from ..agents.doc_verify import doc_verify_agent
+from ..agents.prompts import prompt_registry
+from ..config import settings
+from ..models.document import DocumentExtraction
+from ..rules.document_match import MATCH, UNCLEAR, cross_check, match_document
+from ..telemetry.metrics import registry
+
+VERIFICATION_CACHE = registry.counter("bondpath_verification_cache", "Document verification cache lookups", ["layer", "result"])
+
+def error_result(message: str) -> dict:
+    return {"is_valid_document": False, "document_type_detected": "error", "extracted_data": {},
+            "match_status": "ERROR", "mismatches": [message], "confidence_score": 0}
+
+
+def facts_fingerprint(case_data: dict) -> str:
+    """Stable hash of the facts a document is compared against; changes whenever one of them is edited."""
+    return hashlib.sha256(json.dumps(case_data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class VerificationService:
+    def __init__(self, agent=None, cache_size: int = 4096, batch_size: int = 6):
+        self.agent = agent or doc_verify_agent
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._matches: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            result = self._matches.get(key)
+            if result is not None:
+                self._matches.move_to_end(key)
+            return result
+
+    def _store(self, key: tuple, result: dict):
+        with self._lock:
+            self._matches[key] = result
+            while len(self._matches) > self.cache_size:
+                self._matches.popitem(last=False)
+
+    def _prompts(self) -> Tuple[str, str]:
+        return prompt_registry.get("doc_verify").id, prompt_registry.get("doc_verify_batch").id
+
+    def extraction(self, db: Session, sha256: str, doc_type: str, prompts: Sequence[str]) -> Optional[DocumentExtraction]:
+        return db.query(DocumentExtraction).filter(
+            DocumentExtraction.sha256 == sha256, DocumentExtraction.doc_type == doc_type, DocumentExtraction.prompt.in_(prompts),
+        ).order_by(DocumentExtraction.id).first()
+
+    def _save(self, db: Session, sha256: str, doc_type: str, prompt: str, read: dict) -> DocumentExtraction:
+        extraction = DocumentExtraction(sha256=sha256, doc_type=doc_type, prompt=prompt, **read)
+        db.add(extraction)
+        db.flush()
+        return extraction
+
+    def _result(self, extraction: DocumentExtraction, case_data: dict, doc_type: str) -> dict:
+        return {
+            "is_valid_document": extraction.is_valid_document,
+            "document_type_detected": extraction.document_type_detected,
+            "extracted_data": extraction.extracted_data,
+            "confidence_score": extraction.confidence_score,
+            **match_document(extraction.extracted_data, case_data, doc_type).as_dict(),
+        }
+
+    def verify(self, db: Session, sha256: str, storage_key: str, doc_type: str, case_data: dict) -> dict:
+        """Verification result for a stored document; the vision call only runs for content not seen before."""
+        fingerprint = facts_fingerprint(case_data)
+        key = (sha256, doc_type, fingerprint)
+        result = self._lookup(key)
+        if result is not None:
+            VERIFICATION_CACHE.inc(layer="match", result="hit")
+            return dict(result)
+        VERIFICATION_CACHE.inc(layer="match", result="miss")
+
+        prompts = self._prompts()
+        extraction = self.extraction(db, sha256, doc_type, prompts)
+        if extraction is None:
+            VERIFICATION_CACHE.inc(layer="extraction", result="miss")
+            read = self.agent.extract({"storage_key": storage_key, "case_data": case_data, "doc_type": doc_type})
+            if "error" in read:
+                return error_result(read["error"])  # Failures are retried on the next verification, not cached
+            extraction = self._save(db, sha256, doc_type, prompts[0], read)
+        else:
+            VERIFICATION_CACHE.inc(layer="extraction", result="hit")
+
+        result = self._result(extraction, case_data, doc_type)
+        self._store(key, result)
+        return dict(result)
+
+    def verify_many(self, db: Session, documents: List[Tuple[str, str, str]], case_data: dict) -> List[dict]:
+        """
+        Verify a case's documents, given as (sha256, storage_key, doc_type) with at most one per doc type.
+        Unread documents share one vision call (per `batch_size` images); results come back in input order,
+        each with the `inconsistencies` found between it and the case's other documents.
+        """
+        single, batch = self._prompts()
+        extractions = [self.extraction(db, sha256, doc_type, (single, batch)) for sha256, _, doc_type in documents]
+        for extraction in extractions:
+            VERIFICATION_CACHE.inc(layer="extraction", result="miss" if extraction is None else "hit")
+
+        results: List[Optional[dict]] = [None] * len(documents)
+        missing = [i for i, extraction in enumerate(extractions) if extraction is None]
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            if len(chunk) == 1:
+                sha256, storage_key, doc_type = documents[chunk[0]]
+                reads, prompt = [self.agent.extract({"storage_key": storage_key, "case_data": case_data, "doc_type": doc_type})], single
+            else:
+                reads, prompt = self.agent.extract_many(
+                    [{"storage_key": documents[i][1], "doc_type": documents[i][2]} for i in chunk]
+                ), batch
+            for i, read in zip(chunk, reads):
+                if "error" in read:
+                    results[i] = error_result(read["error"])
+                else:
+                    extractions[i] = self._save(db, documents[i][0], documents[i][2], prompt, read)
+
+        for i, (_, _, doc_type) in enumerate(documents):
+            if results[i] is None:
+                results[i] = self._result(extractions[i], case_data, doc_type)
+
+        read = {documents[i][2]: r["extracted_data"] for i, r in enumerate(results) if r["match_status"] != "ERROR"}
+        issues = cross_check(read)
+        for i, result in enumerate(results):
+            result["inconsistencies"] = issues.get(documents[i][2], [])
+            # Close enough to the case, but another document of the case disagrees: a human should look
+            if result["inconsistencies"] and result["match_status"] == MATCH:
+                result["match_status"] = UNCLEAR
+        return results
+
+
+verification_service = VerificationService(cache_size=settings.verification_cache_size,
+                                           batch_size=settings.verification_batch_size)
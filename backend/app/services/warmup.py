@@ -0,0 +1,173 @@
+"""
+Startup warm-up and the health/readiness checks built on it.
+
+A fresh worker pays for opening database connections, compiling the case graph,
+first-call code paths in the rules and the LLM SDK imports and TLS handshakes.
+Warm-up does that work in the background right after startup; /ready answers
+503 until it has finished, so the load balancer only routes traffic to warm
+instances, while /health (liveness) answers immediately.
+"""
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+import asyncio
+import inspect
+import time
+
+import anyio
+from sqlalchemy import text
+
+from ..config import settings
+from ..telemetry.metrics import registry
+
+READY = registry.gauge("bondpath_ready", "1 once startup warm-up has finished and the instance takes traffic")
+WARMUP_STEP_SECONDS = registry.gauge("bondpath_warmup_step_seconds", "Duration of each warm-up step", ["step", "status"])
+
+Step = Callable[[], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    run: Step
+    required: bool = True  # A failed optional step (e.g. an LLM provider being down) still lets the instance serve
+
+
+@dataclass
+class StepResult:
+    status: str = "pending"  # pending, ok, failed
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Warmup:
+    steps: List[WarmupStep] = field(default_factory=list)
+    results: Dict[str, StepResult] = field(default_factory=dict)
+    ready: bool = False
+    finished: bool = False
+
+    async def run(self):
+        """Run each step in order; blocking steps go to a worker thread so the loop keeps serving /health."""
+        self.results = {step.name: StepResult() for step in self.steps}
+        for step in self.steps:
+            result = self.results[step.name]
+            start = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(step.run):
+                    await step.run()
+                else:
+                    await anyio.to_thread.run_sync(step.run, abandon_on_cancel=True)
+                result.status = "ok"
+            except Exception as e:
+                result.status, result.error = "failed", f"{type(e).__name__}: {e}"[:300]
+                print(f"Warm-up step {step.name} failed: {result.error}")
+            result.seconds = round(time.perf_counter() - start, 4)
+            WARMUP_STEP_SECONDS.set(result.seconds, step=step.name, status=result.status)
+
+        self.finished = True
+        self.ready = all(self.results[s.name].status == "ok" for s in self.steps if s.required)
+        READY.set(1 if self.ready else 0)
+
+    def report(self) -> dict:
+        return {name: vars(result) for name, result in self.results.items()}
+
+
+def _open_sync_pool():
+    from ..database import engine
+
+    # Hold the connections at the same time so the pool really opens that many
+    connections = [engine.connect() for _ in range(settings.warmup_db_connections)]
+    try:
+        for conn in connections:
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+async def _open_async_pool():
+    # Async connections belong to the event loop that opened them, so this runs on the server's loop
+    from ..database import async_engine
+
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(settings.warmup_db_connections)))
+
+
+def _compile_graph():
+    from ..orchestrator.graph import app as orchestrator_app
+
+    orchestrator_app.compiled
+
+
+# Exercises every registered rule's first-call path (pydantic validators, lazy imports)
+SAMPLE_FACTS = {
+    "bond_amount": 5000,
+    "state_jurisdiction": "TX",
+    "financial": {"down_payment": 500, "monthly_payment": 250},
+    "indemnitor": {"income": 4000},
+    "documents": [{"type": "indemnitor_id"}],
+    "defendant": {"jail": "Harris County Jail"},
+    "charge": {"type": "misdemeanor"},
+}
+
+
+def _prime_rules():
+    from ..rules import bail_rules  # noqa: F401  (registers the rules)
+    from ..rules.engine import rule_engine
+
+    rule_engine.evaluate_all(dict(SAMPLE_FACTS))
+
+
+def _provider_steps() -> List[WarmupStep]:
+    from ..agents.router import llm_router
+
+    return [
+        WarmupStep(f"llm:{provider.name}", lambda p=provider: p.warm(settings.warmup_provider_timeout_seconds), required=False)
+        for provider in llm_router.providers
+    ]
+
+
+def default_steps() -> List[WarmupStep]:
+    if not settings.warmup_enabled:
+        return []
+    return [
+        WarmupStep("database", _open_sync_pool),
+        WarmupStep("database_async", _open_async_pool),
+        WarmupStep("graph", _compile_graph),
+        WarmupStep("rules", _prime_rules),
+        *_provider_steps(),
+    ]
+
+
+def check_database() -> dict:
+    """Round trip to the primary; never raises so /health can always answer."""
+    from ..database import engine
+
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        return {"status": "failed", "latency_ms": round((time.perf_counter() - start) * 1000, 2), "error": str(e)[:300]}
+
+
+def check_providers() -> dict:
+    """Recent p50 latency and circuit state per LLM provider, from the router's rolling window (no calls made)."""
+    from ..agents.router import llm_router
+
+    providers = {}
+    for provider in llm_router.providers:
+        p50 = llm_router.stats[provider.name].latency_quantile(0.5)
+        providers[provider.name] = {
+            "circuit": llm_router.breakers[provider.name].state,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "error_rate": round(llm_router.stats[provider.name].error_rate(), 3),
+        }
+    return providers
+
+
+warmup = Warmup()
@@ -0,0 +1,22 @@
+"""
+Document storage. `storage` is the backend selected by settings.storage_backend;
+everything that reads or writes document bytes (uploads, downloads,
+verification) goes through it.
+"""
+from ..config import settings
+from .base import (
+    CHUNK_SIZE, ObjectNotFound, StorageBackend, StorageError, StoredObject, content_disposition, content_key, hash_stream
+)
+from .local import LocalStorage
+from .s3 import S3Storage
+
+
+def create_storage(config=settings) -> StorageBackend:
+    if config.storage_backend == "local":
+        return LocalStorage(config.storage_local_root)
+    if config.storage_backend == "s3":
+        return S3Storage(config.s3_endpoint_url, config.s3_bucket, config.s3_region, config.s3_access_key, config.s3_secret_key)
+    raise ValueError(f"Unknown storage backend: {config.storage_backend!r}")
+
+
+storage = create_storage()
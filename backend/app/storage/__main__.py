@@ -0,0 +1,31 @@
+"""
+Document storage maintenance.
+
+    python -m app.storage import-static uploads   # move pre-storage uploads behind /documents
+"""
+import argparse
+
+from ..database import SessionLocal
+from ..services.document_service import document_service
+from . import storage
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.storage", description="Document storage maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_static = commands.add_parser("import-static", help="Import files the old /static mount served into storage")
+    import_static.add_argument("directory", nargs="?", default="uploads")
+    args = parser.parse_args(argv)
+
+    if args.command == "import-static":
+        db = SessionLocal()
+        try:
+            moved = document_service.import_static_uploads(db, args.directory)
+        finally:
+            db.close()
+        print(f"Imported {moved} documents into {storage.name} storage")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
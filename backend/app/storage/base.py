@@ -0,0 +1,87 @@
+"""
+Storage backend interface for uploaded documents.
+
+Objects are addressed by key and read as a stream of chunks, optionally a
+byte range, so large scans never have to sit in memory. Documents are stored
+content-addressed (see `content_key`): identical files uploaded to several
+cases are kept once.
+"""
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional
+from urllib.parse import quote
+import hashlib
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StorageError(Exception):
+    """A backend call failed (I/O error, S3 error response)."""
+
+
+class ObjectNotFound(StorageError):
+    pass
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    etag: Optional[str] = None
+
+
+def content_key(sha256: str) -> str:
+    """Key for a blob with this SHA-256, fanned out by prefix so no directory grows huge."""
+    return f"blobs/{sha256[:2]}/{sha256}"
+
+
+def content_disposition(filename: str, disposition: str = "inline") -> str:
+    """
+    Content-Disposition for any filename. Header values must be Latin-1, so a name with other
+    characters gets an ASCII fallback plus the real name as RFC 5987 `filename*` (RFC 6266).
+    """
+    fallback = "".join(c if c.isascii() and c.isprintable() and c not in '"\\' else "_" for c in filename)
+    value = f'{disposition}; filename="{fallback}"'
+    if fallback != filename:
+        value += f"; filename*=UTF-8''{quote(filename, safe='')}"
+    return value
+
+
+def hash_stream(fileobj: BinaryIO) -> tuple:
+    """(sha256 hex, size) of a seekable stream, read in chunks and rewound afterwards."""
+    digest, size = hashlib.sha256(), 0
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+class StorageBackend:
+    name = "base"
+
+    def put(self, key: str, fileobj: BinaryIO, size: int, sha256: str, content_type: str) -> StoredObject:
+        """Store `size` bytes from `fileobj` (read from its current position in chunks)."""
+        raise NotImplementedError
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        """Size and etag of an object, or None if it doesn't exist."""
+        raise NotImplementedError
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Chunks of the object from byte `start` to `end` inclusive (HTTP Range semantics). Raises ObjectNotFound."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, expires: int, filename: Optional[str] = None,
+                      content_type: Optional[str] = None, cache_control: Optional[str] = None) -> Optional[str]:
+        """A time-limited URL the client can download from directly, or None if the backend can't issue one."""
+        return None
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def read_bytes(self, key: str) -> bytes:
+        return b"".join(self.open(key))
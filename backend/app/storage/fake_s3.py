@@ -0,0 +1,107 @@
+"""
+In-memory S3-compatible server for tests and local development of the S3
+storage backend. Supports path-style PUT, GET (with Range), HEAD and DELETE of
+objects and checks every request's SigV4 signature, header-signed or
+presigned, the way a real bucket would.
+
+    python -m app.storage.fake_s3 --port 9200 --access-key dev --secret-key dev
+"""
+from typing import Dict, Optional, Tuple
+import argparse
+import hashlib
+import re
+
+from fastapi import FastAPI, Request, Response
+
+from . import sigv4
+
+AUTHORIZATION = re.compile(r"Credential=([^/]+)/(\d{8})/([^/]+)/s3/aws4_request, SignedHeaders=([^,]+), Signature=([0-9a-f]+)")
+
+
+def _error(status: int, code: str) -> Response:
+    return Response(f"<Error><Code>{code}</Code></Error>", status_code=status, media_type="application/xml")
+
+
+def create_app(access_key: str, secret_key: str, region: str = "us-east-1") -> FastAPI:
+    app = FastAPI()
+    objects: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+    app.state.objects = objects
+
+    def verify(request: Request, path: str, payload_hash: str) -> Optional[Response]:
+        query = dict(request.query_params)
+        if "X-Amz-Signature" in query:
+            given = query.pop("X-Amz-Signature")
+            timestamp = query["X-Amz-Date"]
+            headers = {name: request.headers[name] for name in query["X-Amz-SignedHeaders"].split(";")}
+            payload_hash = sigv4.UNSIGNED_PAYLOAD
+            credential = query["X-Amz-Credential"].split("/")[0]
+        else:
+            match = AUTHORIZATION.search(request.headers.get("authorization", ""))
+            if not match:
+                return _error(403, "AccessDenied")
+            credential, _, _, signed, given = match.groups()
+            timestamp = request.headers.get("x-amz-date", "")
+            headers = {name: request.headers.get(name, "") for name in signed.split(";")}
+        if credential != access_key:
+            return _error(403, "InvalidAccessKeyId")
+        canonical, _ = sigv4.canonical_request(request.method, path, query, headers, payload_hash)
+        if sigv4.signature(secret_key, region, timestamp, canonical) != given:
+            return _error(403, "SignatureDoesNotMatch")
+        return None
+
+    @app.api_route("/{bucket}/{key:path}", methods=["GET", "HEAD", "PUT", "DELETE"])
+    async def object_route(bucket: str, key: str, request: Request):
+        path = f"/{bucket}/{key}"
+        payload_hash = request.headers.get("x-amz-content-sha256", sigv4.EMPTY_SHA256)
+        denied = verify(request, path, payload_hash)
+        if denied:
+            return denied
+
+        if request.method == "PUT":
+            body = await request.body()
+            if hashlib.sha256(body).hexdigest() != payload_hash:
+                return _error(400, "XAmzContentSHA256Mismatch")
+            objects[(bucket, key)] = (body, request.headers.get("content-type", "application/octet-stream"))
+            return Response(headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+
+        if request.method == "DELETE":
+            objects.pop((bucket, key), None)
+            return Response(status_code=204)
+
+        if (bucket, key) not in objects:
+            return _error(404, "NoSuchKey")
+        body, content_type = objects[(bucket, key)]
+        headers = {"ETag": f'"{hashlib.md5(body).hexdigest()}"', "Accept-Ranges": "bytes"}
+        content_type = request.query_params.get("response-content-type", content_type)
+        for name in ("content-disposition", "cache-control"):
+            if f"response-{name}" in request.query_params:
+                headers[name.title()] = request.query_params[f"response-{name}"]
+        if request.method == "HEAD":
+            return Response(headers={**headers, "Content-Length": str(len(body))}, media_type=content_type)
+
+        status = 200
+        ranged = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("range", ""))
+        if ranged:
+            start = int(ranged.group(1))
+            end = min(int(ranged.group(2)) if ranged.group(2) else len(body) - 1, len(body) - 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            body, status = body[start:end + 1], 206
+        return Response(body, status_code=status, headers=headers, media_type=content_type)
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="In-memory S3-compatible server")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--access-key", default="dev")
+    parser.add_argument("--secret-key", default="dev")
+    parser.add_argument("--region", default="us-east-1")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.access_key, args.secret_key, args.region), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Local filesystem storage. Fine for a single instance or a shared volume; use
+the S3 backend to run several instances against the same documents.
+"""
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+import os
+import tempfile
+
+from .base import CHUNK_SIZE, ObjectNotFound, StorageBackend, StorageError, StoredObject
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise StorageError(f"Key escapes the storage root: {key!r}")
+        return path
+
+    def put(self, key: str, fileobj: BinaryIO, size: int, sha256: str, content_type: str) -> StoredObject:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial object
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+            os.replace(tmp, path)
+        except OSError as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise StorageError(f"Could not write {key}: {e}") from e
+        return StoredObject(key, size, sha256)
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            return StoredObject(key, self._path(key).stat().st_size)
+        except FileNotFoundError:
+            return None
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        path = self._path(key)
+        if not path.is_file():
+            raise ObjectNotFound(key)
+        return self._read(path, start, end)
+
+    def _read(self, path: Path, start: int, end: Optional[int]) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,109 @@
+"""
+S3-compatible object storage over plain HTTP (path-style addressing), so the
+same driver talks to AWS, MinIO or R2. Uploads stream from the spooled file
+and are signed with the content hash we already computed; downloads stream
+with Range requests or are handed to the client as presigned URLs.
+"""
+from typing import BinaryIO, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+import threading
+
+import httpx
+
+from . import sigv4
+from .base import CHUNK_SIZE, ObjectNotFound, StorageBackend, StorageError, StoredObject, content_disposition
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(self, endpoint_url: str, bucket: str, region: str, access_key: str, secret_key: str,
+                 client: Optional[httpx.Client] = None, timeout: float = 30.0):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.bucket = bucket
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.timeout = timeout
+        self._client = client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        # One pooled client per process, created on first use
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(timeout=self.timeout)
+        return self._client
+
+    def _path(self, key: str) -> str:
+        return f"/{self.bucket}/{key}"
+
+    def _request(self, method: str, key: str, payload_hash: str = sigv4.EMPTY_SHA256,
+                 headers: Optional[Dict[str, str]] = None, content=None, stream: bool = False) -> httpx.Response:
+        path = self._path(key)
+        signed = sigv4.sign_headers(method, path, {}, {"host": self.host, **(headers or {})}, payload_hash,
+                                    self.access_key, self.secret_key, self.region)
+        signed.pop("host")  # httpx sets it from the URL
+        request = self.client.build_request(method, self.endpoint_url + sigv4.encode_path(path), headers=signed, content=content)
+        try:
+            return self.client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            raise StorageError(f"S3 {method} {key} failed: {e}") from e
+
+    def _check(self, response: httpx.Response, key: str):
+        if response.status_code == 404:
+            raise ObjectNotFound(key)
+        if response.status_code >= 300:
+            raise StorageError(f"S3 returned {response.status_code} for {key}: {response.text[:200]}")
+
+    def put(self, key: str, fileobj: BinaryIO, size: int, sha256: str, content_type: str) -> StoredObject:
+        headers = {"content-length": str(size), "content-type": content_type or "application/octet-stream"}
+        response = self._request("PUT", key, payload_hash=sha256, headers=headers,
+                                 content=iter(lambda: fileobj.read(CHUNK_SIZE), b""))
+        self._check(response, key)
+        return StoredObject(key, size, response.headers.get("etag", "").strip('"') or None)
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        response = self._request("HEAD", key)
+        if response.status_code == 404:
+            return None
+        self._check(response, key)
+        return StoredObject(key, int(response.headers.get("content-length", 0)), response.headers.get("etag", "").strip('"') or None)
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        headers = {}
+        if start or end is not None:
+            headers["range"] = f"bytes={start}-{'' if end is None else end}"
+        response = self._request("GET", key, headers=headers, stream=True)
+        if response.status_code >= 300:
+            response.read()
+            response.close()
+            self._check(response, key)
+        return self._iter(response)
+
+    def _iter(self, response: httpx.Response) -> Iterator[bytes]:
+        try:
+            yield from response.iter_bytes(CHUNK_SIZE)
+        finally:
+            response.close()
+
+    def delete(self, key: str):
+        response = self._request("DELETE", key)
+        if response.status_code != 404:
+            self._check(response, key)
+
+    def presigned_url(self, key: str, expires: int, filename: Optional[str] = None,
+                      content_type: Optional[str] = None, cache_control: Optional[str] = None) -> Optional[str]:
+        extra = {}
+        if filename:
+            extra["response-content-disposition"] = content_disposition(filename)
+        if content_type:
+            extra["response-content-type"] = content_type
+        if cache_control:
+            extra["response-cache-control"] = cache_control
+        path = self._path(key)
+        query = sigv4.presign_query("GET", self.host, path, expires, self.access_key, self.secret_key, self.region, extra)
+        return f"{self.endpoint_url}{sigv4.encode_path(path)}?{sigv4.encode_query(query)}"
@@ -0,0 +1,90 @@
+"""
+AWS Signature Version 4 for S3-compatible object stores (AWS, MinIO, R2, ...).
+
+Only what the S3 backend needs: signing a request's headers and building a
+presigned query-string URL. Kept dependency-free so the API doesn't pull in
+boto3 for a handful of object calls.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import quote
+import hashlib
+import hmac
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode(), hashlib.sha256).digest()
+
+
+def _encode(value: str, safe: str = "") -> str:
+    return quote(value, safe="-_.~" + safe)
+
+
+def amz_date(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+
+
+def signing_key(secret_key: str, date: str, region: str, service: str = "s3") -> bytes:
+    key = _hmac(("AWS4" + secret_key).encode(), date)
+    key = _hmac(key, region)
+    key = _hmac(key, service)
+    return _hmac(key, "aws4_request")
+
+
+def canonical_request(method: str, path: str, query: Dict[str, str], headers: Dict[str, str], payload_hash: str) -> tuple:
+    """(canonical request, signed header list) as defined by SigV4; header names are lower-cased."""
+    canonical_query = "&".join(f"{_encode(k)}={_encode(v)}" for k, v in sorted(query.items()))
+    lowered = {name.lower(): " ".join(str(value).strip().split()) for name, value in headers.items()}
+    signed = ";".join(sorted(lowered))
+    canonical_headers = "".join(f"{name}:{lowered[name]}\n" for name in sorted(lowered))
+    request = "\n".join([method, _encode(path, safe="/"), canonical_query, canonical_headers, signed, payload_hash])
+    return request, signed
+
+
+def signature(secret_key: str, region: str, timestamp: str, request: str, service: str = "s3") -> str:
+    scope = f"{timestamp[:8]}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join([ALGORITHM, timestamp, scope, hashlib.sha256(request.encode()).hexdigest()])
+    return hmac.new(signing_key(secret_key, timestamp[:8], region, service), string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+def sign_headers(method: str, path: str, query: Dict[str, str], headers: Dict[str, str], payload_hash: str,
+                 access_key: str, secret_key: str, region: str, timestamp: Optional[str] = None) -> Dict[str, str]:
+    """Return `headers` plus x-amz-date, x-amz-content-sha256 and Authorization. `headers` must include host."""
+    timestamp = timestamp or amz_date()
+    headers = {**headers, "x-amz-date": timestamp, "x-amz-content-sha256": payload_hash}
+    request, signed = canonical_request(method, path, query, headers, payload_hash)
+    scope = f"{timestamp[:8]}/{region}/s3/aws4_request"
+    headers["Authorization"] = (
+        f"{ALGORITHM} Credential={access_key}/{scope}, SignedHeaders={signed}, "
+        f"Signature={signature(secret_key, region, timestamp, request)}"
+    )
+    return headers
+
+
+def presign_query(method: str, host: str, path: str, expires: int, access_key: str, secret_key: str, region: str,
+                  extra_query: Optional[Dict[str, str]] = None, timestamp: Optional[str] = None) -> Dict[str, str]:
+    """Query parameters (including X-Amz-Signature) for a presigned URL; only the host header is signed."""
+    timestamp = timestamp or amz_date()
+    query = {
+        **(extra_query or {}),
+        "X-Amz-Algorithm": ALGORITHM,
+        "X-Amz-Credential": f"{access_key}/{timestamp[:8]}/{region}/s3/aws4_request",
+        "X-Amz-Date": timestamp,
+        "X-Amz-Expires": str(expires),
+        "X-Amz-SignedHeaders": "host",
+    }
+    request, _ = canonical_request(method, path, query, {"host": host}, UNSIGNED_PAYLOAD)
+    query["X-Amz-Signature"] = signature(secret_key, region, timestamp, request)
+    return query
+
+
+def encode_query(query: Dict[str, str]) -> str:
+    return "&".join(f"{_encode(k)}={_encode(v)}" for k, v in sorted(query.items()))
+
+
+def encode_path(path: str) -> str:
+    return _encode(path, safe="/")
@@ -0,0 +1,62 @@
+"""
+SQLAlchemy instrumentation: connection pool gauges and slow query counters.
+"""
+from typing import Optional
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+from .metrics import registry
+
+POOL_SIZE = registry.gauge("bondpath_db_pool_size", "Configured size of the SQLAlchemy connection pool", ["engine"])
+POOL_CHECKED_OUT = registry.gauge("bondpath_db_pool_checked_out", "Connections currently checked out of the pool", ["engine"])
+POOL_CHECKED_IN = registry.gauge("bondpath_db_pool_checked_in", "Idle connections held by the pool", ["engine"])
+POOL_OVERFLOW = registry.gauge("bondpath_db_pool_overflow", "Connections opened beyond pool_size", ["engine"])
+POOL_SATURATION = registry.gauge("bondpath_db_pool_saturation", "Checked-out connections as a fraction of pool_size + max_overflow", ["engine"])
+POOL_TIMEOUTS = registry.counter("bondpath_db_pool_timeouts", "Requests answered 503 because no connection freed up within pool_timeout")
+SESSIONS = registry.counter("bondpath_db_read_sessions", "Sessions opened for read-only routes, by where they were routed", ["target"])
+QUERIES = registry.counter("bondpath_db_queries", "SQL statements executed", ["engine", "statement"])
+SLOW_QUERIES = registry.counter("bondpath_db_slow_queries", "SQL statements slower than the slow query threshold", ["engine", "statement"])
+
+
+def _statement_type(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine: Engine, name: str = "primary", capacity: Optional[int] = None):
+    """Attach pool gauges and per-statement timing to an engine. `capacity` (pool_size + max_overflow) enables the saturation gauge."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        statement_type = _statement_type(statement)
+        QUERIES.inc(engine=name, statement=statement_type)
+        if elapsed_ms >= settings.slow_query_ms:
+            SLOW_QUERIES.inc(engine=name, statement=statement_type)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    def collect_pool():
+        pool = engine.pool
+        # SQLite's SingletonThreadPool/StaticPool don't implement the QueuePool counters
+        for gauge, attr in ((POOL_SIZE, "size"), (POOL_CHECKED_OUT, "checkedout"),
+                            (POOL_CHECKED_IN, "checkedin"), (POOL_OVERFLOW, "overflow")):
+            fn = getattr(pool, attr, None)
+            if callable(fn):
+                gauge.set(fn(), engine=name)
+        if capacity and callable(getattr(pool, "checkedout", None)):
+            POOL_SATURATION.set(pool.checkedout() / capacity, engine=name)
+
+    registry.register_collector(collect_pool)
+    return engine
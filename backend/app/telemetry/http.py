@@ -0,0 +1,57 @@
+"""
+ASGI middleware recording per-route request latency and in-flight requests.
+
+Implemented as a raw ASGI callable rather than BaseHTTPMiddleware so it adds no
+extra task or body buffering per request.
+"""
+import time
+
+from .metrics import registry
+
+REQUEST_DURATION = registry.histogram("bondpath_http_request_duration_seconds", "HTTP request latency by route template", ["method", "route"])
+REQUESTS = registry.counter("bondpath_http_requests", "HTTP requests by route template and status", ["method", "route", "status"])
+IN_FLIGHT = registry.gauge("bondpath_http_requests_in_flight", "HTTP requests currently being served")
+THREADPOOL_BUSY = registry.gauge("bondpath_threadpool_busy_threads", "Worker threads currently running sync routes and dependencies")
+THREADPOOL_SIZE = registry.gauge("bondpath_threadpool_size", "Capacity of the threadpool used for sync routes")
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            # Label by route template (e.g. /cases/{case_id}) to keep cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            REQUEST_DURATION.observe(time.perf_counter() - start, method=method, route=path)
+            REQUESTS.inc(method=method, route=path, status=str(status_code))
+
+
+def collect_threadpool():
+    """Threadpool saturation; must run on the event loop (see the async /metrics route)."""
+    from anyio.to_thread import current_default_thread_limiter
+    limiter = current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+
+
+registry.register_collector(collect_threadpool)
@@ -0,0 +1,238 @@
+"""
+Lightweight tracing for orchestrator nodes and agent LLM calls.
+
+A span measures one unit of work (a graph node or a single LLM call). Agent
+spans opened inside a node span roll their token usage and cost up into it.
+Finished spans update the Prometheus metrics immediately and are buffered for
+a batched insert into `trace_spans` when the outermost span closes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Any, List, Optional
+import threading
+import time
+import uuid
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.trace import TraceSpan
+from .metrics import registry
+
+# USD per 1M tokens: (prompt, completion)
+MODEL_PRICING = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+
+NODE_DURATION = registry.summary("bondpath_node_duration_seconds", "Wall time per orchestrator node", ["node"])
+NODE_ERRORS = registry.counter("bondpath_node_errors", "Orchestrator node invocations that raised", ["node"])
+AGENT_DURATION = registry.summary("bondpath_agent_call_duration_seconds", "Wall time per agent LLM call", ["agent", "model"])
+AGENT_QUEUE_WAIT = registry.summary("bondpath_agent_queue_wait_seconds", "Time an agent call waited before being sent", ["agent"])
+AGENT_CALLS = registry.counter("bondpath_agent_calls", "Agent LLM calls by outcome", ["agent", "model", "status"])
+AGENT_TOKENS = registry.counter("bondpath_agent_tokens", "Tokens consumed by agent LLM calls", ["agent", "model", "type"])
+AGENT_COST = registry.counter("bondpath_agent_cost_usd", "Estimated spend of agent LLM calls in USD", ["agent", "model"])
+AGENT_RETRIES = registry.counter("bondpath_agent_retries", "Transport-level retries taken by agent LLM calls", ["agent"])
+AGENT_CACHE_HITS = registry.counter("bondpath_agent_cache_hits", "Agent calls served (fully or partly) from a cache", ["agent"])
+PROMPT_TOKENS = registry.counter(
+    "bondpath_prompt_tokens", "Prompt tokens per prompt template, split by provider prompt-cache hit", ["prompt", "cache"]
+)
+
+# Providers bill prompt tokens served from their prefix cache at this fraction of the normal price
+CACHED_PROMPT_PRICE_FACTOR = 0.5
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """`cached_tokens` is the part of `prompt_tokens` served from the provider's prompt cache."""
+    prompt_price, completion_price = MODEL_PRICING.get(model or "", (0.0, 0.0))
+    billed_prompt = prompt_tokens - cached_tokens + cached_tokens * CACHED_PROMPT_PRICE_FACTOR
+    return (billed_prompt * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def _token_count(usage: Any, *names: str) -> int:
+    """First integer attribute found; OpenAI and Gemini name their usage fields differently."""
+    for name in names:
+        value = getattr(usage, name, None)
+        if isinstance(value, int):
+            return value
+    return 0
+
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    case_id: Optional[str] = None
+    parent: Optional["Span"] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    model: Optional[str] = None
+    status: str = "OK"
+    error: Optional[str] = None
+    duration_ms: float = 0.0
+    queue_wait_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    cache_hit: bool = False
+    cached_tokens: int = 0
+    prompt: Optional[str] = None  # Prompt template id, e.g. "risk@v1"
+    retries: int = 0
+
+    def record_usage(self, usage: Any, model: Optional[str] = None):
+        """Record token usage from a provider response (OpenAI `CompletionUsage` or similar)."""
+        if model:
+            self.model = model
+        if usage is None:
+            return
+        prompt = _token_count(usage, "prompt_tokens", "prompt_token_count")
+        completion = _token_count(usage, "completion_tokens", "candidates_token_count")
+        # OpenAI reports prefix-cache hits under prompt_tokens_details, Gemini as cached_content_token_count
+        cached = _token_count(getattr(usage, "prompt_tokens_details", None), "cached_tokens") \
+            or _token_count(usage, "cached_content_token_count")
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cached_tokens += cached
+        self.cost_usd += estimate_cost(self.model, prompt, completion, cached)
+        if cached > 0:
+            self.cache_hit = True
+
+    def to_model(self) -> TraceSpan:
+        return TraceSpan(
+            id=self.id,
+            parent_id=self.parent.id if self.parent else None,
+            case_id=self.case_id,
+            kind=self.kind,
+            name=self.name,
+            model=self.model,
+            status=self.status,
+            error=self.error,
+            started_at=self.started_at,
+            duration_ms=self.duration_ms,
+            queue_wait_ms=self.queue_wait_ms,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            cost_usd=self.cost_usd,
+            cache_hit=self.cache_hit,
+            cached_prompt_tokens=self.cached_tokens,
+            prompt=self.prompt,
+            retries=self.retries,
+        )
+
+
+class TraceRecorder:
+    """Buffers finished spans and writes them to the database in one batch."""
+
+    def __init__(self, session_factory=SessionLocal, max_buffer: int = 500):
+        self.session_factory = session_factory
+        self.max_buffer = max_buffer
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self._buffer.append(span)
+            # Never grow without bound if the database is unreachable
+            if len(self._buffer) > self.max_buffer:
+                del self._buffer[: len(self._buffer) - self.max_buffer]
+
+    def flush(self):
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if not spans or not settings.trace_to_db:
+            return
+        db = self.session_factory()
+        try:
+            db.add_all([s.to_model() for s in spans])
+            db.commit()
+        except Exception as e:
+            print(f"Warning: Failed to persist {len(spans)} trace spans: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+
+recorder = TraceRecorder()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _finish(span: Span):
+    seconds = span.duration_ms / 1000
+    if span.kind == "node":
+        NODE_DURATION.observe(seconds, node=span.name)
+        if span.status != "OK":
+            NODE_ERRORS.inc(node=span.name)
+    else:
+        model = span.model or "unknown"
+        AGENT_DURATION.observe(seconds, agent=span.name, model=model)
+        AGENT_QUEUE_WAIT.observe(span.queue_wait_ms / 1000, agent=span.name)
+        AGENT_CALLS.inc(agent=span.name, model=model, status=span.status)
+        AGENT_TOKENS.inc(span.prompt_tokens, agent=span.name, model=model, type="prompt")
+        AGENT_TOKENS.inc(span.completion_tokens, agent=span.name, model=model, type="completion")
+        AGENT_COST.inc(span.cost_usd, agent=span.name, model=model)
+        if span.retries:
+            AGENT_RETRIES.inc(span.retries, agent=span.name)
+        if span.cache_hit:
+            AGENT_CACHE_HITS.inc(agent=span.name)
+        if span.prompt:
+            PROMPT_TOKENS.inc(span.cached_tokens, prompt=span.prompt, cache="hit")
+            PROMPT_TOKENS.inc(span.prompt_tokens - span.cached_tokens, prompt=span.prompt, cache="miss")
+
+    # Roll LLM usage up into the enclosing node span
+    if span.parent is not None:
+        span.parent.prompt_tokens += span.prompt_tokens
+        span.parent.cached_tokens += span.cached_tokens
+        span.parent.completion_tokens += span.completion_tokens
+        span.parent.cost_usd += span.cost_usd
+        span.parent.retries += span.retries
+        span.parent.queue_wait_ms += span.queue_wait_ms
+
+    recorder.add(span)
+    if span.parent is None:
+        recorder.flush()
+
+
+def record_span(span: Span):
+    """Finish a span timed by the caller, for work that outlives one context (e.g. a streamed response)."""
+    _finish(span)
+
+
+@contextmanager
+def trace_span(kind: str, name: str, case_id: Optional[str] = None):
+    """
+    Time a block of work. Yields the Span so callers can attach model/usage data.
+    Exceptions are recorded on the span and re-raised.
+    """
+    parent = _current_span.get()
+    span = Span(kind=kind, name=name, case_id=case_id or (parent.case_id if parent else None), parent=parent)
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception as e:
+        span.status = "ERROR"
+        span.error = str(e)[:500]
+        raise
+    finally:
+        span.duration_ms = (time.perf_counter() - start) * 1000
+        _current_span.reset(token)
+        _finish(span)
+
+
+def traced_node(fn):
+    """Decorator for orchestrator nodes: one `node` span per invocation, tagged with the case."""
+    @wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        with trace_span("node", fn.__name__, case_id=state.get("case_id")):
+            return fn(state, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,50 @@
+"""query indexes
+
+Indexes for the queries the API runs on every dashboard poll: duplicate
+defendant lookup, workload counts, assignee/advisor/booking number filters,
+newest-first listing and a case's audit history. On Postgres they are built
+CONCURRENTLY so a live cases table stays writable during the upgrade.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def _partial(column):
+    where = sa.text(f"{column} IS NOT NULL")
+    return {"sqlite_where": where, "postgresql_where": where}
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_cases_defendant_name_lower', 'cases',
+                        [sa.text('lower(defendant_last_name)'), sa.text('lower(defendant_first_name)')],
+                        postgresql_concurrently=True)
+        op.create_index('ix_cases_state_assigned_to', 'cases', ['state', 'assigned_to'], postgresql_concurrently=True)
+        for column in ('assigned_to', 'advisor_id', 'booking_number'):
+            op.create_index(f'ix_cases_{column}', 'cases', [column], postgresql_concurrently=True, **_partial(column))
+        op.create_index('ix_cases_created_at', 'cases', ['created_at', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_cases_updated_at', 'cases', ['updated_at'], postgresql_concurrently=True)
+        op.create_index('ix_audit_logs_case_id_timestamp', 'audit_logs', ['case_id', 'timestamp'], postgresql_concurrently=True)
+
+    # Covered by the leading column of ix_audit_logs_case_id_timestamp
+    op.drop_index('ix_audit_logs_case_id', table_name='audit_logs')
+
+
+def downgrade():
+    op.create_index('ix_audit_logs_case_id', 'audit_logs', ['case_id'], unique=False)
+    op.drop_index('ix_audit_logs_case_id_timestamp', table_name='audit_logs')
+    for name in ('ix_cases_updated_at', 'ix_cases_created_at', 'ix_cases_booking_number', 'ix_cases_advisor_id',
+                 'ix_cases_assigned_to', 'ix_cases_state_assigned_to', 'ix_cases_defendant_name_lower'):
+        op.drop_index(name, table_name='cases')
@@ -0,0 +1,43 @@
+"""documents
+
+Uploaded documents move from files named after the case into the storage
+backend under content-addressed keys; this table maps each upload to its
+object and indexes the content hash for dedup.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('documents',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('case_id', sa.String(), nullable=False),
+    sa.Column('document_type', sa.String(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('content_type', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_documents_case_id'), 'documents', ['case_id'], unique=False)
+    op.create_index(op.f('ix_documents_sha256'), 'documents', ['sha256'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_documents_sha256'), table_name='documents')
+    op.drop_index(op.f('ix_documents_case_id'), table_name='documents')
+    op.drop_table('documents')
@@ -0,0 +1,43 @@
+"""document extractions
+
+Caches what the vision model read from each distinct document (by content
+hash, document type and prompt version), so re-uploads and re-verification
+after a case edit don't repeat the vision call.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('document_extractions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('doc_type', sa.String(), nullable=False),
+    sa.Column('prompt', sa.String(), nullable=False),
+    sa.Column('is_valid_document', sa.Boolean(), nullable=False),
+    sa.Column('document_type_detected', sa.String(), nullable=False),
+    sa.Column('extracted_data', sa.JSON(), nullable=False),
+    sa.Column('confidence_score', sa.Integer(), nullable=False),
+    sa.Column('facts_fingerprint', sa.String(length=64), nullable=True),
+    sa.Column('match_status', sa.String(), nullable=True),
+    sa.Column('mismatches', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_document_extractions_lookup', 'document_extractions', ['sha256', 'doc_type', 'prompt'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_document_extractions_lookup', table_name='document_extractions')
+    op.drop_table('document_extractions')
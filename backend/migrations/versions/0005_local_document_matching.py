@@ -0,0 +1,32 @@
+"""local document matching
+
+Documents are now compared with the case locally (rules/document_match.py),
+so extractions no longer keep the vision model's own match verdict.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('document_extractions', schema=None) as batch_op:
+        batch_op.drop_column('mismatches')
+        batch_op.drop_column('match_status')
+        batch_op.drop_column('facts_fingerprint')
+
+
+def downgrade():
+    with op.batch_alter_table('document_extractions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('facts_fingerprint', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('match_status', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('mismatches', sa.JSON(), nullable=True))
@@ -0,0 +1,30 @@
+"""document verification status
+
+Verification runs in the background after the upload returns; documents
+still PENDING are re-queued when a worker starts.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('verification_status', sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_documents_verification_status'), ['verification_status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_verification_status'))
+        batch_op.drop_column('verification_status')
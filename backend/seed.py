@@ -1,10 +1,10 @@
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, run_migrations
 from app.models.user import User
 from app.utils import get_password_hash
 import uuid
 
 def seed():
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
     db = SessionLocal()
     try:
         # CST User
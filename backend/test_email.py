@@ -1,40 +1,75 @@
 import sys
 import os
+import argparse
 import logging
 
 # Add current directory to path so we can import app
 sys.path.append(os.getcwd())
 
-from app.services.email_service import EmailService
-from app.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-# Force override settings for testing
-settings.SMTP_PORT = 587
-settings.SMTP_TLS = True
+from app.config import settings
+from app.database import Base
+from app.models import audit, case, conversation, decision, document, email, event, signature_token, trace, user  # noqa: F401  (register the tables)
+from app.services.email_outbox import EmailOutbox, SMTPPool
+from app.services.email_service import EmailService
+from app.services.fake_smtp import FakeSMTPServer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def test_email():
-    print("Testing Email Service (FORCED PORT 587)...")
-    print(f"SMTP Host: {settings.SMTP_HOST}")
-    print(f"SMTP Port: {settings.SMTP_PORT}")
-    print(f"SMTP User: {settings.SMTP_USER}")
-    
-    success = EmailService.send_signature_request(
-        to_email="ogerolazarus6@gmail.com",  # Using the email from the screenshot
-        case_id="test-case-id-123",
-        defendant_name="Jaydon Welch Hayes",
-        bond_amount=6000.00,
-        advisor_name="Mohammed Goyette",
-        signature_link="http://localhost:5173/signature/test-token"
-    )
-    
-    if success:
-        print("Email sent successfully!")
+def test_email(to_email: str, fake: bool = False):
+    # The outbox needs a table to queue in; a throwaway in-memory one keeps the real database untouched
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    server = FakeSMTPServer().start() if fake else None
+    if server:
+        pool = SMTPPool(server.host, server.port, timeout=settings.SMTP_TIMEOUT)
     else:
-        print("Failed to send email. Check logs above.")
+        pool = SMTPPool(settings.SMTP_HOST, settings.SMTP_PORT, tls=settings.SMTP_TLS, user=settings.SMTP_USER,
+                        password=settings.SMTP_PASSWORD, size=1, timeout=settings.SMTP_TIMEOUT)
+    outbox = EmailOutbox(pool, session_factory=session_factory, workers=0, max_attempts=1)
+
+    print("Testing Email Outbox...")
+    print(f"SMTP Host: {pool.host}")
+    print(f"SMTP Port: {pool.port}")
+    print(f"SMTP User: {pool.user or '(none)'}")
+
+    db = session_factory()
+    try:
+        message = EmailService.signature_request(
+            to_email=to_email,
+            case_id=None,  # No case row in the throwaway database
+            defendant_name="Jaydon Welch Hayes",
+            bond_amount=6000.00,
+            advisor_name="Mohammed Goyette",
+            signature_link="http://localhost:5173/signature/test-token"
+        )
+        db.add(message)
+        db.commit()
+
+        outbox.run_pending()
+        db.refresh(message)
+        if message.status == "SENT":
+            print(f"Email sent successfully! Message-ID: {message.message_id}")
+            if server:
+                print(f"Fake SMTP server received {len(server.messages)} message(s)")
+        else:
+            print(f"Failed to send email ({message.status}): {message.last_error}")
+    finally:
+        db.close()
+        outbox.stop()
+        if server:
+            server.stop()
 
 if __name__ == "__main__":
-    test_email()
+    parser = argparse.ArgumentParser(description="Queue a signature request email and flush it through the outbox")
+    parser.add_argument("--to", default="client@example.com", help="Recipient address")
+    parser.add_argument("--fake", action="store_true", help="Send to a local fake SMTP server instead of the configured relay")
+    args = parser.parse_args()
+    test_email(args.to, args.fake)
@@ -1,21 +1,46 @@
+import os
+import tempfile
+
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
-from app.main import app
+from app.config import settings
+
+# Uploads and renditions go to throwaway directories; set before the storage backend and cache are created on import
+settings.storage_local_root = tempfile.mkdtemp(prefix="bondpath-test-uploads-")
+settings.rendition_cache_dir = tempfile.mkdtemp(prefix="bondpath-test-renditions-")
+# No verification workers: uploads leave their job queued and tests run it with verification_queue.run_pending()
+settings.verification_workers = 0
+# Likewise for the mail outbox: emails stay queued until a test calls email_outbox.run_pending()
+settings.EMAIL_WORKERS = 0
+
+from app.database import Base, get_async_db, get_async_read_db, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.email_outbox import email_outbox  # noqa: E402
+from app.services.verification_queue import verification_queue  # noqa: E402
+
+# Warm-up would open the real engines and call the LLM providers; tests/test_warmup.py runs its steps directly
+settings.warmup_enabled = False
 
-# In-memory SQLite for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# File-backed SQLite so the sync session and the async (aiosqlite) routes see the same data
+_db_dir = tempfile.mkdtemp(prefix="bondpath-test-")
+SQLALCHEMY_DATABASE_PATH = os.path.join(_db_dir, "test.db")
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
+    f"sqlite:///{SQLALCHEMY_DATABASE_PATH}",
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+verification_queue.session_factory = TestingSessionLocal
+email_outbox.session_factory = TestingSessionLocal
+
+# NullPool: each TestClient request runs on its own event loop, so connections can't be shared
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{SQLALCHEMY_DATABASE_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -36,8 +61,17 @@ def client(db_session):
             yield db_session
         finally:
             pass
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
             
+    # Drop overrides a test without a client left behind (e.g. get_current_user)
+    app.dependency_overrides.clear()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+    verification_queue.clear()
@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.agents.context import CONTEXT_SPECS, ContextSpec, build_context
+
+
+def full_case_row():
+    """Every column a caller might dump from a Case, including blobs and prior agent output."""
+    signature = "data:image/png;base64," + base64.b64encode(b"\x89PNG" * 2000).decode()
+    return {
+        "id": "case-1",
+        "defendant_first_name": "John",
+        "defendant_last_name": "Doe",
+        "defendant_dob": date(1990, 5, 1),
+        "defendant_ssn_last4": "1234",
+        "jail_facility": "Harris County Jail",
+        "bond_amount": Decimal("5000.00"),
+        "charges": "Theft",
+        "indemnitor_first_name": "Jane",
+        "indemnitor_last_name": "Doe",
+        "indemnitor_email": None,
+        "collateral_description": "",
+        "terms_signature": signature,
+        "indemnitor_signature": None,
+        "booking_sheet_url": "uploads/case-1_booking_sheet.png",
+        "derived_facts": {"risk": {"risk_factors": ["x" * 500] * 10}},
+        "decisions": [{"qualification": {"passed": True}}],
+    }
+
+
+def test_readiness_context_is_an_order_of_magnitude_smaller():
+    row = full_case_row()
+    raw = json.dumps(row, default=str)
+    context = build_context(row, CONTEXT_SPECS["ReadinessAgent"], agent="ReadinessAgent")
+
+    assert len(context.text) * 10 < len(raw)
+    data = json.loads(context.text)
+    assert data["defendant"] == {"first_name": "John", "last_name": "Doe", "dob": "1990-05-01"}
+    assert data["indemnitor"] == {"first_name": "Jane", "last_name": "Doe", "signature": False}
+    assert data["bond_amount"] == 5000
+    # Blobs become presence flags, empty values and non-allow-listed columns disappear
+    assert data["terms_signature"] is True
+    assert data["booking_sheet_url"] is True
+    for dropped in ("derived_facts", "decisions", "collateral_description", "id"):
+        assert dropped not in data
+    assert "ssn_last4" not in data["defendant"]
+    assert context.tokens == len(context.text) // 4
+
+
+def test_blobs_are_redacted_even_without_an_allow_list():
+    blob = base64.b64encode(b"\x00" * 600).decode()
+    data = json.loads(build_context({"notes": "short", "attachment": blob}, ContextSpec()).text)
+    assert data == {"notes": "short", "attachment": "[blob]"}
+
+
+def test_strings_shrink_to_fit_token_budget():
+    spec = ContextSpec(max_string=1000, max_tokens=100)
+    context = build_context({"a": "word " * 400, "b": "word " * 400}, spec)
+    assert context.tokens <= 100
+    assert json.loads(context.text)["a"].endswith("…")
+
+
+def test_grouping_merges_with_nested_intake_output():
+    facts = {"defendant": {"name": "John Doe", "jail": "Harris"}, "defendant_dob": "1990-05-01", "flags": []}
+    data = json.loads(build_context(facts, CONTEXT_SPECS["RiskAgent"]).text)
+    assert data == {"defendant": {"name": "John Doe", "jail": "Harris", "dob": "1990-05-01"}}
@@ -0,0 +1,109 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from app.database import async_database_url
+from app.models.audit import AuditLog
+from app.models.case import Case
+from app.models.email import OutboundEmail
+from app.models.user import User
+
+
+def make_case(db_session, case_id="async-case", **overrides):
+    values = dict(
+        id=case_id, state="QUALIFIED", defendant_first_name="John", defendant_last_name="Doe",
+        jail_facility="Harris County Jail", county="Harris", state_jurisdiction="TX", bond_amount=5000,
+        bond_type="SURETY", charge_severity="MISDEMEANOR", caller_name="Jane", caller_relationship="Mother",
+        caller_phone="555-0100", intent_signal="GET_OUT_TODAY", fast_flags=[],
+    )
+    values.update(overrides)
+    case = Case(**values)
+    db_session.add(case)
+    db_session.commit()
+    return case
+
+
+def test_async_database_url_picks_the_asyncio_driver():
+    assert async_database_url("postgresql://u:p@db/bondpath") == "postgresql+asyncpg://u:p@db/bondpath"
+    assert async_database_url("postgresql+psycopg2://u:p@db/bondpath") == "postgresql+asyncpg://u:p@db/bondpath"
+    assert async_database_url("sqlite:////tmp/bondpath.db") == "sqlite+aiosqlite:////tmp/bondpath.db"
+
+
+def test_case_list_read_and_patch(client, db_session):
+    make_case(db_session)
+
+    response = client.get("/cases/")
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == ["async-case"]
+
+    assert float(client.get("/cases/async-case").json()["bond_amount"]) == 5000
+    assert client.get("/cases/missing").status_code == 404
+
+    response = client.patch("/cases/async-case", json={"advisor_notes": "Called back", "premium_type": "PAYMENT_PLAN"})
+    assert response.status_code == 200
+    assert response.json()["advisor_notes"] == "Called back"
+    assert response.json()["version"] == 2
+    assert client.patch("/cases/missing", json={"advisor_notes": "x"}).status_code == 404
+
+
+def test_audit_logs_newest_first(client, db_session):
+    make_case(db_session)
+    db_session.add_all([
+        AuditLog(case_id="async-case", action="CASE_CREATED", timestamp=datetime(2024, 1, 1)),
+        AuditLog(case_id="async-case", action="RISK_ASSESSED", timestamp=datetime(2024, 1, 2)),
+    ])
+    db_session.commit()
+
+    logs = client.get("/audit/case/async-case").json()
+    assert [log["action"] for log in logs] == ["RISK_ASSESSED", "CASE_CREATED"]
+
+
+def test_workload_counts_only_active_cases(client, db_session):
+    db_session.add_all([
+        User(id="adv-1", email="a1@example.com", hashed_password="x", role="PRODUCER"),
+        User(id="adv-2", email="a2@example.com", hashed_password="x", role="PRODUCER"),
+        User(id="uw-1", email="u1@example.com", hashed_password="x", role="UW"),
+    ])
+    db_session.commit()
+    make_case(db_session, "c1", assigned_to="adv-1")
+    make_case(db_session, "c2", assigned_to="adv-1", state="ADVISOR_ACTIVE")
+    make_case(db_session, "c3", assigned_to="adv-1", state="CLOSED")
+    make_case(db_session, "c4", assigned_to="uw-1", state="UNDERWRITING_REVIEW")
+
+    advisors = {a["id"]: a["active_cases"] for a in client.get("/users/advisors").json()}
+    assert advisors == {"adv-1": 2, "adv-2": 0}
+    assert client.get("/users/underwriters").json() == [{"id": "uw-1", "email": "u1@example.com", "active_cases": 1}]
+
+
+def test_remote_signature_flow(client, db_session):
+    make_case(db_session)
+
+    response = client.post("/signature/cases/async-case/send-remote-signature", json={"email": "client@example.com"})
+    assert response.status_code == 200
+    assert response.json()["email_status"] == "QUEUED"
+    email = db_session.get(OutboundEmail, response.json()["email_id"])
+    assert email.subject == "Bail Bond Agreement - John Doe" and email.to_address == "client@example.com"
+    token = response.json()["token"]
+
+    page = client.get(f"/signature/public/signature/{token}").json()
+    assert page["case_id"] == "async-case" and page["bond_amount"] == 5000
+
+    response = client.post(f"/signature/public/signature/{token}/submit",
+                           json={"terms_signature": "data:image/png;base64,AAAA", "indemnitor_printed_name": "Jane Doe"})
+    assert response.status_code == 200
+    assert client.get(f"/signature/public/signature/{token}").status_code == 400
+
+    db_session.expire_all()
+    case = db_session.get(Case, "async-case")
+    assert case.terms_signature == "data:image/png;base64,AAAA"
+    assert case.remote_acknowledgment_sent == "COMPLETED"
+
+
+def test_case_list_filters_and_orders_newest_first(client, db_session):
+    make_case(db_session, "old", created_at=datetime(2024, 1, 1), assigned_to="adv-1", booking_number="HC-1")
+    make_case(db_session, "new", created_at=datetime(2024, 2, 1), advisor_id="adv-2")
+
+    assert [c["id"] for c in client.get("/cases/").json()] == ["new", "old"]
+    assert [c["id"] for c in client.get("/cases/", params={"assigned_to": "adv-1"}).json()] == ["old"]
+    assert [c["id"] for c in client.get("/cases/", params={"advisor_id": "adv-2"}).json()] == ["new"]
+    assert [c["id"] for c in client.get("/cases/", params={"booking_number": "HC-1"}).json()] == ["old"]
+    assert client.get("/cases/", params={"state": "CLOSED"}).json() == []
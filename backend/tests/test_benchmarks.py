@@ -0,0 +1,44 @@
+from app.benchmarks import suites
+from app.benchmarks.__main__ import main
+from app.benchmarks.runner import BENCHMARKS, BenchmarkResult, compare, load_baselines, run_benchmark, save_baselines
+
+
+def result(name, median, size=100):
+    return BenchmarkResult(name, size, "case", size, [median])
+
+
+def test_every_benchmark_runs_at_quick_size():
+    assert {"rules.evaluate_all", "dedup.find_duplicate", "serialise.case_list",
+            "serialise.case_with_signatures", "audit.log_action"} <= set(BENCHMARKS)
+    for bench in BENCHMARKS.values():
+        outcome = run_benchmark(bench, size=bench.quick_size, rounds=1)
+        assert outcome.ops_per_round > 0
+        assert outcome.median > 0
+
+
+def test_signature_blobs_survive_serialisation():
+    case = suites.synthetic_case(1, signatures=True)
+    body = suites.CASE_LIST.dump_json(suites.CASE_LIST.validate_python([case]))
+    assert len(body) > len(suites.SIGNATURE_COLUMNS) * suites.SIGNATURE_BYTES
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baselines = {"benchmarks": {
+        "slow": {"size": 100, "median_seconds": 1.0},
+        "fast": {"size": 100, "median_seconds": 1.0},
+        "same": {"size": 100, "median_seconds": 1.0},
+        "resized": {"size": 50, "median_seconds": 1.0},
+    }}
+    rows = compare([result("slow", 1.3), result("fast", 0.5), result("same", 1.1), result("resized", 9.0)], baselines, 0.25)
+
+    assert [r["status"] for r in rows] == ["regression", "improved", "ok", "no-baseline"]
+    assert rows[0]["change"] == 0.3
+
+
+def test_cli_exits_non_zero_on_regression(tmp_path):
+    path = tmp_path / "baselines.json"
+    assert main(["--quick", "--filter", "rules.", "--rounds", "1", "--baselines", str(path), "--update-baselines"]) == 0
+    assert load_baselines(path)["benchmarks"]["rules.evaluate_all"]["size"] == BENCHMARKS["rules.evaluate_all"].quick_size
+
+    save_baselines([result("rules.evaluate_all", 1e-5, size=BENCHMARKS["rules.evaluate_all"].quick_size)], path)
+    assert main(["--quick", "--filter", "rules.", "--rounds", "1", "--baselines", str(path)]) == 1
@@ -0,0 +1,122 @@
+import json
+import threading
+
+from app.agents.chat import ActionSplitter, chat_agent
+from app.agents.providers import LLMProvider, LLMStream
+from app.agents.router import ProviderRouter
+from app.api.auth import get_current_user
+from app.main import app
+
+
+class StreamingProvider(LLMProvider):
+    """Streams fixed deltas and records whether the upstream stream was closed."""
+
+    name = "fake"
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.closed = False
+        self.pulled = 0
+
+    def stream(self, request):
+        def chunks():
+            for delta in self.deltas:
+                self.pulled += 1
+                yield delta, None
+
+        def close():
+            self.closed = True
+
+        return LLMStream(self.name, "fake-model", chunks(), close=close)
+
+
+ANSWER = ["The bond is ", "$5,000.", "\nACT", "IONS: [\"View ", "Risk Details\"]"]
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_splitter_holds_back_partial_marker():
+    splitter = ActionSplitter()
+    emitted = "".join(splitter.feed(delta) for delta in ANSWER)
+    text, actions = splitter.finish()
+
+    assert emitted + text == "The bond is $5,000."
+    assert actions == ["View Risk Details"]
+
+
+def test_splitter_without_actions_keeps_all_text():
+    splitter = ActionSplitter()
+    emitted = splitter.feed("Line one\nAC")
+    text, actions = splitter.finish()
+    assert emitted + text == "Line one\nAC"
+    assert actions == []
+
+
+def test_stream_endpoint_emits_tokens_then_actions(client, monkeypatch):
+    provider = StreamingProvider(ANSWER)
+    monkeypatch.setattr(chat_agent, "router", ProviderRouter([provider], hedge=False))
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "agent@example.com", "role": "AGENT"}
+
+    response = client.post("/chat/message/stream", json={"message": "What is the bond?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [name for name, _ in events][-1] == "actions"
+    assert "".join(data["text"] for name, data in events if name == "token") == "The bond is $5,000."
+    assert events[-1][1] == {"suggested_actions": ["View Risk Details"]}
+    assert provider.closed
+
+
+def test_cancelled_stream_closes_upstream():
+    provider = StreamingProvider(["one ", "two ", "three ", "four"])
+    cancelled = threading.Event()
+    original = chat_agent.router
+    chat_agent.router = ProviderRouter([provider], hedge=False)
+    try:
+        events = chat_agent.stream("hi", cancelled=cancelled)
+        assert next(events) == ("token", {"text": "one "})
+        cancelled.set()
+        assert list(events) == []
+    finally:
+        chat_agent.router = original
+
+    assert provider.closed
+    assert provider.pulled < len(provider.deltas)
+
+
+def test_streamed_turn_is_saved_after_the_request_session_closes(client, db_session, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api import chat as chat_api
+    from app.database import get_db
+    from app.models.conversation import Conversation
+
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+
+    # Like the real get_db: the session is closed once the endpoint returns, before the stream is consumed
+    def closing_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(chat_api, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(chat_agent, "router", ProviderRouter([StreamingProvider(ANSWER)], hedge=False))
+    app.dependency_overrides[get_db] = closing_get_db
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "agent@example.com", "role": "AGENT"}
+
+    assert client.post("/chat/message/stream", json={"message": "What is the bond?"}).status_code == 200
+
+    conversation = db_session.query(Conversation).filter_by(user_id="agent@example.com", case_id=None).one()
+    assert conversation.turns == [
+        {"role": "user", "content": "What is the bond?"},
+        {"role": "assistant", "content": "The bond is $5,000."},
+    ]
@@ -0,0 +1,98 @@
+from app.agents.chat import ConversationSummary, chat_agent
+from app.agents.providers import LLMProvider, LLMResponse
+from app.agents.router import ProviderRouter
+from app.api.auth import get_current_user
+from app.main import app
+from app.models.case import Case
+from app.models.conversation import Conversation
+from app.services import conversation_service as conversation_module
+from app.services.conversation_service import CONTEXT_CACHE, conversation_service
+
+
+class RecordingProvider(LLMProvider):
+    name = "fake"
+
+    def __init__(self):
+        self.requests = []
+
+    def complete(self, request):
+        self.requests.append(request)
+        if request.response_format is ConversationSummary:
+            data = {"summary": f"summary of {len(request.messages[0]['content'])} chars"}
+        else:
+            data = {"response": f"answer {len(self.requests)}", "suggested_actions": []}
+        return LLMResponse(data=data, provider=self.name, model="fake-model")
+
+
+def make_case(db_session, case_id="conv-case"):
+    case = Case(
+        id=case_id, state="QUALIFIED", defendant_first_name="John", defendant_last_name="Doe",
+        jail_facility="Harris County Jail", county="Harris", state_jurisdiction="TX", bond_amount=5000,
+        bond_type="SURETY", charge_severity="MISDEMEANOR", caller_name="Jane", caller_relationship="Mother",
+        caller_phone="555-0100", intent_signal="GET_OUT_TODAY", derived_facts={"risk": {"risk_score": 30}}
+    )
+    db_session.add(case)
+    db_session.commit()
+    return case
+
+
+def use_fake_provider(monkeypatch):
+    provider = RecordingProvider()
+    monkeypatch.setattr(chat_agent, "router", ProviderRouter([provider], hedge=False))
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "agent@example.com", "role": "AGENT"}
+    return provider
+
+
+def test_follow_up_includes_previous_turns(client, db_session, monkeypatch):
+    provider = use_fake_provider(monkeypatch)
+    make_case(db_session)
+
+    client.post("/chat/message", json={"message": "What is the bond?", "case_id": "conv-case"})
+    response = client.post("/chat/message", json={"message": "And the risk?", "case_id": "conv-case"})
+
+    assert response.status_code == 200
+    second = provider.requests[-1].messages
+    assert {"role": "user", "content": "What is the bond?"} in [
+        {"role": m["role"], "content": m["content"].split("\n\nCURRENT CONTEXT")[0]} for m in second
+    ]
+    assert {"role": "assistant", "content": "answer 1"} in second
+    # The case block sits in the stable prefix, ahead of the conversation
+    assert second[1]["content"].startswith("CASE CONTEXT:\n{")
+    assert '"risk_score":30' in second[1]["content"]
+
+    conversation = db_session.query(Conversation).filter_by(user_id="agent@example.com", case_id="conv-case").one()
+    assert len(conversation.turns) == 4
+
+
+def test_old_turns_are_summarised_over_budget(db_session, monkeypatch):
+    provider = use_fake_provider(monkeypatch)
+    monkeypatch.setattr(conversation_module.settings, "chat_history_token_budget", 50)
+    monkeypatch.setattr(conversation_module.settings, "chat_keep_recent_turns", 2)
+
+    conversation = conversation_service.get_or_create(db_session, "agent@example.com")
+    for i in range(3):
+        conversation_service.record_turn(db_session, conversation, f"question {i} " + "x" * 100, f"reply {i}")
+
+    assert conversation.summary.startswith("summary of")
+    assert [t["content"] for t in conversation.turns] == ["question 2 " + "x" * 100, "reply 2"]
+    assert conversation.summarized_turns == 4
+    assert conversation_service.history(conversation)[0]["role"] == "system"
+    assert sum(1 for r in provider.requests if r.response_format is ConversationSummary) == 2
+    assert provider.requests[0].model == chat_agent.policy.small_model
+
+
+def test_case_block_is_cached_until_case_changes(db_session):
+    case = make_case(db_session, "cache-case")
+    misses = CONTEXT_CACHE.value(result="miss")
+    hits = CONTEXT_CACHE.value(result="hit")
+
+    first = conversation_service.case_context(db_session, "cache-case")
+    assert conversation_service.case_context(db_session, "cache-case") == first
+    assert (CONTEXT_CACHE.value(result="miss"), CONTEXT_CACHE.value(result="hit")) == (misses + 1, hits + 1)
+
+    case.version = 2
+    case.charges = "Theft"
+    db_session.commit()
+    assert '"charges":"Theft"' in conversation_service.case_context(db_session, "cache-case")
+    assert CONTEXT_CACHE.value(result="miss") == misses + 2
+
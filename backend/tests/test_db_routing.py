@@ -0,0 +1,100 @@
+import asyncio
+import itertools
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.requests import Request
+
+from app import database
+from app.database import PRIMARY_COOKIE, PRIMARY_HEADER, ReadYourWritesMiddleware, engine_options, get_async_read_db
+from app.config import settings
+from app.main import app
+from app.telemetry.db import POOL_TIMEOUTS, SESSIONS
+
+
+def request_with_cookie(cookie: str = "") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "path": "/cases/", "headers": headers})
+
+
+def routed_to(request: Request):
+    async def open_session():
+        gen = get_async_read_db(request)
+        session = await gen.__anext__()
+        await gen.aclose()
+        return session.bind
+    return asyncio.run(open_session())
+
+
+def test_pool_options_skip_sizing_for_sqlite():
+    assert "pool_size" not in engine_options("sqlite:////tmp/x.db")
+    options = engine_options("postgresql://u:p@db/bondpath")
+    assert options["pool_pre_ping"] is True
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} <= set(options)
+
+
+def test_reads_go_to_replicas_unless_the_client_just_wrote(monkeypatch):
+    replicas = [database._async_engine("sqlite:////tmp/bondpath-replica-a.db", "test-replica-a"),
+                database._async_engine("sqlite:////tmp/bondpath-replica-b.db", "test-replica-b")]
+    factories = [database.async_sessionmaker(e) for e in replicas]
+    monkeypatch.setattr(database, "ReplicaSessionLocals", factories)
+    monkeypatch.setattr(database, "_next_replica", itertools.cycle([0, 1]))
+
+    before = SESSIONS.value(target="replica")
+    assert routed_to(request_with_cookie()) is replicas[0]
+    assert routed_to(request_with_cookie(f"{PRIMARY_COOKIE}={time.time() - 1}")) is replicas[1]
+    assert SESSIONS.value(target="replica") == before + 2
+
+    sticky = request_with_cookie(f"{PRIMARY_COOKIE}={time.time() + 60}")
+    assert routed_to(sticky) is database.async_engine
+    assert routed_to(request_with_cookie(f"{PRIMARY_COOKIE}=garbage")) is replicas[0]
+
+    # The SPA echoes the marker as a header when the cookie can't travel cross-site
+    echoed = Request({"type": "http", "method": "GET", "path": "/cases/",
+                      "headers": [(PRIMARY_HEADER.lower().encode(), str(time.time() + 60).encode())]})
+    assert routed_to(echoed) is database.async_engine
+
+
+def test_successful_writes_set_the_sticky_cookie():
+    demo = FastAPI()
+
+    @demo.get("/read")
+    def read():
+        return {}
+
+    @demo.patch("/write")
+    def write():
+        return {}
+
+    demo.add_middleware(ReadYourWritesMiddleware)
+    client = TestClient(demo)
+    assert PRIMARY_COOKIE not in client.get("/read").cookies
+    response = client.patch("/write")
+    assert float(response.cookies[PRIMARY_COOKIE]) > time.time()
+    assert response.headers[PRIMARY_HEADER] == response.cookies[PRIMARY_COOKIE]
+
+
+def test_pool_timeout_is_a_503():
+    @app.get("/_pool_timeout_probe")
+    def probe():
+        raise PoolTimeoutError("QueuePool limit reached")
+
+    try:
+        before = POOL_TIMEOUTS.value()
+        response = TestClient(app).get("/_pool_timeout_probe")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert POOL_TIMEOUTS.value() == before + 1
+    finally:
+        app.router.routes = [r for r in app.router.routes if getattr(r, "path", "") != "/_pool_timeout_probe"]
+
+
+def test_cors_lets_the_spa_send_cookies_and_read_the_marker():
+    client = TestClient(app)
+    response = client.options("/cases/", headers={"Origin": settings.cors_origins[0], "Access-Control-Request-Method": "PATCH"})
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["access-control-allow-origin"] == settings.cors_origins[0]
+    simple = client.get("/health", headers={"Origin": settings.cors_origins[0]})
+    assert PRIMARY_HEADER.lower() in simple.headers["access-control-expose-headers"].lower()
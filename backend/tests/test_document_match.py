@@ -0,0 +1,73 @@
+from datetime import date
+
+from app.rules.document_match import (
+    MATCH, MISMATCH, MISSING, UNCLEAR, canonical_dates, compare_bookings, compare_names, cross_check, match_document,
+    name_tokens,
+)
+
+CASE_DATA = {"defendant_name": "José Luis Martínez", "defendant_dob": "1985-04-03", "booking_number": "HC-000123",
+             "indemnitor_name": "Ana Martinez"}
+
+
+def test_names_ignore_case_accents_order_and_suffixes():
+    assert name_tokens("MARTINEZ, JOSE L. JR.") == ["jose", "l", "martinez"]
+    assert compare_names("José Luis Martínez", "MARTINEZ, JOSE L.") == 0.95
+    assert compare_names("John Doe", "John Andrew Doe") == 1.0
+    assert compare_names("Jonathan Smith", "Jonathon Smith") >= 0.9  # One misread letter
+    assert compare_names("John Doe", "Jane Roe") < 0.75
+    assert compare_names("John Doe", "") == 0.0
+
+
+def test_dates_read_in_every_printed_format():
+    assert canonical_dates("04/03/1985") == [date(1985, 4, 3), date(1985, 3, 4)]  # Ambiguous order keeps both
+    assert canonical_dates("1985-04-03") == [date(1985, 4, 3)]
+    assert canonical_dates("April 3, 1985") == [date(1985, 4, 3)]
+    assert canonical_dates("04/03/85") == [date(1985, 4, 3)]
+    assert canonical_dates("unreadable") == []
+
+
+def test_bookings_ignore_punctuation_and_padding():
+    assert compare_bookings("HC-000123", "hc 000123") == 1.0
+    assert compare_bookings("HC-000123", "HC-123") == 0.95
+    assert compare_bookings("HC-000123", "123") == 0.85
+    assert compare_bookings("HC-000123", "HC-124") == 0.0
+
+
+def test_booking_sheet_fields():
+    result = match_document({"Full Name": "MARTINEZ, JOSE L.", "DOB": "04/03/1985", "Booking No": "HC-123"},
+                            CASE_DATA, "booking_sheet")
+    assert result.match_status == MATCH and result.mismatches == []
+    fields = {f.field: f for f in result.fields}
+    assert fields["defendant_dob"].confidence == 0.9  # Matched, but the printed date was ambiguous
+    assert fields["booking_number"].status == MATCH
+
+    wrong = match_document({"name": "Jose Martinez", "date_of_birth": "1985-05-03"}, CASE_DATA, "booking_sheet")
+    assert wrong.match_status == MISMATCH
+    assert wrong.mismatches == ["defendant_dob: document says '1985-05-03', case has '1985-04-03'"]
+    assert {f.field: f.status for f in wrong.fields}["booking_number"] == MISSING
+
+
+def test_status_per_document_type():
+    assert match_document({"name": "Ana Martinez"}, CASE_DATA, "indemnitor_id").match_status == MATCH
+    assert match_document({"name": "Jose Martinez", "dob": "not legible"}, CASE_DATA, "gov_id").match_status == UNCLEAR
+    # Nothing to cross-check: a readable document matches, an empty read doesn't
+    assert match_document({"owner": "Ana Martinez"}, CASE_DATA, "collateral_doc").match_status == MATCH
+    assert match_document({}, CASE_DATA, "collateral_doc").match_status == UNCLEAR
+    # Facts the case doesn't have yet are skipped
+    assert [f.field for f in match_document({"name": "Jose Martinez"}, {"defendant_name": "Jose Martinez"}, "gov_id").fields] == ["defendant_name"]
+
+
+def test_cross_check_flags_documents_that_disagree_about_the_defendant():
+    issues = cross_check({
+        "booking_sheet": {"full_name": "MARTINEZ, JOSE L.", "date_of_birth": "04/03/1985"},
+        "gov_id": {"full_name": "Jose Luis Martinez", "date_of_birth": "1985-04-03"},
+        "defendant_id": {"full_name": "Pedro Alvarez", "date_of_birth": "1979-11-30"},
+        "collateral_doc": {"owner": "Ana Martinez"},
+    })
+    assert issues["collateral_doc"] == []
+    assert len(issues["defendant_id"]) == 4  # Name and date of birth, against each of the other two
+    assert issues["booking_sheet"] == [
+        "name: booking_sheet says 'MARTINEZ, JOSE L.', defendant_id says 'Pedro Alvarez'",
+        "date of birth: booking_sheet says '04/03/1985', defendant_id says '1979-11-30'",
+    ]
+    assert cross_check({"booking_sheet": {"name": "Jose Martinez"}, "gov_id": {"name": "José Martínez"}})["gov_id"] == []
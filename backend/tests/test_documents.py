@@ -0,0 +1,209 @@
+import hashlib
+import io
+import os
+from unittest.mock import patch
+
+from PIL import Image
+
+from app.models.case import Case
+from app.models.document import Document
+from app.services.document_service import document_service
+from app.services import renditions
+from app.services.renditions import RENDITIONS, RenditionCache
+from app.services.verification_queue import verification_queue
+from app.utils import create_access_token
+
+TOKEN = create_access_token({"sub": "uw@example.com", "role": "UW", "user_id": "uw-1"})
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+
+def _auth(role, user_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': f'{user_id}@example.com', 'role': role, 'user_id': user_id})}"}
+
+EXTRACTION = {"is_valid_document": True, "document_type_detected": "id_card", "extracted_data": {}, "confidence_score": 90}
+
+CASE = {
+    "defendant_first_name": "Serve", "defendant_last_name": "Documents",
+    "jail_facility": "Jail", "county": "Harris", "state_jurisdiction": "TX",
+    "bond_amount": 5000, "bond_type": "SURETY", "charge_severity": "MISDEMEANOR",
+    "caller_name": "Caller", "caller_relationship": "Friend", "caller_phone": "123",
+    "intent_signal": "UNSURE"
+}
+
+
+def _png(width=2000, height=1200) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+
+def _upload(client, data, content_type="image/png", filename="photo.png"):
+    with patch("app.api.cases.orchestrator_app.invoke", return_value={"current_state": "INTAKE"}):
+        case_id = client.post("/cases/", json=CASE).json()["id"]
+    with patch("app.services.verification_service.doc_verify_agent.extract", return_value=dict(EXTRACTION)):
+        body = client.post(f"/cases/{case_id}/documents?document_type=defendant_id",
+                           files={"file": (filename, io.BytesIO(data), content_type)}).json()
+        verification_queue.run_pending()
+    return body["id"]
+
+
+def test_documents_require_a_signed_in_user(client):
+    document_id = _upload(client, _png(40, 30))
+    assert client.get(f"/documents/{document_id}").status_code == 401
+    # The session token never goes in a URL
+    assert client.get(f"/documents/{document_id}?access_token={TOKEN}").status_code == 401
+    assert client.get(f"/documents/{document_id}?token={TOKEN}").status_code == 401
+
+    # <img> tags and new tabs can't send headers: they get a short-lived link for one document
+    link = client.post(f"/documents/{document_id}/link", headers=AUTH).json()
+    assert link["url"].startswith(f"/documents/{document_id}?token=")
+    response = client.get(link["url"])
+    assert response.status_code == 200
+    assert response.headers["referrer-policy"] == "no-referrer"
+    assert client.get(link["url"] + "&rendition=thumbnail").status_code == 200
+
+    token = link["url"].split("token=")[1]
+    other = _upload(client, b"\x89PNG other")
+    assert client.get(f"/documents/{other}?token={token}").status_code == 401
+    assert client.post(f"/documents/{other}/link", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    assert client.post(f"/documents/{document_id}/link").status_code == 401
+
+
+def test_document_links_expire(client, monkeypatch):
+    document_id = _upload(client, b"\x89PNG private")
+    monkeypatch.setattr("app.api.documents.settings.document_link_seconds", -1)
+    url = client.post(f"/documents/{document_id}/link", headers=AUTH).json()["url"]
+    assert client.get(url).status_code == 401
+
+
+def test_documents_are_served_only_to_users_with_case_access(client, db_session):
+    document_id = _upload(client, b"\x89PNG private")
+    case = db_session.get(Case, db_session.get(Document, document_id).case_id)
+    producer, other_producer = _auth("PRODUCER", "advisor-1"), _auth("PRODUCER", "advisor-2")
+
+    # Unassigned cases are open to all staff
+    assert client.get(f"/documents/{document_id}", headers=other_producer).status_code == 200
+    stale_link = client.post(f"/documents/{document_id}/link", headers=other_producer).json()["url"]
+
+    case.advisor_id = "advisor-1"
+    db_session.commit()
+    assert client.get(f"/documents/{document_id}", headers=producer).status_code == 200
+    assert client.get(f"/documents/{document_id}", headers=AUTH).status_code == 200  # Underwriters see every case
+    assert client.get(f"/documents/{document_id}", headers=other_producer).status_code == 403
+    assert client.post(f"/documents/{document_id}/link", headers=other_producer).status_code == 403
+    # Access is checked again when a link is used
+    assert client.get(stale_link).status_code == 403
+
+
+def test_strong_etag_and_long_lived_cache_headers(client):
+    data = b"\x89PNG" + b"body" * 1000
+    document_id = _upload(client, data)
+
+    response = client.get(f"/documents/{document_id}", headers=AUTH)
+    etag = response.headers["etag"]
+    assert not etag.startswith("W/")
+    assert etag == f'"{hashlib.sha256(data).hexdigest()}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["cache-control"].startswith("private")
+
+    revalidated = client.get(f"/documents/{document_id}", headers={**AUTH, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+def test_non_ascii_filenames_are_encoded_in_content_disposition(client):
+    document_id = _upload(client, _png(40, 30), filename="身份证 scan.png")
+
+    response = client.get(f"/documents/{document_id}", headers=AUTH)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == (
+        "inline; filename=\"___scan.png\"; filename*=UTF-8''%E8%BA%AB%E4%BB%BD%E8%AF%81scan.png"
+    )
+    thumbnail = client.get(f"/documents/{document_id}?rendition=thumbnail", headers=AUTH)
+    assert thumbnail.status_code == 200
+    assert "filename*=UTF-8''thumbnail-%E8%BA%AB" in thumbnail.headers["content-disposition"]
+
+
+def test_range_requests(client):
+    data = bytes(range(256)) * 100
+    document_id = _upload(client, data, "application/pdf", "scan.pdf")
+    url = f"/documents/{document_id}"
+
+    partial = client.get(url, headers={**AUTH, "Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.content == data[100:200]
+    assert partial.headers["content-range"] == f"bytes 100-199/{len(data)}"
+
+    assert client.get(url, headers={**AUTH, "Range": "bytes=-10"}).content == data[-10:]
+    assert client.get(url, headers={**AUTH, "Range": "bytes=25000-"}).content == data[25000:]
+
+    unsatisfiable = client.get(url, headers={**AUTH, "Range": f"bytes={len(data)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(data)}"
+
+    # A stale If-Range means the client's partial copy is of other content: send it all
+    stale = client.get(url, headers={**AUTH, "Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert stale.content == data
+
+    head = client.head(url, headers=AUTH)
+    assert head.headers["content-length"] == str(len(data))
+    assert head.headers["accept-ranges"] == "bytes"
+
+
+def test_renditions_are_downscaled_and_cached(client, tmp_path, monkeypatch):
+    cache = RenditionCache(str(tmp_path), 10 * 1024 * 1024)
+    monkeypatch.setattr("app.api.documents.rendition_cache", cache)
+    document_id = _upload(client, _png())
+
+    with patch("app.services.renditions.render", wraps=renditions.render) as render:
+        first = client.get(f"/documents/{document_id}?rendition=thumbnail", headers=AUTH)
+        second = client.get(f"/documents/{document_id}?rendition=thumbnail", headers=AUTH)
+    assert first.status_code == second.status_code == 200
+    assert render.call_count == 1
+    assert first.content == second.content
+    assert first.headers["content-type"] == "image/jpeg"
+    assert first.headers["etag"].endswith('-thumbnail"')
+    assert max(Image.open(io.BytesIO(first.content)).size) == RENDITIONS["thumbnail"].max_side
+
+    preview = client.get(f"/documents/{document_id}?rendition=preview", headers=AUTH)
+    assert max(Image.open(io.BytesIO(preview.content)).size) == RENDITIONS["preview"].max_side
+    assert client.get(f"/documents/{document_id}?rendition=huge", headers=AUTH).status_code == 400
+
+
+def test_pdf_has_no_rendition(client):
+    document_id = _upload(client, b"%PDF-1.4 not an image", "application/pdf", "scan.pdf")
+    assert client.get(f"/documents/{document_id}?rendition=thumbnail", headers=AUTH).status_code == 415
+
+
+def test_rendition_cache_evicts_least_recently_served(tmp_path):
+    thumbnail = RENDITIONS["thumbnail"]
+    cache = RenditionCache(str(tmp_path), max_bytes=250)
+    cache.put("a" * 64, thumbnail, b"a" * 100)
+    cache.put("b" * 64, thumbnail, b"b" * 100)
+    os.utime(cache.path("b" * 64, thumbnail), (1, 1))  # b served long ago
+    assert cache.get("a" * 64, thumbnail) == b"a" * 100
+
+    cache.put("c" * 64, thumbnail, b"c" * 100)
+    assert cache.get("b" * 64, thumbnail) is None
+    assert cache.get("a" * 64, thumbnail) is not None
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.jpg")) <= 250
+
+    # A new process picks up what's already on disk
+    assert RenditionCache(str(tmp_path), 250).get("c" * 64, thumbnail) == b"c" * 100
+
+
+def test_import_static_uploads(client, db_session, tmp_path):
+    with patch("app.api.cases.orchestrator_app.invoke", return_value={"current_state": "INTAKE"}):
+        case_id = client.post("/cases/", json=CASE).json()["id"]
+    (tmp_path / f"{case_id}_booking_sheet_sheet.png").write_bytes(b"\x89PNG legacy")
+    case = db_session.get(Case, case_id)
+    case.booking_sheet_url = f"http://api.example.com/static/{case_id}_booking_sheet_sheet.png"
+    db_session.commit()
+
+    assert document_service.import_static_uploads(db_session, str(tmp_path)) == 1
+    assert document_service.import_static_uploads(db_session, str(tmp_path)) == 0
+    document = db_session.query(Document).one()
+    assert document.filename == "sheet.png"
+    assert db_session.get(Case, case_id).booking_sheet_url == f"http://api.example.com/documents/{document.id}"
+    assert client.get(f"/documents/{document.id}", headers=AUTH).content == b"\x89PNG legacy"
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from email import message_from_bytes
+import time
+
+import pytest
+
+from app.models.email import OutboundEmail
+from app.services.email_outbox import EmailOutbox, SMTPPool, email_outbox
+from app.services.email_service import EmailService
+from app.services.fake_smtp import FakeSMTPServer
+from tests.test_async_db import make_case
+
+
+@pytest.fixture
+def smtp():
+    server = FakeSMTPServer(username="relay-user", password="relay-pass").start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def outbox(smtp):
+    pool = SMTPPool(smtp.host, smtp.port, user="relay-user", password="relay-pass", size=1, timeout=5)
+    outbox = EmailOutbox(pool, session_factory=email_outbox.session_factory, workers=0, batch_size=2,
+                         max_attempts=3, retry_seconds=60, sender="noreply@bondpath.com")
+    yield outbox
+    outbox.stop()
+
+
+def _queue(db_session, count=1, to="client@example.com"):
+    emails = [EmailService.signature_request(to, None, f"Defendant {i}", 5000, "Advisor", f"http://app/signature/{i}")
+              for i in range(count)]
+    db_session.add_all(emails)
+    db_session.commit()
+    return [email.id for email in emails]
+
+
+def _email(db_session, email_id) -> OutboundEmail:
+    db_session.expire_all()
+    return db_session.get(OutboundEmail, email_id)
+
+
+def test_queued_emails_are_sent_in_batches_over_one_login(db_session, smtp, outbox):
+    ids = _queue(db_session, count=5)
+    assert outbox.run_pending() == 5
+
+    assert len(smtp.messages) == 5
+    assert smtp.connections == 1 and smtp.logins == 1  # Three batches, one authenticated connection
+    message = message_from_bytes(smtp.messages[0].data)
+    assert message["Subject"] == "Bail Bond Agreement - Defendant 0"
+    assert message["From"] == "noreply@bondpath.com" and smtp.messages[0].recipients == ["client@example.com"]
+
+    email = _email(db_session, ids[0])
+    assert email.status == "SENT" and email.attempts == 1 and email.sent_at is not None
+    assert message["Message-ID"] == email.message_id
+
+    # The pooled connection is reused by later sends
+    _queue(db_session)
+    outbox.run_pending()
+    assert smtp.connections == 1 and len(smtp.messages) == 6
+
+
+def test_a_dropped_connection_is_replaced(db_session, smtp, outbox):
+    _queue(db_session)
+    outbox.run_pending()
+    smtp.drop_connections()  # The relay closed the idle connection
+
+    email_id = _queue(db_session)[0]
+    outbox.run_pending()
+    assert _email(db_session, email_id).status == "SENT"
+    assert smtp.connections == 2 and len(smtp.messages) == 2
+
+
+def test_transient_failures_back_off_and_retry(db_session, smtp, outbox):
+    email_id = _queue(db_session)[0]
+    smtp.fail("rcpt", 451, "Try again later", times=2)
+
+    outbox.run_pending()
+    email = _email(db_session, email_id)
+    assert email.status == "QUEUED" and email.attempts == 1 and "451" in email.last_error
+    first_retry = email.next_attempt_at
+    assert outbox.run_pending() == 0  # Not due yet
+
+    outbox.run_pending(now=first_retry)
+    email = _email(db_session, email_id)
+    assert email.attempts == 2
+    assert email.next_attempt_at - first_retry >= timedelta(seconds=115)  # Doubled: 60 s, then 120 s
+
+    outbox.run_pending(now=email.next_attempt_at)
+    email = _email(db_session, email_id)
+    assert email.status == "SENT" and email.attempts == 3 and email.last_error is None
+    assert len(smtp.messages) == 1
+
+
+def test_permanent_rejections_and_the_last_attempt_fail(db_session, smtp, outbox):
+    ids = _queue(db_session, count=2)
+    smtp.fail("rcpt", 550, "No such user")
+    outbox.run_pending()
+    emails = sorted((_email(db_session, email_id) for email_id in ids), key=lambda email: email.status)
+    assert [(email.status, email.attempts) for email in emails] == [("FAILED", 1), ("SENT", 1)]
+    assert "550" in emails[0].last_error
+    assert len(smtp.messages) == 1  # The same session carried on after the rejection
+
+    flaky = _queue(db_session)[0]
+    smtp.fail("data", 421, "Busy", times=3)
+    later = datetime.utcnow()
+    for _ in range(3):
+        later += timedelta(hours=1)
+        outbox.run_pending(now=later)
+    email = _email(db_session, flaky)
+    assert email.status == "FAILED" and email.attempts == 3
+
+
+def test_unreachable_relay_keeps_mail_queued(db_session, smtp):
+    pool = SMTPPool(smtp.host, smtp.port, user="relay-user", password="wrong", timeout=5)
+    outbox = EmailOutbox(pool, session_factory=email_outbox.session_factory, workers=0, retry_seconds=1)
+    email_id = _queue(db_session)[0]
+    outbox.run_pending()
+    email = _email(db_session, email_id)
+    assert email.status == "QUEUED" and "Authentication" in email.last_error
+
+
+def test_emails_left_sending_by_a_dead_worker_are_picked_up_after_the_lease(db_session, smtp, outbox):
+    email_id = _queue(db_session)[0]
+    email = _email(db_session, email_id)
+    email.status, email.next_attempt_at = "SENDING", datetime.utcnow() + timedelta(seconds=300)
+    db_session.commit()
+
+    assert outbox.run_pending() == 0
+    outbox.run_pending(now=datetime.utcnow() + timedelta(seconds=301))
+    assert _email(db_session, email_id).status == "SENT"
+
+
+def test_worker_sends_as_soon_as_it_is_notified(db_session, smtp):
+    pool = SMTPPool(smtp.host, smtp.port, user="relay-user", password="relay-pass", timeout=5)
+    outbox = EmailOutbox(pool, session_factory=email_outbox.session_factory, workers=1, poll_seconds=30)
+    outbox.start()
+    try:
+        email_id = _queue(db_session)[0]
+        outbox.notify()
+        for _ in range(100):
+            if _email(db_session, email_id).status == "SENT":
+                break
+            time.sleep(0.05)
+        assert _email(db_session, email_id).status == "SENT"
+    finally:
+        outbox.stop()
+
+
+def test_delivery_status_is_listed_per_case(client, db_session):
+    make_case(db_session)
+    response = client.post("/signature/cases/async-case/send-remote-signature", json={"email": "client@example.com"})
+    statuses = client.get("/signature/cases/async-case/emails").json()
+    assert [(s["id"], s["status"], s["attempts"]) for s in statuses] == [(response.json()["email_id"], "QUEUED", 0)]
@@ -0,0 +1,83 @@
+import copy
+
+import pytest
+
+from app.agents.intake import IntakeOutput
+from app.agents.prompts import PromptRegistry, PromptTemplate
+from app.agents.providers import LLMRequest, SchemaValidationError
+from app.config import settings
+from app.evals.harness import FIXTURES_DIR, drift, load_fixtures, regressions, run_corpus, summarise
+from app.evals.replay import RecordingMissing, ReplayProvider, load_recordings
+
+
+@pytest.fixture
+def corpus(monkeypatch):
+    monkeypatch.setattr(settings, "trace_to_db", False)
+    return load_fixtures(), load_recordings(FIXTURES_DIR / "recordings.json")
+
+
+def request(prompt, tier="small"):
+    return LLMRequest(messages=[{"role": "user", "content": "notes"}], response_format=IntakeOutput, prompt=prompt, tier=tier)
+
+
+def test_replay_prefers_tier_specific_recordings_and_validates_schema():
+    provider = ReplayProvider({
+        "f": {
+            "intake@v1": {"response": {"bad": True}},
+            "intake@v1/large": {"response": {
+                "defendant": {"name": "A"}, "indemnitor": {"name": "B", "relationship": "C"},
+                "bond_amount": 1, "confidence_score": 0.9,
+            }},
+        },
+    }, latency_scale=0)
+    provider.fixture = "f"
+
+    assert provider.complete(request("intake@v1", tier="large")).data["confidence_score"] == 0.9
+    with pytest.raises(SchemaValidationError):
+        provider.complete(request("intake@v1"))
+    with pytest.raises(RecordingMissing):
+        provider.complete(request("intake@v2"))
+    assert [c.outcome for c in provider.calls] == ["ok", "schema_error", "missing"]
+
+
+def test_corpus_report_covers_every_agent(corpus):
+    fixtures, recordings = corpus
+    report = summarise(run_corpus(fixtures, ReplayProvider(recordings, latency_scale=0)))
+
+    assert set(report["agents"]) == {"IntakeAgent", "RiskAgent", "ReadinessAgent", "DocVerifyAgent"}
+    readiness = report["agents"]["ReadinessAgent"]
+    assert readiness["prompt"] == "readiness@v1"
+    assert readiness["schema_failures"] == 1
+    assert readiness["failures"] == 0
+    assert report["agents"]["RiskAgent"]["prompt_tokens"]["mean"] > 0
+    assert report["outputs"]["out-of-state-felony-friend"]["RiskAgent"]["risk_tier"] == "High Risk"
+    assert regressions(report, max_schema_failure_rate=0.2) == []
+
+
+def test_missing_recordings_and_drift_are_reported(corpus):
+    fixtures, recordings = corpus
+    baseline = summarise(run_corpus(fixtures, ReplayProvider(recordings, latency_scale=0)))
+
+    changed = copy.deepcopy(recordings)
+    changed["local-misdemeanor-parent"]["risk@v1"]["response"].update(risk_score=55, risk_tier="Medium Risk")
+    del changed["missing-basics"]["risk@v1"]
+    candidate = summarise(run_corpus(fixtures, ReplayProvider(changed, latency_scale=0)))
+    candidate["drift"] = drift(baseline, candidate)
+
+    risk = candidate["drift"]["RiskAgent"]
+    assert risk["compared"] == 3
+    assert risk["max_abs_score_delta"] == 33
+    assert risk["label_changes"] == [{"fixture": "local-misdemeanor-parent", "before": "Low Risk", "after": "Medium Risk"}]
+    problems = regressions(candidate, max_schema_failure_rate=0.2, max_abs_score_delta=10)
+    assert any("no recording for risk@v1" in p for p in problems)
+    assert any("RiskAgent: score moved" in p for p in problems)
+
+
+def test_pinned_to_is_temporary():
+    registry = PromptRegistry(pinned={"risk": 1})
+    registry.register(PromptTemplate("risk", 1, system="v1"))
+    registry.register(PromptTemplate("risk", 2, system="v2"))
+
+    with registry.pinned_to({"risk": 2}):
+        assert registry.get("risk").id == "risk@v2"
+    assert registry.get("risk").id == "risk@v1"
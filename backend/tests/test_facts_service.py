@@ -0,0 +1,77 @@
+from app.models.case import Case
+from app.services.facts_service import FACTS_CACHE, VIEWS, FactsService
+
+
+def make_case(db_session, case_id="facts-case", **overrides):
+    values = dict(
+        id=case_id, state="QUALIFIED", defendant_first_name="John", defendant_last_name="Doe",
+        jail_facility="Harris County Jail", county="Harris", state_jurisdiction="TX", bond_amount=5000,
+        bond_type="SURETY", charge_severity="MISDEMEANOR", caller_name="Jane", caller_relationship="Mother",
+        caller_phone="555-0100", intent_signal="GET_OUT_TODAY", fast_flags=[],
+    )
+    values.update(overrides)
+    case = Case(**values)
+    db_session.add(case)
+    db_session.commit()
+    return case
+
+
+def test_version_increments_only_on_real_changes(db_session):
+    case = make_case(db_session)
+    assert case.version == 1
+
+    case.charges = "Theft"
+    db_session.commit()
+    assert case.version == 2
+
+    db_session.commit()
+    assert case.version == 2
+
+
+def test_presence_columns_are_selected_as_flags_not_blobs():
+    sql = str(VIEWS["readiness"].statement)
+    assert "cases.terms_signature IS NOT NULL" in sql
+    assert "cases.terms_signature," not in sql
+    assert "derived_facts" not in sql
+
+
+def test_views_are_memoised_per_version(db_session):
+    service = FactsService()
+    case = make_case(db_session, terms_signature="data:image/png;base64,AAAA", booking_sheet_url="http://x/booking.png")
+    misses = FACTS_CACHE.value(view="readiness", result="miss")
+
+    facts = service.get(db_session, "facts-case", "readiness")
+    assert facts["terms_signature"] is True
+    assert facts["indemnitor_signature"] is False
+    assert facts["booking_sheet_url"] is True
+    assert facts["bond_amount"] == 5000.0
+
+    facts["bond_amount"] = 1  # Callers get their own copy
+    assert service.get(db_session, "facts-case", "readiness")["bond_amount"] == 5000.0
+    assert FACTS_CACHE.value(view="readiness", result="miss") == misses + 1
+
+    case.bond_amount = 7500
+    db_session.commit()
+    assert service.get(db_session, "facts-case", "readiness")["bond_amount"] == 7500.0
+    assert FACTS_CACHE.value(view="readiness", result="miss") == misses + 2
+
+    assert service.get(db_session, "missing-case", "readiness") is None
+
+
+def test_risk_view_matches_fields_used_by_the_risk_agent(db_session):
+    case = make_case(db_session, defendant_id_url="http://x/id.png", down_payment_amount=None)
+    facts = FactsService().project(case, "risk")
+
+    assert facts["defendant_name"] == "John Doe"
+    assert facts["has_defendant_id"] is True
+    assert facts["has_booking_sheet"] is False
+    assert facts["down_payment_amount"] == 0
+
+
+def test_project_sees_unflushed_changes(db_session):
+    service = FactsService()
+    case = make_case(db_session)
+    assert service.project(case, "intake")["bond_amount"] == 5000
+
+    case.bond_amount = 9000
+    assert service.project(case, "intake")["bond_amount"] == 9000
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from app.agents.limiter import (
+    LLMRateLimiter, Priority, QueueFullError, RateLimitTimeout, TokenBucket,
+    QUEUE_DEPTH, current_priority, priority_scope
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_second=10, capacity=10, clock=clock)
+    bucket.consume(10)
+    assert bucket.wait_time(5) == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.wait_time(5) == 0
+
+    # Oversized requests wait for a full bucket instead of never running
+    assert bucket.wait_time(50) == pytest.approx(0.5)
+
+
+def test_settle_refunds_overestimated_tokens():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(requests_per_minute=600, tokens_per_minute=6000, burst_seconds=1, clock=clock)
+    limiter.acquire(tokens=100, timeout=0)
+    assert limiter.tokens.tokens == 0
+
+    limiter.settle(estimated_tokens=100, actual_tokens=40)
+    assert limiter.tokens.tokens == 60
+
+
+def test_interactive_calls_jump_the_queue():
+    # One request per 0.1s, bucket already drained
+    limiter = LLMRateLimiter(requests_per_minute=600, tokens_per_minute=10**9, burst_seconds=0.1)
+    limiter.acquire(Priority.BATCH)
+
+    order = []
+
+    def call(priority):
+        limiter.acquire(priority, timeout=5)
+        order.append(priority)
+
+    batch = threading.Thread(target=call, args=(Priority.BATCH,))
+    batch.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=call, args=(Priority.INTERACTIVE,))
+    interactive.start()
+    batch.join()
+    interactive.join()
+
+    assert order == [Priority.INTERACTIVE, Priority.BATCH]
+
+
+def test_deadline_and_queue_bounds():
+    limiter = LLMRateLimiter(requests_per_minute=1, tokens_per_minute=10**9, max_queue_depth=1)
+    limiter.acquire(Priority.STANDARD)
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(Priority.STANDARD, timeout=0.05)
+
+    waiter = threading.Thread(target=lambda: pytest.raises(RateLimitTimeout, limiter.acquire, Priority.BATCH, 0, 0.3))
+    waiter.start()
+    time.sleep(0.05)
+    assert limiter.queue_depth(Priority.BATCH) == 1
+    assert QUEUE_DEPTH.value(priority="BATCH") == 1
+    with pytest.raises(QueueFullError):
+        limiter.acquire(Priority.BATCH, timeout=1)
+    waiter.join()
+    assert limiter.queue_depth(Priority.BATCH) == 0
+
+
+def test_priority_scope_is_restored():
+    assert current_priority() == Priority.STANDARD
+    with priority_scope(Priority.INTERACTIVE):
+        assert current_priority() == Priority.INTERACTIVE
+    assert current_priority() == Priority.STANDARD
+
+
+def test_chat_waits_for_the_limiter_off_the_event_loop(client, monkeypatch):
+    from app.agents.chat import chat_agent
+    from app.api.auth import get_current_user
+    from app.main import app
+
+    seen = {}
+
+    def run(**kwargs):
+        seen["thread"], seen["priority"] = threading.current_thread(), current_priority()
+        return {"response": "ok", "suggested_actions": []}
+
+    monkeypatch.setattr(chat_agent, "run", run)
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "agent@example.com", "role": "AGENT"}
+    assert client.post("/chat/message", json={"message": "Hello"}).status_code == 200
+    assert seen["priority"] == Priority.INTERACTIVE
+    assert seen["thread"] is not threading.main_thread() and "AnyIO worker thread" in seen["thread"].name
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+from openai import OpenAI
+
+from app.agents.chat import ActionSplitter
+from app.agents.doc_verify import DocVerificationOutput
+from app.agents.intake import IntakeOutput
+from app.agents.providers import LLMRequest, OpenAIProvider
+from app.agents.readiness import ReadinessOutput
+from app.agents.risk import RiskAssessmentSchema
+from app.loadtest.fake_llm import create_app, example_from_schema
+from app.loadtest.runner import run_load
+
+
+def fake_openai_provider():
+    client = OpenAI(api_key="test", base_url="http://testserver/v1",
+                    http_client=TestClient(create_app(latency_ms=0, stream_chunk_ms=0)))
+    return OpenAIProvider(client=client)
+
+
+def test_schema_examples_validate_and_clear_escalation_thresholds():
+    for schema in (IntakeOutput, RiskAssessmentSchema, ReadinessOutput, DocVerificationOutput):
+        schema.model_validate(example_from_schema(schema.model_json_schema()))
+    assert example_from_schema(IntakeOutput.model_json_schema())["confidence_score"] >= 0.7
+    assert example_from_schema(ReadinessOutput.model_json_schema())["confidence_score"] >= 60
+
+
+def test_openai_provider_parses_fake_structured_output():
+    request = LLMRequest(messages=[{"role": "user", "content": "Case facts: {}"}], response_format=RiskAssessmentSchema, model="gpt-4o")
+    response = fake_openai_provider().complete(request)
+
+    assert response.data["risk_score"] == 75
+    assert response.usage.prompt_tokens > 0
+
+
+def test_fake_stream_carries_actions_and_usage():
+    stream = fake_openai_provider().stream(LLMRequest(messages=[{"role": "user", "content": "hi"}], model="gpt-4o-mini"))
+    splitter = ActionSplitter()
+    text = "".join(splitter.feed(delta) for delta in stream)
+    rest, actions = splitter.finish()
+
+    assert "simulated copilot answer" in text + rest
+    assert actions == ["View Case", "Draft Email"]
+    assert stream.usage.completion_tokens > 0
+
+
+def test_run_load_reports_per_route_latency():
+    created = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST" and request.url.path == "/cases/":
+            created.append(json.loads(request.content))
+            return httpx.Response(200, json={"id": f"case-{len(created)}"})
+        if request.url.path == "/chat/message":
+            return httpx.Response(200 if request.headers.get("authorization") == "Bearer t" else 401, json={})
+        return httpx.Response(200, json={})
+
+    report = asyncio.run(run_load("http://api", users=3, duration=0.2, token="t", transport=httpx.MockTransport(handler)))
+
+    assert report["errors"] == 0
+    assert report["requests"] == sum(r["requests"] for r in report["routes"].values())
+    assert {"GET /cases/", "POST /cases/"} <= set(report["routes"])
+    assert all(r["p50_ms"] <= r["p95_ms"] <= r["max_ms"] for r in report["routes"].values())
@@ -0,0 +1,73 @@
+import io
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.telemetry.db import instrument_engine, SLOW_QUERIES, POOL_CHECKED_OUT
+from app.telemetry.http import REQUEST_DURATION
+from app.telemetry.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    reg = MetricsRegistry()
+    calls = reg.counter("demo_calls", "Demo calls", ["agent"])
+    latency = reg.histogram("demo_latency_seconds", "Demo latency", buckets=(0.1, 1.0))
+    calls.inc(agent="risk")
+    calls.inc(2, agent="risk")
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    body = reg.render()
+    assert "# TYPE demo_calls counter" in body
+    assert 'demo_calls_total{agent="risk"} 3' in body
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1' in body
+    assert 'demo_latency_seconds_bucket{le="1.0"} 2' in body
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 2' in body
+    assert "demo_latency_seconds_count 2" in body
+
+
+def test_request_latency_is_labelled_by_route_template(client):
+    before = REQUEST_DURATION.count(method="GET", route="/cases/{case_id}")
+    client.get("/cases/does-not-exist")
+    client.get("/cases/another-missing-id")
+    assert REQUEST_DURATION.count(method="GET", route="/cases/{case_id}") == before + 2
+
+    body = client.get("/metrics").text
+    assert 'route="/cases/{case_id}",status="404"' in body
+    assert "bondpath_http_requests_in_flight" in body
+    assert "bondpath_threadpool_size" in body
+
+
+def test_slow_queries_and_pool_gauges(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, name="test")
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        from app.telemetry.metrics import registry
+        registry.render()
+        assert POOL_CHECKED_OUT.value(engine="test") == 1
+
+    assert SLOW_QUERIES.value(engine="test", statement="SELECT") >= 1
+
+
+def test_upload_records_file_size(client):
+    with patch("app.api.cases.orchestrator_app.invoke", return_value={"current_state": "INTAKE"}):
+        case_id = client.post("/cases/", json={
+            "defendant_first_name": "Upload", "defendant_last_name": "Metrics",
+            "jail_facility": "Jail", "county": "Harris", "state_jurisdiction": "TX",
+            "bond_amount": 5000, "bond_type": "SURETY", "charge_severity": "MISDEMEANOR",
+            "caller_name": "Caller", "caller_relationship": "Friend", "caller_phone": "123",
+            "intent_signal": "UNSURE"
+        }).json()["id"]
+
+    client.post(
+        f"/cases/{case_id}/documents?document_type=booking_sheet",
+        files={"file": ("sheet.pdf", io.BytesIO(b"x" * 2048), "application/pdf")}
+    )
+
+    body = client.get("/metrics").text
+    assert 'bondpath_upload_bytes_total{document_type="booking_sheet"}' in body
+    assert 'bondpath_upload_file_size_bytes_bucket{document_type="booking_sheet",le="16384"}' in body
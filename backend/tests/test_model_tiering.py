@@ -0,0 +1,105 @@
+from app.agents.intake import IntakeAgent, IntakeOutput
+from app.agents.policy import ESCALATIONS, TIER_CALLS, ModelPolicy, policy_for, tiering_report
+from app.agents.providers import LLMProvider, LLMResponse, SchemaValidationError
+from app.agents.router import ProviderRouter
+
+
+def intake_result(confidence):
+    return {
+        "defendant": {"name": "John Doe", "jail": "Harris", "charges": []},
+        "indemnitor": {"name": "Jane Doe", "relationship": "Mother"},
+        "bond_amount": 5000,
+        "flags": [],
+        "confidence_score": confidence,
+    }
+
+
+class TieredProvider(LLMProvider):
+    """Answers per requested model; a value that is an exception is raised instead."""
+
+    name = "fake"
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.models = []
+
+    def complete(self, request):
+        self.models.append(request.model)
+        answer = self.answers[request.model]
+        if isinstance(answer, Exception):
+            raise answer
+        return LLMResponse(data=answer, provider=self.name, model=request.model)
+
+
+POLICY = ModelPolicy(small_model="small-m", large_model="large-m", confidence_field="confidence_score", min_confidence=0.7,
+                     confidence_scale=1)
+
+
+def make_agent(answers):
+    provider = TieredProvider(answers)
+    return IntakeAgent(router=ProviderRouter([provider], hedge=False), policy=POLICY), provider
+
+
+def test_confident_small_answer_is_not_escalated():
+    agent, provider = make_agent({"small-m": intake_result(0.95), "large-m": intake_result(0.99)})
+    before = TIER_CALLS.value(agent="IntakeAgent", tier="small")
+
+    result = agent.run({"raw_text": "John Doe in Harris, bond 5000"})
+
+    assert result["confidence_score"] == 0.95
+    assert provider.models == ["small-m"]
+    assert TIER_CALLS.value(agent="IntakeAgent", tier="small") == before + 1
+
+
+def test_low_confidence_escalates_to_large_model():
+    agent, provider = make_agent({"small-m": intake_result(0.4), "large-m": intake_result(0.9)})
+    before = ESCALATIONS.value(agent="IntakeAgent", reason="low_confidence")
+
+    result = agent.run({"raw_text": "hard to read notes"})
+
+    assert result["confidence_score"] == 0.9
+    assert provider.models == ["small-m", "large-m"]
+    assert ESCALATIONS.value(agent="IntakeAgent", reason="low_confidence") == before + 1
+
+
+def test_intake_confidence_on_a_percentage_scale_is_normalised():
+    # 40 on a 0-100 scale is 0.4: below the 0.7 threshold, so it escalates
+    agent, provider = make_agent({"small-m": intake_result(40), "large-m": intake_result(0.9)})
+    agent.run({"raw_text": "hard to read notes"})
+    assert provider.models == ["small-m", "large-m"]
+
+    agent, provider = make_agent({"small-m": intake_result(85), "large-m": intake_result(0.9)})
+    agent.run({"raw_text": "John Doe in Harris, bond 5000"})
+    assert provider.models == ["small-m"]
+
+    assert IntakeOutput.model_validate(intake_result(85)).confidence_score == 0.85
+    assert IntakeOutput.model_validate(intake_result(-3)).confidence_score == 0.0
+    assert "1.0" in IntakeOutput.model_json_schema()["properties"]["confidence_score"]["description"]
+
+
+def test_schema_failure_escalates_without_tripping_failover():
+    agent, provider = make_agent({
+        "small-m": SchemaValidationError("fake", "missing bond_amount"),
+        "large-m": intake_result(0.9),
+    })
+    before = ESCALATIONS.value(agent="IntakeAgent", reason="schema")
+
+    assert agent.run({"raw_text": "notes"})["bond_amount"] == 5000
+    assert provider.models == ["small-m", "large-m"]
+    assert ESCALATIONS.value(agent="IntakeAgent", reason="schema") == before + 1
+    # A schema miss says nothing about provider health
+    assert agent.router.stats["fake"].error_rate() == 0
+
+
+def test_policies_and_report(monkeypatch):
+    from app.agents import policy as policy_module
+
+    assert not policy_for("RiskAgent", "gpt-4o").cascades
+    assert policy_for("IntakeAgent", "gpt-4o").cascades
+
+    monkeypatch.setattr(policy_module.settings, "llm_tiering_enabled", False)
+    assert not policy_for("IntakeAgent", "gpt-4o").cascades
+
+    report = tiering_report()
+    assert set(report) >= {"IntakeAgent", "RiskAgent", "ChatAgent"}
+    assert "escalation_rate" in report["IntakeAgent"]
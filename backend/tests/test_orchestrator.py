@@ -4,8 +4,9 @@ from app.orchestrator.graph import app
 from app.orchestrator.state import CaseState
 
 class TestOrchestrator(unittest.TestCase):
+    @patch('app.orchestrator.nodes.explanation_agent')
     @patch('app.orchestrator.nodes.intake_agent')
-    def test_intake_flow_success(self, mock_intake_agent):
+    def test_intake_flow_success(self, mock_intake_agent, mock_explanation_agent):
         # Mock agent output
         mock_intake_agent.run.return_value = {
             "defendant": {"name": "John", "jail": "Harris County Jail"},
@@ -34,8 +35,9 @@ class TestOrchestrator(unittest.TestCase):
         self.assertIn("Transition: INTAKE -> QUALIFIED", final_state['history'])
         self.assertEqual(final_state['facts']['bond_amount'], 10000.0)
 
+    @patch('app.orchestrator.nodes.explanation_agent')
     @patch('app.orchestrator.nodes.intake_agent')
-    def test_intake_flow_blocked(self, mock_intake_agent):
+    def test_intake_flow_blocked(self, mock_intake_agent, mock_explanation_agent):
         # Mock agent output with invalid bond
         mock_intake_agent.run.return_value = {
             "defendant": {"name": "John", "jail": "Harris County Jail"},
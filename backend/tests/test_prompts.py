@@ -0,0 +1,75 @@
+from string import Formatter
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.prompts import PromptRegistry, PromptTemplate, prompt_registry
+from app.agents.providers import LLMProvider, LLMResponse
+from app.agents.risk import risk_agent
+from app.agents.router import ProviderRouter
+from app.models.trace import TraceSpan
+from app.orchestrator.nodes import risk_node
+from app.telemetry import tracing
+from tests.test_tracing import fake_openai_client, make_state, openai_router, trace_db  # noqa: F401
+
+
+class CapturingProvider(LLMProvider):
+    name = "fake"
+
+    def __init__(self):
+        self.requests = []
+
+    def complete(self, request):
+        self.requests.append(request)
+        return LLMResponse(data={}, provider=self.name, model="fake-model")
+
+
+def test_registry_returns_latest_unless_pinned():
+    registry = PromptRegistry(pinned={"pinned": 1})
+    for name in ("latest", "pinned"):
+        registry.register(PromptTemplate(name, 1, system="v1"))
+        registry.register(PromptTemplate(name, 2, system="v2"))
+
+    assert registry.get("latest").id == "latest@v2"
+    assert registry.get("pinned").id == "pinned@v1"
+    assert registry.get("latest", version=1).system == "v1"
+    with pytest.raises(ValueError):
+        registry.register(PromptTemplate("latest", 2, system="again"))
+
+
+def test_templates_render_only_into_the_user_message():
+    for name in prompt_registry.names():
+        template = prompt_registry.get(name)
+        fields = {field for _, field, _, _ in Formatter().parse(template.user) if field}
+        messages = template.messages(**{field: "<value>" for field in fields})
+        assert messages[0] == {"role": "system", "content": template.system}
+        assert "<value>" in messages[1]["content"]
+
+
+def test_static_prefix_is_identical_across_calls():
+    provider = CapturingProvider()
+    with patch.object(risk_agent, "router", ProviderRouter([provider], hedge=False)):
+        risk_agent.run({"bond_amount": 5000, "county": "Harris"})
+        risk_agent.run({"bond_amount": 90000, "county": "Dallas"})
+
+    first, second = (r.messages for r in provider.requests)
+    assert first[0] == second[0]
+    assert first[0]["role"] == "system"
+    assert "Harris" not in first[0]["content"]
+    assert first[1] != second[1]
+
+
+def test_cached_prompt_tokens_are_recorded(trace_db):
+    client = fake_openai_client({"risk_score": 20}, prompt_tokens=1500, completion_tokens=100)
+    client.beta.chat.completions.with_raw_response.parse.return_value.parse.return_value \
+        .usage.prompt_tokens_details.cached_tokens = 1024
+    with patch.object(risk_agent, "router", openai_router(client)):
+        risk_node(make_state("prompt-cache"))
+
+    span = trace_db.query(TraceSpan).filter(TraceSpan.case_id == "prompt-cache", TraceSpan.kind == "agent").one()
+    assert span.prompt == prompt_registry.get("risk").id
+    assert span.cached_prompt_tokens == 1024
+    assert span.cache_hit
+    assert span.cost_usd == pytest.approx(tracing.estimate_cost("gpt-4o", 1500, 100, cached_tokens=1024))
+    assert span.cost_usd < tracing.estimate_cost("gpt-4o", 1500, 100)
+    assert tracing.PROMPT_TOKENS.value(prompt="risk@v1", cache="hit") >= 1024
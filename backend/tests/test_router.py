@@ -0,0 +1,167 @@
+import threading
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from app.agents.doc_verify import DocVerificationOutput
+from app.agents.providers import GeminiProvider, LLMProvider, LLMRequest, LLMResponse, ProviderError, SchemaValidationError
+from app.agents.router import CircuitBreaker, ProviderRouter
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+class FakeProvider(LLMProvider):
+    """Local stand-in: fixed latency, optional failures, records every call."""
+
+    def __init__(self, name, latency=0.0, fail_with=None, supports_images=True):
+        self.name = name
+        self.default_model = f"{name}-model"
+        self.latency = latency
+        self.fail_with = fail_with
+        self.supports_images = supports_images
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def supports(self, request):
+        return self.supports_images or not request.has_images
+
+    def complete(self, request):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if self.fail_with:
+            raise self.fail_with
+        return LLMResponse(data={"answer": self.name}, provider=self.name, model=self.default_model)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def text_request():
+    return LLMRequest(messages=[{"role": "user", "content": "hi"}], response_format=Answer)
+
+
+def warm(router, provider, latency, samples=20):
+    for _ in range(samples):
+        router.stats[provider.name].record(latency, ok=True)
+
+
+def test_routes_to_fastest_healthy_provider():
+    slow, fast = FakeProvider("slow"), FakeProvider("fast")
+    router = ProviderRouter([slow, fast], hedge=False)
+    warm(router, slow, 2.0)
+    warm(router, fast, 0.3)
+
+    assert router.complete(text_request()).provider == "fast"
+    assert (slow.calls, fast.calls) == (0, 1)
+
+
+def test_fails_over_when_primary_errors():
+    broken = FakeProvider("broken", fail_with=RuntimeError("boom"))
+    backup = FakeProvider("backup")
+    router = ProviderRouter([broken, backup], hedge=False)
+
+    assert router.complete(text_request()).provider == "backup"
+    assert router.stats["broken"].error_rate() == 1.0
+
+
+def test_rate_limit_opens_circuit_until_cooldown():
+    clock = FakeClock()
+    limited = FakeProvider("limited", fail_with=ProviderError("limited", "quota", rate_limited=True))
+    backup = FakeProvider("backup")
+    router = ProviderRouter(
+        [limited, backup], hedge=False,
+        breaker_factory=lambda: CircuitBreaker(rate_limit_cooldown_seconds=60, clock=clock)
+    )
+
+    router.complete(text_request())
+    assert router.breakers["limited"].state == CircuitBreaker.OPEN
+    assert router.stats["limited"].rate_limited_count() == 1
+
+    # While open the provider is skipped entirely
+    router.complete(text_request())
+    assert limited.calls == 1
+
+    # After the cooldown one half-open probe is allowed; success closes the circuit
+    clock.now = 61
+    limited.fail_with = None
+    assert router.candidates(text_request())[0].name == "limited"
+    assert router.complete(text_request()).provider == "limited"
+    assert router.breakers["limited"].state == CircuitBreaker.CLOSED
+
+
+def test_schema_error_on_the_half_open_probe_releases_it():
+    clock = FakeClock()
+    provider = FakeProvider("only", fail_with=ProviderError("only", "quota", rate_limited=True))
+    router = ProviderRouter([provider], hedge=False,
+                            breaker_factory=lambda: CircuitBreaker(rate_limit_cooldown_seconds=60, clock=clock))
+    with pytest.raises(ProviderError):
+        router.complete(text_request())
+
+    # The probe gets an answer, just not one that fits the schema
+    clock.now = 61
+    provider.fail_with = SchemaValidationError("only", "missing answer")
+    with pytest.raises(SchemaValidationError):
+        router.complete(text_request())
+
+    assert router.breakers["only"].state == CircuitBreaker.CLOSED
+    assert router.breakers["only"].available()
+    provider.fail_with = None
+    assert router.complete(text_request()).provider == "only"
+
+
+def test_consecutive_failures_trip_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_hedges_slow_primary_after_p95():
+    primary, backup = FakeProvider("primary", latency=0.5), FakeProvider("backup", latency=0.01)
+    router = ProviderRouter([primary, backup], hedge=True, hedge_min_samples=20)
+    warm(router, primary, 0.05)
+    warm(router, backup, 0.2)
+
+    start = time.perf_counter()
+    response = router.complete(text_request())
+    elapsed = time.perf_counter() - start
+
+    assert response.provider == "backup"
+    assert elapsed < 0.4
+    assert primary.calls == 1 and backup.calls == 1
+
+
+def test_skips_providers_that_cannot_serve_request():
+    text_only = FakeProvider("text_only", supports_images=False)
+    vision = FakeProvider("vision")
+    router = ProviderRouter([text_only, vision], hedge=False)
+    request = LLMRequest(messages=[{"role": "user", "content": [
+        {"type": "text", "text": "read this"},
+        {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+    ]}])
+
+    assert router.complete(request).provider == "vision"
+    assert text_only.calls == 0
+
+
+def test_gemini_rejects_images_and_free_form_schemas():
+    gemini = GeminiProvider(api_key="test")
+    assert gemini.supports(text_request())
+    assert not gemini.supports(LLMRequest(messages=[{"role": "user", "content": "x"}], response_format=DocVerificationOutput))
+
+
+def test_no_candidates_raises():
+    router = ProviderRouter([FakeProvider("text_only", supports_images=False)])
+    with pytest.raises(ProviderError):
+        router.complete(LLMRequest(messages=[{"role": "user", "content": [{"type": "image_url", "image_url": {"url": "x"}}]}]))
@@ -0,0 +1,62 @@
+"""
+Import-time budget for the API. Cold starts (deploys, autoscale-out) pay for
+everything `import app.main` pulls in, so the LLM SDKs and langgraph must stay
+off that path until the first call that needs them.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+DEFERRED_MODULES = ("openai", "google.generativeai", "langgraph", "langchain_core")
+
+# Our own import cost, relative to the frameworks it is built on (measured in the
+# same process, so the ratio holds on slow and fast machines alike). Eager SDK
+# and graph imports put it at ~2.7x; lazy initialisation keeps it under 1x.
+MAX_COST_VS_FRAMEWORKS = 1.5
+FRAMEWORKS = ("fastapi", "sqlalchemy.orm", "pydantic")
+
+
+def _import_app(code: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def _cumulative_us(importtime: str) -> dict:
+    """Cumulative microseconds of each top-level import in `-X importtime` output."""
+    costs = {}
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):
+            costs[name.strip()] = int(cumulative)
+    return costs
+
+
+def test_heavy_sdks_are_not_imported_at_startup():
+    result = _import_app(f"import sys, app.main; print([m for m in {DEFERRED_MODULES!r} if m in sys.modules])")
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_app_import_time_budget():
+    result = _import_app(f"import {', '.join(FRAMEWORKS)}; import app.main")
+    costs = _cumulative_us(result.stderr)
+    frameworks = sum(costs.get(name, 0) for name in FRAMEWORKS)
+    assert costs["app.main"] <= MAX_COST_VS_FRAMEWORKS * frameworks, (
+        f"import app.main took {costs['app.main'] / 1e6:.2f}s vs {frameworks / 1e6:.2f}s for {FRAMEWORKS}"
+    )
+
+
+def test_graph_compiles_on_first_use():
+    from app.orchestrator.graph import LazyGraph
+
+    builds = []
+    graph = LazyGraph(lambda: builds.append(1) or type("Compiled", (), {"invoke": lambda self, state: state})())
+    assert builds == []
+    assert graph.invoke({"case_id": "1"}) == {"case_id": "1"}
+    graph.invoke({})
+    assert builds == [1]
@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock, patch
+from sqlalchemy.orm import sessionmaker
+import pytest
+
+from app.agents.providers import OpenAIProvider
+from app.agents.risk import risk_agent
+from app.agents.router import ProviderRouter
+from app.models.trace import TraceSpan
+from app.orchestrator.nodes import risk_node
+from app.orchestrator.state import CaseState
+from app.telemetry import tracing
+from app.telemetry.metrics import registry
+
+
+@pytest.fixture
+def trace_db(db_session, monkeypatch):
+    monkeypatch.setattr(tracing.recorder, "session_factory", sessionmaker(bind=db_session.get_bind()))
+    return db_session
+
+
+def make_state(case_id="trace-case") -> CaseState:
+    return CaseState(
+        case_id=case_id,
+        current_state="QUALIFIED",
+        facts={"bond_amount": 5000},
+        derived_facts={},
+        blockers=[],
+        next_actions=[],
+        agent_outputs={},
+        rule_results={},
+        history=[]
+    )
+
+
+def openai_router(client) -> ProviderRouter:
+    return ProviderRouter([OpenAIProvider(client=client)])
+
+
+def fake_openai_client(parsed: dict, prompt_tokens=1200, completion_tokens=150, retries=1):
+    completion = MagicMock()
+    completion.choices[0].message.parsed.model_dump.return_value = parsed
+    completion.usage.prompt_tokens = prompt_tokens
+    completion.usage.completion_tokens = completion_tokens
+    completion.usage.prompt_tokens_details.cached_tokens = 0
+
+    raw = MagicMock()
+    raw.parse.return_value = completion
+    raw.retries_taken = retries
+
+    client = MagicMock()
+    client.beta.chat.completions.with_raw_response.parse.return_value = raw
+    return client
+
+
+def test_agent_call_records_tokens_cost_and_retries(trace_db):
+    output = {"risk_score": 42, "risk_tier": "Medium Risk", "risk_factors": [], "mitigating_factors": [], "recommendation": "Approve"}
+    with patch.object(risk_agent, "router", openai_router(fake_openai_client(output))):
+        state = risk_node(make_state())
+
+    assert state['agent_outputs']['risk'] == output
+
+    spans = {s.kind: s for s in trace_db.query(TraceSpan).filter(TraceSpan.case_id == "trace-case").all()}
+    assert set(spans) == {"node", "agent"}
+
+    agent_span = spans["agent"]
+    assert agent_span.name == "RiskAgent"
+    assert agent_span.model == "gpt-4o"
+    assert agent_span.prompt_tokens == 1200
+    assert agent_span.completion_tokens == 150
+    assert agent_span.retries == 1
+    assert agent_span.cost_usd == pytest.approx(tracing.estimate_cost("gpt-4o", 1200, 150))
+    assert agent_span.parent_id == spans["node"].id
+
+    # Usage rolls up into the node span
+    node_span = spans["node"]
+    assert node_span.name == "risk_node"
+    assert node_span.prompt_tokens == 1200
+    assert node_span.duration_ms >= agent_span.duration_ms
+
+
+def test_failed_agent_call_marks_span_error(trace_db):
+    client = MagicMock()
+    client.beta.chat.completions.with_raw_response.parse.side_effect = RuntimeError("429 Too Many Requests")
+    with patch.object(risk_agent, "router", openai_router(client)):
+        state = risk_node(make_state("trace-error"))
+
+    assert any("Risk Agent Failed" in h for h in state['history'])
+    agent_span = trace_db.query(TraceSpan).filter(TraceSpan.case_id == "trace-error", TraceSpan.kind == "agent").one()
+    assert agent_span.status == "ERROR"
+    assert "429" in agent_span.error
+
+
+def test_metrics_endpoint_exposes_node_quantiles(client, trace_db):
+    with patch("app.orchestrator.nodes.risk_agent.run", return_value={"risk_score": 10}):
+        risk_node(make_state("trace-metrics"))
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE bondpath_node_duration_seconds summary" in body
+    for q in ("0.5", "0.95", "0.99"):
+        assert f'bondpath_node_duration_seconds{{node="risk_node",quantile="{q}"}}' in body
+    assert registry.get("bondpath_node_duration_seconds").count(node="risk_node") >= 1
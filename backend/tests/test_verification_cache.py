@@ -0,0 +1,171 @@
+import io
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.doc_verify import DocVerifyAgent
+from app.agents.providers import LLMProvider, LLMResponse
+from app.agents.router import ProviderRouter
+from app.models.case import Case
+from app.models.document import DocumentExtraction
+from app.services.verification_queue import verification_queue
+from app.services.verification_service import VerificationService, facts_fingerprint, verification_service
+from app.storage import LocalStorage
+
+CASE_DATA = {
+    "defendant_first_name": "John", "defendant_last_name": "Doe", "defendant_name": "John Doe",
+    "defendant_dob": "1990-01-01", "booking_number": "BK-1", "bond_amount": 5000.0, "charges": None,
+}
+
+VISION_RESULT = {
+    "is_valid_document": True, "document_type_detected": "booking_sheet",
+    "extracted_data": {"Name": "DOE, JOHN", "DOB": "01/01/1990", "Booking #": "BK-0001"},
+    "confidence_score": 92,
+}
+
+CASE = {
+    "defendant_first_name": "John", "defendant_last_name": "Doe", "defendant_dob": "1990-01-01",
+    "booking_number": "BK-1", "jail_facility": "Jail", "county": "Harris", "state_jurisdiction": "TX",
+    "bond_amount": 5000, "bond_type": "SURETY", "charge_severity": "MISDEMEANOR",
+    "caller_name": "Caller", "caller_relationship": "Friend", "caller_phone": "123", "intent_signal": "UNSURE"
+}
+
+
+class CountingAgent:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def extract(self, input_data):
+        self.calls.append(input_data)
+        return dict(self.result)
+
+    def extract_many(self, documents):
+        self.calls.append(documents)
+        return [dict(self.result) for _ in documents]
+
+
+class BatchProvider(LLMProvider):
+    name = "fake"
+
+    def __init__(self, data):
+        self.data = data
+        self.requests = []
+
+    def complete(self, request):
+        self.requests.append(request)
+        return LLMResponse(data=self.data, provider=self.name, model="fake-model")
+
+
+@pytest.fixture(autouse=True)
+def clear_match_cache():
+    verification_service._matches.clear()
+
+
+def test_same_content_is_read_once_and_rematched_locally(db_session):
+    agent = CountingAgent(VISION_RESULT)
+    service = VerificationService(agent=agent)
+
+    first = service.verify(db_session, "a" * 64, "blobs/aa/x", "booking_sheet", CASE_DATA)
+    assert first["match_status"] == "MATCH"
+    assert {f["field"] for f in first["field_matches"]} == {"defendant_name", "defendant_dob", "booking_number"}
+    assert service.verify(db_session, "a" * 64, "blobs/aa/x", "booking_sheet", CASE_DATA) == first
+    assert len(agent.calls) == 1
+
+    # The case was edited: the extraction is reused and only the comparison runs again
+    edited = {**CASE_DATA, "booking_number": "BK-2"}
+    second = service.verify(db_session, "a" * 64, "blobs/aa/x", "booking_sheet", edited)
+    assert len(agent.calls) == 1
+    assert second["match_status"] == "MISMATCH"
+    assert second["extracted_data"] == VISION_RESULT["extracted_data"]
+    assert any("booking_number" in m for m in second["mismatches"])
+
+    # A new worker (empty memory cache) still skips the vision call
+    assert VerificationService(agent=agent).verify(db_session, "a" * 64, "blobs/aa/x", "booking_sheet", CASE_DATA) == first
+    assert len(agent.calls) == 1
+
+    # Extractions are per document type
+    service.verify(db_session, "a" * 64, "blobs/aa/x", "gov_id", CASE_DATA)
+    assert len(agent.calls) == 2
+
+
+def test_failed_verification_is_not_cached(db_session):
+    agent = CountingAgent({"error": "AI Processing Error: timeout"})
+    service = VerificationService(agent=agent)
+    result = service.verify(db_session, "b" * 64, "blobs/bb/x", "gov_id", CASE_DATA)
+    assert result["match_status"] == "ERROR" and result["mismatches"] == ["AI Processing Error: timeout"]
+    service.verify(db_session, "b" * 64, "blobs/bb/x", "gov_id", CASE_DATA)
+    assert len(agent.calls) == 2
+    assert db_session.query(DocumentExtraction).count() == 0
+
+
+def test_facts_fingerprint_ignores_key_order():
+    assert facts_fingerprint(CASE_DATA) == facts_fingerprint(dict(reversed(list(CASE_DATA.items()))))
+
+
+def test_reupload_and_reverify_after_edit_skip_the_vision_call(client, db_session):
+    with patch("app.api.cases.orchestrator_app.invoke", return_value={"current_state": "INTAKE"}):
+        first_case = client.post("/cases/", json=CASE).json()["id"]
+        second_case = client.post("/cases/", json=CASE).json()["id"]
+    data = b"\x89PNG booking sheet scan"
+
+    with patch("app.services.verification_service.doc_verify_agent.extract", return_value=dict(VISION_RESULT)) as vision:
+        for case_id in (first_case, second_case):
+            client.post(f"/cases/{case_id}/documents?document_type=booking_sheet",
+                        files={"file": ("sheet.png", io.BytesIO(data), "image/png")})
+            verification_queue.run_pending()
+            assert client.get(f"/cases/{case_id}").json()["documents_verified"]["booking_sheet"]["match_status"] == "MATCH"
+        assert vision.call_count == 1
+
+        case = db_session.get(Case, second_case)
+        case.booking_number = "BK-9"
+        db_session.commit()
+        url = client.get(f"/cases/{second_case}").json()["booking_sheet_url"]
+        result = client.post("/agents/verify-doc", json={"case_id": second_case, "doc_type": "booking_sheet", "file_url": url}).json()
+        assert vision.call_count == 1
+    assert result["match_status"] == "MISMATCH"
+
+
+def test_case_documents_are_read_in_one_call_and_cross_checked(db_session):
+    agent = CountingAgent(VISION_RESULT)
+    service = VerificationService(agent=agent)
+    service.verify(db_session, "c" * 64, "blobs/cc/x", "booking_sheet", CASE_DATA)  # Read before: not sent again
+
+    id_card = {**VISION_RESULT, "extracted_data": {"full_name": "Jon Doe", "date_of_birth": "1991-02-02"}}
+    agent.result = id_card
+    results = service.verify_many(db_session, [
+        ("c" * 64, "blobs/cc/x", "booking_sheet"), ("d" * 64, "blobs/dd/x", "gov_id"), ("e" * 64, "blobs/ee/x", "collateral_doc"),
+    ], CASE_DATA)
+
+    assert len(agent.calls) == 2
+    assert [d["doc_type"] for d in agent.calls[1]] == ["gov_id", "collateral_doc"]
+    booking, gov_id, collateral = results
+    # The booking sheet matches the case on its own, but the ID disagrees with it about the date of birth
+    assert booking["match_status"] == "UNCLEAR" and booking["inconsistencies"] == gov_id["inconsistencies"]
+    assert gov_id["match_status"] == "MISMATCH" and gov_id["inconsistencies"][0].startswith("date of birth")
+    assert collateral["inconsistencies"] == []
+
+    # The batch extractions are cached for single-document verification too
+    service.verify(db_session, "d" * 64, "blobs/dd/x", "gov_id", CASE_DATA)
+    assert len(agent.calls) == 2
+
+
+def test_extract_many_sends_every_image_in_one_request(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    for key, data in (("a", b"\x89PNG first"), ("b", b"\x89PNG second")):
+        (tmp_path / key).write_bytes(data)
+    provider = BatchProvider({"confidence_score": 88, "documents": [
+        {**VISION_RESULT, "index": 2, "document_type_detected": "gov_id"},
+        {**VISION_RESULT, "index": 1},
+    ]})
+    agent = DocVerifyAgent(model_name="gpt-4o", provider="openai", router=ProviderRouter([provider], hedge=False), storage=storage)
+
+    results = agent.extract_many([{"storage_key": "a", "doc_type": "booking_sheet"}, {"storage_key": "b", "doc_type": "gov_id"},
+                                  {"storage_key": "missing", "doc_type": "other"}])
+    assert len(provider.requests) == 1
+    content = provider.requests[0].messages[-1]["content"]
+    assert [part["type"] for part in content] == ["text", "image_url", "image_url"]
+    assert "1. booking_sheet" in content[0]["text"] and "2. gov_id" in content[0]["text"]
+    assert "other" not in content[0]["text"]  # Files that couldn't be loaded aren't listed
+    assert [r.get("document_type_detected") for r in results[:2]] == ["booking_sheet", "gov_id"]
+    assert results[2]["error"].startswith("Could not load file")
@@ -0,0 +1,195 @@
+import io
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.models.case import Case
+from app.models.document import Document
+from app.models.event import Event
+from app.services.verification_queue import VerificationQueue, verification_queue
+from app.services.verification_service import verification_service
+
+CASE = {
+    "defendant_first_name": "John", "defendant_last_name": "Doe", "defendant_dob": "1990-01-01",
+    "booking_number": "BK-1", "jail_facility": "Jail", "county": "Harris", "state_jurisdiction": "TX",
+    "bond_amount": 5000, "bond_type": "SURETY", "charge_severity": "MISDEMEANOR",
+    "caller_name": "Caller", "caller_relationship": "Friend", "caller_phone": "123", "intent_signal": "UNSURE"
+}
+
+EXTRACTION = {
+    "is_valid_document": True, "document_type_detected": "booking_sheet",
+    "extracted_data": {"full_name": "DOE, JOHN", "date_of_birth": "01/01/1990", "booking_number": "BK-1"},
+    "confidence_score": 90,
+}
+
+EXTRACT = "app.services.verification_service.doc_verify_agent.extract"
+
+
+def _case(client):
+    with patch("app.api.cases.orchestrator_app.invoke", return_value={"current_state": "INTAKE"}):
+        return client.post("/cases/", json=CASE).json()["id"]
+
+
+def _upload(client, case_id, document_type, data):
+    return client.post(f"/cases/{case_id}/documents?document_type={document_type}",
+                       files={"file": ("scan.png", io.BytesIO(data), "image/png")}).json()
+
+
+def test_upload_returns_before_verification_and_the_result_is_published(client, db_session):
+    verification_service._matches.clear()
+    case_id = _case(client)
+    before = client.get(f"/cases/{case_id}").json()
+
+    with patch(EXTRACT, return_value=dict(EXTRACTION)) as vision:
+        body = _upload(client, case_id, "booking_sheet", b"\x89PNG booking sheet")
+        assert body["verification"] == {"match_status": "PENDING", "document_id": body["id"]}
+        vision.assert_not_called()
+        assert db_session.get(Document, body["id"]).verification_status == "PENDING"
+
+        verification_queue.run_pending()
+        assert vision.call_count == 1
+
+    case = client.get(f"/cases/{case_id}").json()
+    result = case["documents_verified"]["booking_sheet"]
+    assert result["match_status"] == "MATCH" and result["document_id"] == body["id"]
+    db_session.expire_all()
+    assert db_session.get(Document, body["id"]).verification_status == "DONE"
+
+    # Published to the change feed and as an event carrying the new case version
+    since = (datetime.fromisoformat(before["updated_at"]) - timedelta(microseconds=1)).isoformat()
+    assert case_id in [c["id"] for c in client.get(f"/cases/?updated_since={since}").json()]
+    event = db_session.query(Event).filter(Event.case_id == case_id).one()
+    assert event.event_type == "DOCUMENT_VERIFIED" and event.version == case["version"]
+    assert event.payload == {"document_id": body["id"], "document_type": "booking_sheet", "match_status": "MATCH"}
+
+
+def test_booking_sheets_and_ids_are_verified_first(client):
+    case_id = _case(client)
+    for document_type in ("collateral_doc", "other", "gov_id", "booking_sheet", "indemnitor_id"):
+        _upload(client, case_id, document_type, document_type.encode())
+
+    order = []
+    with patch(EXTRACT, side_effect=lambda input_data: order.append(input_data["doc_type"]) or dict(EXTRACTION)):
+        verification_queue.run_pending()
+    assert order == ["booking_sheet", "gov_id", "indemnitor_id", "collateral_doc", "other"]
+
+
+def test_failed_vision_calls_are_retried_then_published_as_error(client, db_session):
+    case_id = _case(client)
+    retried = _upload(client, case_id, "gov_id", b"flaky")
+    with patch(EXTRACT, side_effect=[{"error": "AI Processing Error: timeout"}, dict(EXTRACTION)]) as vision:
+        verification_queue.run_pending()
+    assert vision.call_count == 2
+    assert client.get(f"/cases/{case_id}").json()["documents_verified"]["gov_id"]["match_status"] == "MATCH"
+
+    failed = _upload(client, case_id, "defendant_id", b"unreadable")
+    with patch(EXTRACT, side_effect=RuntimeError("provider down")) as vision:
+        verification_queue.run_pending()
+    assert vision.call_count == verification_queue.max_attempts
+    result = client.get(f"/cases/{case_id}").json()["documents_verified"]["defendant_id"]
+    assert result["match_status"] == "ERROR" and "provider down" in result["mismatches"][0]
+    db_session.expire_all()
+    assert db_session.get(Document, failed["id"]).verification_status == "FAILED"
+    assert db_session.get(Document, retried["id"]).verification_status == "DONE"
+
+
+def test_a_newer_upload_is_not_overwritten_by_an_older_result(client):
+    case_id = _case(client)
+    _upload(client, case_id, "booking_sheet", b"first scan")
+    newer = _upload(client, case_id, "booking_sheet", b"second scan")
+    with patch(EXTRACT, return_value=dict(EXTRACTION)):
+        verification_queue.run_pending()
+    assert client.get(f"/cases/{case_id}").json()["documents_verified"]["booking_sheet"]["document_id"] == newer["id"]
+
+
+def test_worker_pool_picks_up_documents_left_pending(client, db_session):
+    case_id = _case(client)
+    uploads = [_upload(client, case_id, t, t.encode()) for t in ("booking_sheet", "gov_id", "collateral_doc")]
+    verification_queue.clear()  # As if the process had restarted before the jobs ran
+
+    workers = VerificationQueue(session_factory=verification_queue.session_factory, workers=2, retry_seconds=0.01)
+    with patch("app.services.verification_service.doc_verify_agent.extract_many",
+               side_effect=lambda documents: [dict(EXTRACTION) for _ in documents]) as batch:
+        workers.start()
+        try:
+            assert workers.join(timeout=10)
+        finally:
+            workers.stop()
+    assert batch.call_count == 1  # The case's leftover documents are read together
+
+    db_session.expire_all()
+    assert {db_session.get(Document, u["id"]).verification_status for u in uploads} == {"DONE"}
+
+
+def test_full_package_is_verified_in_one_vision_call(client, db_session):
+    case_id = _case(client)
+    types = ["collateral_doc", "booking_sheet", "gov_id"]
+    response = client.post(f"/cases/{case_id}/documents/batch", params={"document_types": types},
+                           files=[("files", (f"{t}.png", io.BytesIO(t.encode()), "image/png")) for t in types])
+    assert response.status_code == 200
+    uploaded = response.json()["documents"]
+    assert [u["verification"]["match_status"] for u in uploaded] == ["PENDING"] * 3
+
+    reads = [dict(EXTRACTION), dict(EXTRACTION), {"error": "AI Processing Error: document missing from batch response"}]
+    with patch(EXTRACT, return_value=dict(EXTRACTION)) as single, \
+            patch("app.services.verification_service.doc_verify_agent.extract_many", return_value=reads) as batch:
+        verification_queue.run_pending()
+    assert batch.call_count == 1
+    assert [d["doc_type"] for d in batch.call_args.args[0]] == types
+    # Only the document the batch missed is read again, on its own, in the next attempt
+    assert single.call_count == 1 and single.call_args.args[0]["doc_type"] == "gov_id"
+
+    verified = client.get(f"/cases/{case_id}").json()["documents_verified"]
+    assert {t: verified[t]["match_status"] for t in types} == {"collateral_doc": "MATCH", "booking_sheet": "MATCH", "gov_id": "MATCH"}
+    assert verified["booking_sheet"]["inconsistencies"] == []
+    assert db_session.query(Event).filter(Event.case_id == case_id).count() == 3
+
+
+def test_batch_upload_validates_document_types(client):
+    case_id = _case(client)
+    files = [("files", ("a.png", io.BytesIO(b"a"), "image/png")), ("files", ("b.png", io.BytesIO(b"b"), "image/png"))]
+    assert client.post(f"/cases/{case_id}/documents/batch", params={"document_types": ["gov_id"]}, files=files).status_code == 400
+    assert client.post(f"/cases/{case_id}/documents/batch", params={"document_types": ["gov_id", "gov_id"]},
+                       files=files).status_code == 400
+
+
+def test_concurrent_results_for_one_case_are_both_published(client, db_session):
+    case_id = _case(client)
+    booking = _upload(client, case_id, "booking_sheet", b"booking")
+    gov_id = _upload(client, case_id, "gov_id", b"id card")
+    verification_queue.clear()
+
+    # Two workers load the case before their vision calls return, then publish one after the other
+    first, second = verification_queue.session_factory(), verification_queue.session_factory()
+    try:
+        loaded = [(db, db.get(Case, case_id), db.get(Document, u["id"])) for db, u in ((first, booking), (second, gov_id))]
+        for db, case, document in loaded:
+            verification_queue.publish(db, case, document, {"match_status": "MATCH"})
+            db.commit()
+    finally:
+        first.close()
+        second.close()
+
+    verified = client.get(f"/cases/{case_id}").json()["documents_verified"]
+    assert verified["booking_sheet"] == {"match_status": "MATCH", "document_id": booking["id"]}
+    assert verified["gov_id"] == {"match_status": "MATCH", "document_id": gov_id["id"]}
+
+
+def test_an_upload_keeps_results_published_since_the_case_was_loaded(client, db_session):
+    from app.services.verification_queue import mark_pending
+
+    case_id = _case(client)
+    booking = _upload(client, case_id, "booking_sheet", b"booking")
+    stale = db_session.get(Case, case_id)  # Loaded while the booking sheet is still PENDING
+    with patch(EXTRACT, return_value=dict(EXTRACTION)):
+        verification_queue.run_pending()
+
+    gov_id = Document(case_id=case_id, document_type="gov_id", filename="id.png", content_type="image/png",
+                      size=1, sha256="0" * 64, storage_key="k")
+    db_session.add(gov_id)
+    db_session.flush()
+    mark_pending(db_session, stale, [gov_id])
+    db_session.commit()
+
+    verified = client.get(f"/cases/{case_id}").json()["documents_verified"]
+    assert verified["booking_sheet"]["match_status"] == "MATCH" and verified["booking_sheet"]["document_id"] == booking["id"]
+    assert verified["gov_id"] == {"match_status": "PENDING", "document_id": gov_id.id}
@@ -0,0 +1,75 @@
+import asyncio
+
+from app.services import warmup as warmup_module
+from app.services.warmup import Warmup, WarmupStep
+
+
+def test_ready_only_when_required_steps_succeed():
+    calls = []
+
+    async def async_step():
+        calls.append("async")
+
+    def provider_down():
+        raise ConnectionError("no route to host")
+
+    warmup = Warmup(steps=[
+        WarmupStep("sync", lambda: calls.append("sync")),
+        WarmupStep("async", async_step),
+        WarmupStep("llm:openai", provider_down, required=False),
+    ])
+    asyncio.run(warmup.run())
+
+    assert calls == ["sync", "async"]
+    assert warmup.ready and warmup.finished
+    report = warmup.report()
+    assert report["sync"]["status"] == "ok" and report["sync"]["seconds"] is not None
+    assert report["llm:openai"] == {"status": "failed", "seconds": report["llm:openai"]["seconds"],
+                                    "error": "ConnectionError: no route to host"}
+
+    def database_down():
+        raise RuntimeError("connection refused")
+
+    warmup = Warmup(steps=[WarmupStep("database", database_down)])
+    asyncio.run(warmup.run())
+    assert warmup.finished and not warmup.ready
+
+
+def test_real_steps_warm_the_graph_rules_and_pool():
+    steps = [
+        WarmupStep("database", warmup_module._open_sync_pool),
+        WarmupStep("graph", warmup_module._compile_graph),
+        WarmupStep("rules", warmup_module._prime_rules),
+    ]
+    warmup = Warmup(steps=steps)
+    asyncio.run(warmup.run())
+    assert warmup.ready, warmup.report()
+
+    from app.orchestrator.graph import app as orchestrator_app
+    assert orchestrator_app._compiled is not None
+
+
+def test_ready_flips_after_warmup_while_health_answers_throughout(client, monkeypatch):
+    monkeypatch.setattr(warmup_module.warmup, "ready", False)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["ready"] is False
+    database = health.json()["components"]["database"]
+    assert database["status"] == "ok" and database["latency_ms"] >= 0
+    assert set(health.json()["components"]["llm_providers"]) <= {"openai", "gemini"}
+
+    monkeypatch.setattr(warmup_module.warmup, "ready", True)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["database"]["status"] == "ok"
+
+
+def test_ready_fails_when_the_database_is_unreachable(client, monkeypatch):
+    monkeypatch.setattr(warmup_module.warmup, "ready", True)
+    monkeypatch.setattr("app.main.check_database", lambda: {"status": "failed", "latency_ms": 1.0, "error": "down"})
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").json()["status"] == "degraded"
@@ -4,21 +4,34 @@ const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
 export const apiClient = axios.create({
     baseURL: API_URL,
+    // Sends the API's cookies, including the read-your-writes marker that keeps reads after a write on the primary
+    withCredentials: true,
     headers: {
         'Content-Type': 'application/json',
     },
 });
 
+// The same marker from the response header, echoed back for when the browser won't send the cookie cross-site
+const READ_PRIMARY_HEADER = 'x-read-primary-until';
+let readPrimaryUntil = 0;
+
 apiClient.interceptors.request.use((config) => {
     const token = localStorage.getItem('token');
     if (token) {
         config.headers.Authorization = `Bearer ${token}`;
     }
+    if (readPrimaryUntil * 1000 > Date.now()) {
+        config.headers[READ_PRIMARY_HEADER] = readPrimaryUntil.toFixed(3);
+    }
     return config;
 });
 
 apiClient.interceptors.response.use(
-    (response) => response,
+    (response) => {
+        const marker = Number(response.headers[READ_PRIMARY_HEADER]);
+        if (marker > readPrimaryUntil) readPrimaryUntil = marker;
+        return response;
+    },
     (error) => {
         if (error.response?.status === 401) {
             localStorage.removeItem('token');
@@ -27,3 +40,28 @@ apiClient.interceptors.response.use(
         return Promise.reject(error);
     }
 );
+
+// Document links open in a new tab or an <img>, which can't send the Authorization header:
+// they use a short-lived link signed for that one document
+export const documentUrl = async (url: string, rendition?: 'thumbnail' | 'preview') => {
+    let link = new URL(url, API_URL);
+    if (link.pathname.startsWith('/documents/')) {
+        const { data } = await apiClient.post<{ url: string; expires_at: string }>(`${link.pathname}/link`);
+        link = new URL(data.url, API_URL);
+    }
+    if (rendition) link.searchParams.set('rendition', rendition);
+    return link.toString();
+};
+
+export const openDocument = async (url: string, rendition?: 'thumbnail' | 'preview') => {
+    // Opened before the link request so popup blockers still count it as part of the click
+    const tab = window.open('', '_blank');
+    if (tab) tab.opener = null;
+    try {
+        const link = await documentUrl(url, rendition);
+        if (tab) tab.location.href = link;
+    } catch (error) {
+        tab?.close();
+        console.error('Could not open document', error);
+    }
+};
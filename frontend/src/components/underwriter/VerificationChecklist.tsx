@@ -1,4 +1,5 @@
 import { CheckCircle, XCircle, Eye, ExternalLink } from 'lucide-react';
+import { openDocument } from '../../api/client';
 
 interface VerificationItem {
     id: string;
@@ -39,8 +40,10 @@ export default function VerificationChecklist({ items, onToggleVerify }: Verific
                                     {item.type === 'DOCUMENT' && item.url ? (
                                         <a
                                             href={item.url}
-                                            target="_blank"
-                                            rel="noreferrer"
+                                            onClick={(e) => {
+                                                e.preventDefault();
+                                                openDocument(item.url!);
+                                            }}
                                             className="flex items-center gap-1 text-blue-600 hover:underline font-medium"
                                         >
                                             <Eye className="w-4 h-4" /> View Document <ExternalLink className="w-3 h-3" />